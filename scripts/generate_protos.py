@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
-"""Compile protobuf definitions from the reference repositories."""
+"""Compile protobuf definitions from the reference repositories.
+
+Generation is incremental: a manifest of per-``.proto`` content hashes and
+output modules is kept next to the generated modules, and only changed files
+plus the files that import them (transitively) are recompiled. Outputs of
+``.proto`` files that left the tree are deleted. Independent protoc batches
+run in parallel, and the script exits non-zero if any batch fails.
+"""
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
+import re
 import shutil
 import subprocess
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Sequence
 
 ROOT = Path(__file__).resolve().parent.parent
 OUT_DIR = ROOT / "src" / "bpsr_labs" / "packet_decoder" / "generated"
@@ -24,37 +38,18 @@ EXTRA_FILES: Sequence[tuple[Path, Sequence[str]]] = (
     (STAR_DATA, ["table_basic.proto"]),
 )
 
-INIT_TEMPLATE = '"""Generated protobuf modules for BPSR."""\nfrom __future__ import annotations\n\nimport sys\nfrom pathlib import Path\n\n_pkg_dir = Path(__file__).resolve().parent\n_pkg_str = str(_pkg_dir)\nif _pkg_str not in sys.path:\n    sys.path.insert(0, _pkg_str)\n\n__all__: list[str] = []\n'
+INIT_TEMPLATE = '"""Generated protobuf modules for BPSR.\n\nImport modules through\n:func:`bpsr_labs.packet_decoder.decoder.generated_registry.get_generated_registry`,\nwhich adds this directory to ``sys.path`` on first use.\n"""\nfrom __future__ import annotations\n\n__all__: list[str] = []\n'
 
 PB_INIT_TEMPLATE = '"""Generated chat protobuf modules."""\n'
 
+MANIFEST_PATH = OUT_DIR / ".proto_manifest.json"
+MANIFEST_VERSION = 2
+BATCH_SIZE = 50  # keeps command lines below the Windows length limit
 
-def run_protoc(proto_paths: Iterable[Path], includes: Sequence[str]) -> None:
-    proto_files = sorted(p for path in proto_paths for p in path.rglob("*.proto"))
-    if not proto_files:
-        return
+_IMPORT_RE = re.compile(r'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"\s*;', re.MULTILINE)
 
-    # Process files in batches to avoid Windows command line length limits
-    batch_size = 50  # Adjust based on your system
-    for i in range(0, len(proto_files), batch_size):
-        batch_files = proto_files[i:i + batch_size]
-        
-        cmd = [
-            sys.executable,
-            "-m",
-            "grpc_tools.protoc",
-            f"--python_out={OUT_DIR}",
-        ]
-        for include in includes:
-            cmd.append(f"-I{include}")
-
-        cmd.extend(str(p) for p in batch_files)
-        subprocess.run(cmd, check=True, cwd=proto_paths[0])
-
-
-def run_single(file_dir: Path, includes: Sequence[str], files: Sequence[str]) -> None:
-    if not files:
-        return
+
+def _protoc_command(includes: Sequence[str], files: Sequence[str]) -> list[str]:
     cmd = [
         sys.executable,
         "-m",
@@ -64,15 +59,181 @@ def run_single(file_dir: Path, includes: Sequence[str], files: Sequence[str]) ->
     for include in includes:
         cmd.append(f"-I{include}")
     cmd.extend(files)
-    subprocess.run(cmd, check=True, cwd=file_dir)
+    return cmd
+
+
+# ----------------------------------------------------------------------
+# Incremental generation
+# ----------------------------------------------------------------------
+class ProtoUnit:
+    """A single .proto file together with the protoc settings it needs."""
+
+    def __init__(self, path: Path, includes: Sequence[str], cwd: Path) -> None:
+        self.path = path
+        self.includes = tuple(includes)
+        self.cwd = cwd
+        self.key = path.relative_to(STAR_DATA).as_posix() if path.is_relative_to(STAR_DATA) else str(path)
+        self.digest = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def virtual_path(self) -> Path:
+        """Path protoc uses for this file (relative to the first matching include)."""
+        for include in self.includes:
+            root = Path(include)
+            if self.path.is_relative_to(root):
+                return self.path.relative_to(root)
+        return Path(self.path.name)
+
+    def output_path(self) -> Path:
+        return OUT_DIR / self.virtual_path().with_name(self.path.stem + "_pb2.py")
+
+    def imports(self) -> list[Path]:
+        """Resolve ``import "..."`` statements against this unit's include paths."""
+        text = self.path.read_text(encoding="utf-8", errors="replace")
+        resolved: list[Path] = []
+        for name in _IMPORT_RE.findall(text):
+            for include in self.includes:
+                candidate = Path(include) / name
+                if candidate.is_file():
+                    resolved.append(candidate.resolve())
+                    break
+        return resolved
+
+
+def collect_units() -> list[ProtoUnit]:
+    units: dict[Path, ProtoUnit] = {}
+    for proto_dir, includes in PROTO_BATCHES:
+        if not proto_dir.exists():
+            continue
+        for path in sorted(proto_dir.rglob("*.proto")):
+            units.setdefault(path.resolve(), ProtoUnit(path.resolve(), includes, proto_dir))
+    for base_dir, files in EXTRA_FILES:
+        if not base_dir.exists():
+            continue
+        for name in files:
+            path = (base_dir / name).resolve()
+            if path.is_file():
+                units.setdefault(path, ProtoUnit(path, [str(STAR_DATA)], base_dir))
+    return list(units.values())
+
+
+def load_manifest() -> dict[str, dict[str, str]]:
+    """Return ``{key: {"digest": ..., "output": ...}}`` from the last run.
+
+    ``output`` is the generated module's path relative to :data:`OUT_DIR`.
+    """
+    if not MANIFEST_PATH.exists():
+        return {}
+    try:
+        payload = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if payload.get("version") != MANIFEST_VERSION:
+        return {}
+    return {key: dict(entry) for key, entry in payload.get("files", {}).items()}
+
+
+def save_manifest(files: dict[str, dict[str, str]]) -> None:
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    payload = {"version": MANIFEST_VERSION, "files": dict(sorted(files.items()))}
+    MANIFEST_PATH.write_text(json.dumps(payload, indent=1) + "\n", encoding="utf-8")
+
+
+def manifest_entry(unit: ProtoUnit) -> dict[str, str]:
+    return {"digest": unit.digest, "output": unit.output_path().relative_to(OUT_DIR).as_posix()}
+
+
+def prune_removed(manifest: dict[str, dict[str, str]], units: Sequence[ProtoUnit]) -> list[str]:
+    """Delete generated modules of manifest entries whose ``.proto`` is gone.
+
+    Returns the keys that were pruned.
+    """
+    known_keys = {unit.key for unit in units}
+    removed = sorted(key for key in manifest if key not in known_keys)
+    for key in removed:
+        output = manifest[key].get("output")
+        if output:
+            (OUT_DIR / output).unlink(missing_ok=True)
+    return removed
+
+
+def stale_units(units: Sequence[ProtoUnit], manifest: dict[str, dict[str, str]]) -> list[ProtoUnit]:
+    """Return units whose content changed, whose output is missing, or that
+    import (directly or transitively) a unit that needs regeneration."""
+    by_path = {unit.path: unit for unit in units}
+    dependents: dict[Path, set[Path]] = defaultdict(set)
+    for unit in units:
+        for dependency in unit.imports():
+            dependents[dependency].add(unit.path)
+
+    pending = [
+        unit.path
+        for unit in units
+        if manifest.get(unit.key, {}).get("digest") != unit.digest or not unit.output_path().exists()
+    ]
+    stale: set[Path] = set()
+    while pending:
+        path = pending.pop()
+        if path in stale:
+            continue
+        stale.add(path)
+        pending.extend(dependents.get(path, ()))
+    return [by_path[path] for path in sorted(stale) if path in by_path]
+
+
+def _run_job(cwd: Path, includes: Sequence[str], files: Sequence[str]) -> None:
+    subprocess.run(_protoc_command(includes, files), check=True, cwd=cwd, capture_output=True, text=True)
+
+
+def regenerate(units: Sequence[ProtoUnit], jobs: int) -> tuple[list[ProtoUnit], int]:
+    """Compile *units* with up to *jobs* concurrent protoc processes.
+
+    Returns the units that compiled successfully and the number of failed
+    protoc batches.
+    """
+    groups: dict[tuple[Path, tuple[str, ...]], list[ProtoUnit]] = defaultdict(list)
+    for unit in units:
+        groups[(unit.cwd, unit.includes)].append(unit)
+
+    batches: list[tuple[Path, tuple[str, ...], list[ProtoUnit]]] = []
+    for (cwd, includes), members in groups.items():
+        for i in range(0, len(members), BATCH_SIZE):
+            batches.append((cwd, includes, members[i:i + BATCH_SIZE]))
+
+    succeeded: list[ProtoUnit] = []
+    failures = 0
+    # Each job is an independent protoc process; threads only wait on them.
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {
+            pool.submit(_run_job, cwd, includes, [str(u.path) for u in members]): members
+            for cwd, includes, members in batches
+        }
+        for future in as_completed(futures):
+            members = futures[future]
+            try:
+                future.result()
+            except subprocess.CalledProcessError as exc:
+                failures += 1
+                print(f"protoc failed for batch starting at {members[0].key}:")
+                print(exc.stderr or exc.stdout)
+                continue
+            succeeded.extend(members)
+    if failures:
+        print(f"{failures} protoc batch(es) failed; they will be retried on the next run")
+    return succeeded, failures
+
+
+def _write_if_changed(path: Path, content: str) -> None:
+    if path.exists() and path.read_text(encoding="utf-8") == content:
+        return
+    path.write_text(content, encoding="utf-8")
 
 
 def ensure_init_files() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    (OUT_DIR / "__init__.py").write_text(INIT_TEMPLATE, encoding="utf-8")
+    _write_if_changed(OUT_DIR / "__init__.py", INIT_TEMPLATE)
     pb_dir = OUT_DIR / "pb"
     pb_dir.mkdir(exist_ok=True)
-    (pb_dir / "__init__.py").write_text(PB_INIT_TEMPLATE, encoding="utf-8")
+    _write_if_changed(pb_dir / "__init__.py", PB_INIT_TEMPLATE)
 
 
 def clean_generated() -> None:
@@ -87,6 +248,14 @@ def clean_generated() -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument("--clean", action="store_true", help="Remove previously generated modules")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and regenerate every file")
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of protoc batches to run concurrently (default: CPU count)",
+    )
     args = parser.parse_args()
 
     # Check if refs/StarResonanceData exists
@@ -102,17 +271,34 @@ def main() -> None:
 
     ensure_init_files()
 
-    for proto_dir, includes in PROTO_BATCHES:
-        if not proto_dir.exists():
-            continue
-        run_protoc([proto_dir], includes)
+    started = time.perf_counter()
+    units = collect_units()
+    previous = load_manifest()
+    removed = prune_removed(previous, units)
+    if removed:
+        print(f"Removed outputs of {len(removed)} deleted proto file(s)")
+    manifest = {key: entry for key, entry in previous.items() if key not in removed}
+    stale = stale_units(units, {} if args.force else manifest)
+    if not stale:
+        if removed:
+            save_manifest(manifest)
+        print(f"Protobuf modules up to date ({len(units)} files checked in {time.perf_counter() - started:.2f}s)")
+        return
 
-    for base_dir, files in EXTRA_FILES:
-        if not base_dir.exists():
-            continue
-        run_single(base_dir, [str(STAR_DATA)], list(files))
+    print(f"Regenerating {len(stale)} of {len(units)} proto files with {args.jobs} job(s)")
+    succeeded, failures = regenerate(stale, args.jobs)
+
+    # Failed units are dropped so the next run retries them
+    for unit in stale:
+        manifest.pop(unit.key, None)
+    for unit in succeeded:
+        manifest[unit.key] = manifest_entry(unit)
+    save_manifest(manifest)
 
     ensure_init_files()
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+    if failures:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -9,15 +9,15 @@ Example:
     Basic usage of the CLI:
     >>> from bpsr_labs.cli import main
     >>> main(['--help'])
+
+Subcommand implementations are imported inside each command body so that
+``bpsr-labs --help`` and lightweight commands such as ``info`` or ``dps`` never
+pay for protobuf, zstandard or the generated protobuf modules.
 """
 
 import click
 from pathlib import Path
-
-from bpsr_labs.packet_decoder.cli.bpsr_decode_combat import main as decode_main
-from bpsr_labs.packet_decoder.cli.bpsr_dps_reduce import main as dps_main
-from bpsr_labs.packet_decoder.cli.bpsr_decode_trade import main as trade_decode_main
-from bpsr_labs.packet_decoder.cli.bpsr_update_items import main as update_items_main
+from typing import Optional
 
 
 @click.group()
@@ -33,7 +33,13 @@ def main() -> None:
         decode: Decode combat packets from binary capture files
         dps: Calculate DPS metrics from decoded combat data
         trade-decode: Decode trading center packets
+        trade-batch: Decode many trading captures in parallel and merge them
+        trade-ingest: Store decoded listings in the market history database
+        trade-query: Report windowed price statistics from market history
         update-items: Update item name mappings from game data
+        update-skills: Update skill name mappings from game data
+        items search: Find item ids by partial or misspelled name
+        discover-methods: Map unknown combat methods to protobuf types
         info: Display information about available tools
     
     Example:
@@ -69,21 +75,28 @@ def decode(input_file: Path, output_file: Path, stats_out: Path | None) -> int:
         >>> decode(Path('capture.bin'), Path('output.jsonl'), None)
         0
     """
-    return decode_main(input_file, output_file, stats_out)
+    from bpsr_labs.packet_decoder.cli.bpsr_decode_combat import main as decode_main
+
+    return click.get_current_context().invoke(
+        decode_main, capture=input_file, output=output_file, stats_out=stats_out
+    )
 
 
 @main.command()
 @click.argument('input_file', type=click.Path(exists=True, path_type=Path))
 @click.argument('output_file', type=click.Path(path_type=Path))
-def dps(input_file: Path, output_file: Path) -> int:
+@click.option('--no-skill-names', is_flag=True, help='Skip skill name resolution')
+def dps(input_file: Path, output_file: Path, no_skill_names: bool) -> int:
     """Calculate DPS metrics from decoded combat JSONL.
     
     Analyzes decoded combat data to compute damage-per-second metrics,
     including skill breakdowns, target analysis, and combat duration.
+    Skills are named from the skill catalog written by ``update-skills``.
     
     Args:
         input_file: Path to decoded combat JSONL file.
         output_file: Path where DPS summary JSON will be written.
+        no_skill_names: If True, leave skills keyed by id only.
     
     Returns:
         int: Exit code (0 for success, 1 for error).
@@ -93,29 +106,68 @@ def dps(input_file: Path, output_file: Path) -> int:
         ValueError: If input data is malformed or incomplete.
     
     Example:
-        >>> dps(Path('combat.jsonl'), Path('dps_summary.json'))
+        >>> dps(Path('combat.jsonl'), Path('dps_summary.json'), False)
         0
     """
-    return dps_main(input_file, output_file)
+    from bpsr_labs.packet_decoder.cli.bpsr_dps_reduce import main as dps_main
+
+    return click.get_current_context().invoke(
+        dps_main, decoded=input_file, output=output_file, no_skill_names=no_skill_names
+    )
 
 
 @main.command()
-@click.argument('input_file', type=click.Path(exists=True, path_type=Path))
+@click.argument('input_file', type=click.Path(exists=True, allow_dash=True, path_type=Path))
 @click.argument('output_file', type=click.Path(path_type=Path))
 @click.option('--no-item-names', is_flag=True, help='Skip item name resolution')
 @click.option('--quiet', is_flag=True, help='Suppress progress output')
-def trade_decode(input_file: Path, output_file: Path, no_item_names: bool, quiet: bool) -> int:
+@click.option('--decoder', 'decoder_version', type=click.Choice(['v1', 'v2'], case_sensitive=False), default='v2', show_default=True, help='Select the trading center decoder implementation')
+@click.option('--typedef-cache', type=click.Path(dir_okay=False, path_type=Path), default=None, help='Learned listing typedef reused by the V1 decoder (default: data/schemas/.trading_listing_typedef.json)')
+@click.option('--no-typedef-cache', is_flag=True, help='Do not load or save the learned V1 typedef')
+@click.option('--no-raw-entries', is_flag=True, help='Omit metadata.raw_entry from the output')
+@click.option('--format', 'output_format', type=click.Choice(['json', 'ndjson'], case_sensitive=False), default='json', show_default=True, help='json writes one indented array; ndjson streams one listing per line as decoded')
+@click.option('--watchlist', 'watchlist_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), help='Stream the capture and write NDJSON alerts for listings matching this watchlist')
+@click.option('--category', 'categories', type=int, multiple=True, help='Only decode listings for items of this ItemTable category (repeatable)')
+@click.option('--min-rarity', type=int, help='Only decode listings for items of at least this rarity')
+def trade_decode(
+    input_file: Path,
+    output_file: Path,
+    no_item_names: bool,
+    quiet: bool,
+    decoder_version: str,
+    typedef_cache: Optional[Path],
+    no_typedef_cache: bool,
+    no_raw_entries: bool,
+    output_format: str,
+    watchlist_path: Optional[Path],
+    categories: tuple[int, ...],
+    min_rarity: Optional[int],
+) -> int:
     """Decode BPSR trading center packets from a binary capture file.
     
     Processes binary capture data to extract trading center listings and
     market information. Optionally resolves item IDs to human-readable names
-    using the item mapping database.
+    using the item mapping database. With ``--format ndjson`` the capture is
+    streamed (``-`` reads stdin) and each unique listing is written as one
+    JSON line when first seen; ``--watchlist`` streams only matching listings
+    as alerts.
     
     Args:
-        input_file: Path to the binary capture file containing trading data.
-        output_file: Path where decoded trading data JSON will be written.
+        input_file: Path to the binary capture file containing trading data,
+            or ``-`` for stdin.
+        output_file: Path where decoded trading data JSON will be written,
+            or ``-`` for stdout in the streaming modes.
         no_item_names: If True, skip item name resolution (faster processing).
         quiet: If True, suppress progress output during processing.
+        decoder_version: Trading decoder to use (``v1`` or ``v2``).
+        typedef_cache: JSON file holding the typedef learned by the V1 decoder.
+        no_typedef_cache: If True, neither load nor save the learned typedef.
+        no_raw_entries: If True, omit ``metadata.raw_entry`` from the output.
+        output_format: ``json`` for one indented array, ``ndjson`` to stream
+            one listing per line.
+        watchlist_path: Watchlist JSON; enables streaming alert mode.
+        categories: Only decode listings for items in these categories.
+        min_rarity: Only decode listings for items of at least this rarity.
     
     Returns:
         int: Exit code (0 for success, 1 for error).
@@ -128,7 +180,195 @@ def trade_decode(input_file: Path, output_file: Path, no_item_names: bool, quiet
         >>> trade_decode(Path('trading.bin'), Path('listings.json'), False, False)
         0
     """
-    return trade_decode_main(input_file, output_file, no_item_names, quiet)
+    from bpsr_labs.packet_decoder.cli.bpsr_decode_trade import main as trade_decode_main
+
+    options = {'typedef_cache': typedef_cache} if typedef_cache is not None else {}
+    return click.get_current_context().invoke(
+        trade_decode_main,
+        capture=input_file,
+        output=output_file,
+        no_item_names=no_item_names,
+        quiet=quiet,
+        decoder_version=decoder_version,
+        no_typedef_cache=no_typedef_cache,
+        no_raw_entries=no_raw_entries,
+        output_format=output_format,
+        watchlist_path=watchlist_path,
+        categories=categories,
+        min_rarity=min_rarity,
+        **options,
+    )
+
+
+@main.command()
+@click.argument('inputs', nargs=-1, required=True)
+@click.argument('output_file', type=click.Path(dir_okay=False, path_type=Path))
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Worker processes (default: CPU count)')
+@click.option('--decoder', 'decoder_version', type=click.Choice(['v1', 'v2'], case_sensitive=False), default='v2', show_default=True, help='Select the trading center decoder implementation')
+@click.option('--typedef-cache', type=click.Path(dir_okay=False, path_type=Path), default=None, help='Learned listing typedef shared with every worker (default: data/schemas/.trading_listing_typedef.json)')
+@click.option('--no-typedef-cache', is_flag=True, help='Do not load or save the learned V1 typedef')
+@click.option('--no-item-names', is_flag=True, help='Skip item name resolution')
+@click.option('--no-raw-entries', is_flag=True, help='Omit metadata.raw_entry from the output')
+@click.option('--format', 'output_format', type=click.Choice(['json', 'ndjson'], case_sensitive=False), default='json', show_default=True, help='Merged output as one indented array or one listing per line')
+@click.option('--summary', 'summary_path', type=click.Path(dir_okay=False, path_type=Path), help='Per-capture summary JSON (default: OUTPUT with a .summary.json suffix)')
+@click.option('--category', 'categories', type=int, multiple=True, help='Only decode listings for items of this ItemTable category (repeatable)')
+@click.option('--min-rarity', type=int, help='Only decode listings for items of at least this rarity')
+@click.option('--quiet', is_flag=True, help='Suppress progress output')
+def trade_batch(
+    inputs: tuple[str, ...],
+    output_file: Path,
+    workers: Optional[int],
+    decoder_version: str,
+    typedef_cache: Optional[Path],
+    no_typedef_cache: bool,
+    no_item_names: bool,
+    no_raw_entries: bool,
+    output_format: str,
+    summary_path: Optional[Path],
+    categories: tuple[int, ...],
+    min_rarity: Optional[int],
+    quiet: bool,
+) -> int:
+    """Decode many trading center captures in parallel and merge the listings.
+    
+    Captures are decoded in a process pool. The parent process deduplicates
+    listings across captures, resolves item names from a single mapping load
+    and writes a per-capture summary next to the merged output.
+    
+    Args:
+        inputs: Capture files, directories or glob patterns.
+        output_file: Path where the merged listings will be written.
+        workers: Number of worker processes (default: CPU count).
+        decoder_version: Trading decoder to use (``v1`` or ``v2``).
+        typedef_cache: JSON file holding the typedef learned by the V1 decoder.
+        no_typedef_cache: If True, neither load nor save the learned typedef.
+        no_item_names: If True, skip item name resolution.
+        no_raw_entries: If True, omit ``metadata.raw_entry`` from the output.
+        output_format: ``json`` for one indented array, ``ndjson`` for one
+            listing per line.
+        summary_path: Where to write the per-capture summary.
+        categories: Only decode listings for items in these categories.
+        min_rarity: Only decode listings for items of at least this rarity.
+        quiet: If True, suppress progress output.
+    
+    Returns:
+        int: Exit code (0 for success, 1 if any capture failed).
+    
+    Example:
+        >>> trade_batch(('captures/',), Path('merged.json'), None, 'v2', None, False, False, False, 'json', None, (), None, False)
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_trade_batch import main as trade_batch_main
+
+    options = {'typedef_cache': typedef_cache} if typedef_cache is not None else {}
+    return click.get_current_context().invoke(
+        trade_batch_main,
+        inputs=inputs,
+        output=output_file,
+        workers=workers,
+        decoder_version=decoder_version,
+        no_typedef_cache=no_typedef_cache,
+        no_item_names=no_item_names,
+        no_raw_entries=no_raw_entries,
+        output_format=output_format,
+        summary_path=summary_path,
+        categories=categories,
+        min_rarity=min_rarity,
+        quiet=quiet,
+        **options,
+    )
+
+
+@main.command()
+@click.argument('inputs', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--db', 'db_path', type=click.Path(dir_okay=False, path_type=Path), default=None, help='SQLite market history database (default: data/market/market.sqlite3)')
+@click.option('--capture-id', help='Capture identifier (default: input file stem; single input only)')
+@click.option('--observed-at', help='Observation time as epoch ms or ISO-8601 (default: input file mtime)')
+@click.option('--quiet', is_flag=True, help='Suppress progress output')
+def trade_ingest(
+    inputs: tuple[Path, ...],
+    db_path: Optional[Path],
+    capture_id: Optional[str],
+    observed_at: Optional[str],
+    quiet: bool,
+) -> int:
+    """Store decoded trading center listings in the market history database.
+    
+    Loads ``trade-decode`` JSON or NDJSON output into a local SQLite database
+    so price history accumulates across sweeps. Listings already stored for the same
+    capture are skipped, so re-ingesting a file is harmless.
+    
+    Args:
+        inputs: One or more ``trade-decode`` JSON or NDJSON output files.
+        db_path: SQLite database to write; created if missing.
+        capture_id: Identifier for the capture (single input only).
+        observed_at: Observation time as epoch ms or ISO-8601.
+        quiet: If True, suppress progress output.
+    
+    Returns:
+        int: Exit code (0 for success, 1 for error).
+    
+    Example:
+        >>> trade_ingest((Path('listings.json'),), None, None, None, False)
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_trade_ingest import main as trade_ingest_main
+
+    options = {'db_path': db_path} if db_path is not None else {}
+    return click.get_current_context().invoke(
+        trade_ingest_main,
+        inputs=inputs,
+        capture_id=capture_id,
+        observed_at=observed_at,
+        quiet=quiet,
+        **options,
+    )
+
+
+@main.command()
+@click.argument('item_id', type=int)
+@click.option('--db', 'db_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), default=None, help='SQLite market history database (default: data/market/market.sqlite3)')
+@click.option('--window', 'window_ms', type=click.IntRange(min=1), default=3_600_000, show_default=True, help='Bucket width in milliseconds')
+@click.option('--since', help='Inclusive start as epoch ms or ISO-8601')
+@click.option('--until', help='Exclusive end as epoch ms or ISO-8601')
+@click.option('--json', 'as_json', is_flag=True, help='Emit JSON instead of a table')
+def trade_query(
+    item_id: int,
+    db_path: Optional[Path],
+    window_ms: int,
+    since: Optional[str],
+    until: Optional[str],
+    as_json: bool,
+) -> int:
+    """Report min, median and VWAP prices for an item per time window.
+    
+    Args:
+        item_id: Item config id to report on.
+        db_path: SQLite market history database.
+        window_ms: Bucket width in milliseconds.
+        since: Inclusive start as epoch ms or ISO-8601.
+        until: Exclusive end as epoch ms or ISO-8601.
+        as_json: If True, emit JSON instead of a table.
+    
+    Returns:
+        int: Exit code (0 for success, 1 for error).
+    
+    Example:
+        >>> trade_query(1015091, None, 3600000, None, None, False)
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_trade_query import main as trade_query_main
+
+    options = {'db_path': db_path} if db_path is not None else {}
+    return click.get_current_context().invoke(
+        trade_query_main,
+        item_id=item_id,
+        window_ms=window_ms,
+        since=since,
+        until=until,
+        as_json=as_json,
+        **options,
+    )
 
 
 @main.command()
@@ -136,61 +376,182 @@ def trade_decode(input_file: Path, output_file: Path, no_item_names: bool, quiet
 @click.option('--output', '-o', type=click.Path(path_type=Path), default=Path('data/game-data/item_name_map.json'), help='Destination path for the generated mapping')
 @click.option('--indent', type=int, default=2, help='Indentation level for the JSON output')
 @click.option('--quiet', is_flag=True, help='Suppress informational logging output')
-def update_items(source: tuple[Path, ...], output: Path, indent: int, quiet: bool) -> int:
+@click.option('--force', is_flag=True, help='Re-parse every source and rewrite the outputs, ignoring the manifest')
+@click.option('--columns', default='rarity,category,stack_size', show_default=True, help='Comma-separated ItemTable columns to keep; empty for names only')
+def update_items(source: tuple[Path, ...], output: Path, indent: int, quiet: bool, force: bool, columns: str) -> int:
     """Update item name mappings from Star Resonance data dumps.
     
     Scans Star Resonance data files to build or update the item ID to name
     mapping database. This mapping is used by other tools to resolve item IDs
-    to human-readable names.
+    to human-readable names. A compiled, memory-mappable copy is written next
+    to it with a ``.bin`` suffix, and a ``.manifest.json`` recording what each
+    source contributed so later runs only re-parse changed sources.
     
     Args:
         source: One or more directories or files to scan for item data.
         output: Path where the generated mapping JSON will be written.
         indent: JSON indentation level for the output file.
         quiet: If True, suppress informational logging output.
+        force: If True, ignore the manifest and rebuild from every source.
+        columns: Comma-separated ItemTable columns (rarity, category,
+            stack_size) to keep alongside the names.
     
     Returns:
         int: Exit code (0 for success, 1 for error).
     
-    Raises:
-        FileNotFoundError: If source paths do not exist.
-        ValueError: If no valid item data is found in sources.
+    Example:
+        >>> update_items((Path('ref/StarResonanceData'),), Path('items.json'), 2, False, False, 'rarity')
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_update_items import main as update_items_main
+
+    return click.get_current_context().invoke(
+        update_items_main,
+        source=source,
+        output=output,
+        indent=indent,
+        quiet=quiet,
+        force=force,
+        columns=columns,
+    )
+
+
+@main.command()
+@click.option('--source', '-s', type=click.Path(exists=True, path_type=Path), multiple=True, help='Directory or file to scan for Star Resonance skill tables')
+@click.option('--output', '-o', type=click.Path(path_type=Path), default=Path('data/game-data/skill_name_map.json'), help='Destination path for the generated mapping')
+@click.option('--indent', type=int, default=2, help='Indentation level for the JSON output')
+@click.option('--quiet', is_flag=True, help='Suppress informational logging output')
+def update_skills(source: tuple[Path, ...], output: Path, indent: int, quiet: bool) -> int:
+    """Update skill name mappings from Star Resonance data dumps.
+    
+    Scans Star Resonance data files (``SkillTable.json`` and
+    ``skill_name_map.json``) to build the skill ID to name mapping used by
+    ``dps``. A compiled, memory-mappable copy is written next to it with a
+    ``.bin`` suffix.
+    
+    Args:
+        source: One or more directories or files to scan for skill data.
+        output: Path where the generated mapping JSON will be written.
+        indent: JSON indentation level for the output file.
+        quiet: If True, suppress informational logging output.
+    
+    Returns:
+        int: Exit code (0 for success, 1 for error).
     
     Example:
-        >>> update_items((Path('ref/StarResonanceData'),), Path('items.json'), 2, False)
+        >>> update_skills((Path('ref/StarResonanceData'),), Path('skills.json'), 2, False)
         0
     """
-    # Call the update_items_main function directly with the parameters
-    from bpsr_labs.packet_decoder.decoder.item_catalog import build_mapping_from_sources
-    import json
-    import logging
-    
-    if quiet:
-        logging.getLogger().setLevel(logging.WARNING)
-    
-    # Use default sources if none provided
-    if not source:
-        from bpsr_labs.packet_decoder.decoder.item_catalog import _DEFAULT_SEARCH_LOCATIONS
-        source = _DEFAULT_SEARCH_LOCATIONS
-    
-    try:
-        mapping = build_mapping_from_sources(source)
-        # Convert to simple dict for JSON serialization
-        simple_mapping = {str(k): v.name for k, v in mapping.items()}
-        
-        # Ensure output directory exists
-        output.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(output, 'w', encoding='utf-8') as f:
-            json.dump(simple_mapping, f, indent=indent, ensure_ascii=False)
-        
-        if not quiet:
-            print(f"Updated item mapping with {len(mapping)} entries: {output}")
-        return 0
-    except Exception as e:
-        if not quiet:
-            print(f"Error updating item mapping: {e}")
-        return 1
+    from bpsr_labs.packet_decoder.cli.bpsr_update_skills import main as update_skills_main
+
+    return click.get_current_context().invoke(
+        update_skills_main,
+        source=source,
+        output=output,
+        indent=indent,
+        quiet=quiet,
+    )
+
+
+@main.group()
+def items() -> None:
+    """Look up items in the item name catalog."""
+
+
+@items.command('search')
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=10, show_default=True, help='Maximum number of results')
+@click.option('--mapping', 'mapping_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), help='Item mapping JSON or compiled catalog to search (default: bundled mapping)')
+@click.option('--json', 'as_json', is_flag=True, help='Emit JSON instead of a table')
+def items_search(query: tuple[str, ...], limit: int, mapping_path: Optional[Path], as_json: bool) -> int:
+    """Find item ids by partial or misspelled name.
+    
+    Every word of the query must start a word of the item name, so
+    ``wind ser`` finds "Wind Serum Lv.1". Misspellings fall back to
+    trigram matches, marked with ``~``.
+    
+    Args:
+        query: Words to search for.
+        limit: Maximum number of results.
+        mapping_path: Item mapping to search instead of the bundled one.
+        as_json: If True, emit JSON instead of a table.
+    
+    Returns:
+        int: Exit code (0 for success, 1 for error).
+    
+    Example:
+        >>> items_search(('wind', 'serum'), 10, None, False)
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_item_search import main as item_search_main
+
+    return click.get_current_context().invoke(
+        item_search_main,
+        query=query,
+        limit=limit,
+        mapping_path=mapping_path,
+        as_json=as_json,
+    )
+
+
+@main.command()
+@click.argument('captures', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--max-samples', type=int, default=8, help='Distinct payloads scored per method')
+@click.option('--min-score', type=float, default=0.9, help='Minimum mean score to accept a candidate')
+@click.option('--accept-ambiguous', is_flag=True, help='Also write winners that tie with their runner-up')
+@click.option('--dry-run', is_flag=True, help='Report discoveries without writing the mapping')
+@click.option('--mapping', type=click.Path(dir_okay=False, path_type=Path), default=None, help='combat_method_map.json to update (default: data/schemas/combat_method_map.json)')
+@click.option('--cache', 'cache_path', type=click.Path(dir_okay=False, path_type=Path), default=None, help='Trial score cache used for incremental runs (default: data/schemas/.combat_method_discovery_cache.json)')
+def discover_methods(
+    captures: tuple[Path, ...],
+    max_samples: int,
+    min_score: float,
+    accept_ambiguous: bool,
+    dry_run: bool,
+    mapping: Optional[Path],
+    cache_path: Optional[Path],
+) -> int:
+    """Discover message types for unmapped combat methods.
+    
+    Samples Notify payloads for every method id missing from
+    ``combat_method_map.json``, trial-parses them against the generated
+    protobuf modules and the bundled descriptor set, and records the best
+    scoring message type for each method. Trial results are cached so later
+    runs only parse new payloads.
+    
+    Args:
+        captures: One or more binary capture files to sample.
+        max_samples: Maximum distinct payloads scored per method.
+        min_score: Minimum mean score for a candidate to be accepted.
+        accept_ambiguous: If True, also write winners that tie with their
+            runner-up.
+        dry_run: If True, report results without updating the mapping.
+        mapping: Method mapping JSON to update.
+        cache_path: Trial score cache used for incremental runs.
+    
+    Returns:
+        int: Exit code (0 for success, 1 for error).
+    
+    Example:
+        >>> discover_methods((Path('combat.bin'),), 8, 0.9, False, False, None, None)
+        0
+    """
+    from bpsr_labs.packet_decoder.cli.bpsr_discover_methods import main as discover_main
+
+    options: dict[str, Path] = {}
+    if mapping is not None:
+        options['mapping'] = mapping
+    if cache_path is not None:
+        options['cache_path'] = cache_path
+    return click.get_current_context().invoke(
+        discover_main,
+        captures=captures,
+        max_samples=max_samples,
+        min_score=min_score,
+        accept_ambiguous=accept_ambiguous,
+        dry_run=dry_run,
+        **options,
+    )
 
 
 @main.command()
@@ -212,6 +573,7 @@ def info() -> None:
     click.echo("  Packet Decoder    - Decode and analyze combat packets")
     click.echo("  Trading Center    - Decode trading center listings")
     click.echo("  Item Mapping      - Update item name mappings")
+    click.echo("  Skill Mapping     - Update skill name mappings")
     click.echo("  Data Extractor    - Extract game data (coming soon)")
     click.echo("  Analytics Tools   - Statistical analysis (coming soon)")
     click.echo("  UI Tools          - Graphical applications (coming soon)")
@@ -220,7 +582,13 @@ def info() -> None:
     click.echo("  bpsr-labs decode input.bin output.jsonl")
     click.echo("  bpsr-labs dps output.jsonl summary.json")
     click.echo("  bpsr-labs trade-decode input.bin output.json")
+    click.echo("  bpsr-labs trade-batch captures/ merged.json")
+    click.echo("  bpsr-labs trade-ingest output.json")
+    click.echo("  bpsr-labs trade-query 1015091 --window 3600000")
     click.echo("  bpsr-labs update-items")
+    click.echo("  bpsr-labs update-skills")
+    click.echo("  bpsr-labs items search frostjade")
+    click.echo("  bpsr-labs discover-methods capture.bin")
     click.echo()
     click.echo("For more information, visit:")
     click.echo("  https://github.com/JordieB/bpsr-labs")
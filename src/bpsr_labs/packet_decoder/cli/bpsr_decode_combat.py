@@ -75,6 +75,9 @@ def main(capture: Path, output: Path, stats_out: Path | None, decoder_version: s
         },
         "sync_to_me_delta_info": method_hist.get(0x0000002E, 0),
     }
+    method_stats = getattr(decoder, "method_stats", None)
+    if callable(method_stats):
+        stats["method_routing"] = method_stats()
 
     if stats_out:
         stats_out.parent.mkdir(parents=True, exist_ok=True)
@@ -3,20 +3,97 @@
 from __future__ import annotations
 
 import json
+import sys
 from pathlib import Path
+from typing import Callable, Container, Iterator, Optional
 
 import click
 
 from bpsr_labs.packet_decoder.decoder.trading_center_decode import (
+    _DEFAULT_TYPEDEF_CACHE,
+    ListingTypedefCache,
+    Listing,
     consolidate,
     extract_listing_blocks,
+    iter_consolidated,
+    iter_frames_from_stream,
+    iter_listing_blocks,
 )
 from bpsr_labs.packet_decoder.decoder.trading_center_decode_v2 import TradingDecoderV2
-from bpsr_labs.packet_decoder.decoder.item_catalog import load_item_mapping
+from bpsr_labs.packet_decoder.decoder.item_catalog import (
+    ItemCatalogHandle,
+    load_item_mapping,
+    select_items,
+)
+from bpsr_labs.packet_decoder.decoder.watchlist import Watchlist
+
+
+def _warn_v2_unavailable(decoder: TradingDecoderV2) -> None:
+    detail = str(decoder.import_error) if decoder.import_error else "generated protobuf modules not found"
+    click.echo(
+        "Warning: TradingDecoderV2 unavailable "
+        f"({detail}). Run python scripts/generate_protos.py to compile the protobufs; "
+        "falling back to V1 decoder.",
+        err=True,
+    )
+
+
+def _stream(
+    capture: Path,
+    output: Path,
+    decoder_choice: str,
+    typedefs: ListingTypedefCache,
+    render: Callable[[Iterator[Listing]], Iterator[dict]],
+    quiet: bool,
+    item_filter: Optional[Container[int]] = None,
+) -> Optional[tuple[int, int]]:
+    """Decode *capture* incrementally, writing each rendered record as a JSON line.
+
+    Returns:
+        ``(listings decoded, lines written)``, or ``None`` after reporting an
+        error.
+    """
+    stdout = sys.stdout
+    decoded = 0
+    written = 0
+    source = sys.stdin.buffer if str(capture) == '-' else capture.open('rb')
+    sink = stdout if str(output) == '-' else None
+    try:
+        if sink is None:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            sink = output.open('w', encoding='utf-8')
+        frames = iter_frames_from_stream(source)
+        if decoder_choice == 'v2':
+            decoder = TradingDecoderV2()
+            if not decoder.available and not quiet:
+                _warn_v2_unavailable(decoder)
+            listings = decoder.iter_hybrid_listings(frames, typedefs, item_filter)
+        else:
+            listings = iter_listing_blocks(frames, typedefs, item_filter)
+
+        def counted() -> Iterator[Listing]:
+            nonlocal decoded
+            for listing in listings:
+                decoded += 1
+                yield listing
+
+        for record in render(counted()):
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sink.flush()
+            written += 1
+    except Exception as e:
+        click.echo(f"Error: Failed to decode trading center packets: {e}", err=True)
+        return None
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not None and sink is not stdout:
+            sink.close()
+    return decoded, written
 
 
 @click.command()
-@click.argument('capture', type=click.Path(exists=True, path_type=Path))
+@click.argument('capture', type=click.Path(exists=True, allow_dash=True, path_type=Path))
 @click.argument('output', type=click.Path(path_type=Path))
 @click.option('--no-item-names', is_flag=True, help='Skip item name resolution')
 @click.option('--quiet', is_flag=True, help='Suppress progress output')
@@ -28,57 +105,166 @@ from bpsr_labs.packet_decoder.decoder.item_catalog import load_item_mapping
     show_default=True,
     help='Select the trading center decoder implementation',
 )
+@click.option(
+    '--typedef-cache',
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=_DEFAULT_TYPEDEF_CACHE,
+    show_default=True,
+    help='Learned listing typedef reused by the V1 decoder across runs',
+)
+@click.option('--no-typedef-cache', is_flag=True, help='Do not load or save the learned V1 typedef')
+@click.option('--no-raw-entries', is_flag=True, help='Omit metadata.raw_entry from the output')
+@click.option(
+    '--format',
+    'output_format',
+    type=click.Choice(['json', 'ndjson'], case_sensitive=False),
+    default='json',
+    show_default=True,
+    help='json writes one indented array; ndjson streams one listing per line as decoded',
+)
+@click.option(
+    '--watchlist',
+    'watchlist_path',
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='Stream the capture and write NDJSON alerts for listings matching this watchlist',
+)
+@click.option(
+    '--category',
+    'categories',
+    type=int,
+    multiple=True,
+    help='Only decode listings for items of this ItemTable category (repeatable)',
+)
+@click.option('--min-rarity', type=int, help='Only decode listings for items of at least this rarity')
 def main(
     capture: Path,
     output: Path,
     no_item_names: bool,
     quiet: bool,
     decoder_version: str,
+    typedef_cache: Path,
+    no_typedef_cache: bool,
+    no_raw_entries: bool,
+    output_format: str = 'json',
+    watchlist_path: Optional[Path] = None,
+    categories: tuple[int, ...] = (),
+    min_rarity: Optional[int] = None,
 ) -> int:
-    """Decode BPSR trading center packets from a binary capture file."""
+    """Decode BPSR trading center packets from a binary capture file.
+
+    CAPTURE may be ``-`` to read from stdin. With ``--format ndjson`` the
+    capture is decoded as a stream and each unique listing is written to
+    OUTPUT (``-`` for stdout) as one JSON line the first time it is seen.
+    With ``--watchlist`` only listings matching the watchlist are streamed,
+    as alerts. ``--category``/``--min-rarity`` select items from the item
+    catalog up front; listings for other items are skipped while decoding.
+    """
+    from_stdin = str(capture) == '-'
     # Input validation
-    if not capture.exists():
+    if not from_stdin and not capture.exists():
         click.echo(f"Error: Capture file not found: {capture}", err=True)
         return 1
     
-    if capture.suffix.lower() not in ['.bin', '.dat', '.raw']:
+    if not from_stdin and capture.suffix.lower() not in ['.bin', '.dat', '.raw']:
         click.echo(f"Warning: File extension '{capture.suffix}' may not be a binary capture file", err=True)
     
-    # Check file size (limit to 100MB)
+    streaming = watchlist_path is not None or output_format.lower() == 'ndjson'
+    # Check file size (limit to 100MB); streaming modes have no limit
     max_size = 100 * 1024 * 1024
-    if capture.stat().st_size > max_size:
+    if not streaming and not from_stdin and capture.stat().st_size > max_size:
         click.echo(f"Error: File too large ({capture.stat().st_size} bytes). Maximum size: {max_size} bytes", err=True)
         return 1
 
     decoder_choice = decoder_version.lower()
+    typedefs = ListingTypedefCache(None if no_typedef_cache else typedef_cache)
+
+    item_filter = None
+    if categories or min_rarity is not None:
+        try:
+            item_filter = select_items(
+                load_item_mapping(), categories=categories or None, min_rarity=min_rarity
+            )
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return 1
+    not_found = (
+        "No trading center listings matched the item filter"
+        if item_filter is not None
+        else "No trading center listings found in capture file"
+    )
+
+    if watchlist_path is not None:
+        try:
+            watchlist = Watchlist.from_file(watchlist_path)
+        except (OSError, ValueError) as e:
+            click.echo(f"Error: {e}", err=True)
+            return 1
+        # Long-lived watchers pick up `update-items` runs without restarting
+        catalog = None if no_item_names else ItemCatalogHandle()
+        resolve = catalog.get if catalog else None
+        counts = _stream(
+            capture,
+            output,
+            decoder_choice,
+            typedefs,
+            lambda listings: (alert.to_dict() for alert in watchlist.alerts(listings, resolve)),
+            quiet,
+            item_filter,
+        )
+        if counts is None:
+            return 1
+        if not quiet:
+            click.echo(
+                f"Checked {counts[0]} listings against {len(watchlist)} watch rules, {counts[1]} alerts",
+                err=True,
+            )
+        return 0
+
+    if streaming:
+        catalog = None
+        if not no_item_names:
+            catalog = ItemCatalogHandle()
+            if not catalog and not quiet:
+                click.echo("Warning: Item name mapping not found; output will include item IDs only", err=True)
+        resolve = catalog.get if catalog else None
+        counts = _stream(
+            capture,
+            output,
+            decoder_choice,
+            typedefs,
+            lambda listings: iter_consolidated(listings, resolver=resolve, include_raw=not no_raw_entries),
+            quiet,
+            item_filter,
+        )
+        if counts is None:
+            return 1
+        if not counts[0]:
+            click.echo(not_found, err=True)
+            return 1
+        if not quiet:
+            click.echo(f"Decoded {counts[0]} listings, {counts[1]} unique entries", err=True)
+            if str(output) != '-':
+                click.echo(f"Output written to: {output}", err=True)
+        return 0
+
     try:
-        raw = capture.read_bytes()
+        raw = sys.stdin.buffer.read() if from_stdin else capture.read_bytes()
         if decoder_choice == 'v2':
             decoder = TradingDecoderV2()
-            listings = decoder.decode_listings(raw)
-            if not decoder.available:
-                if not quiet:
-                    detail = str(decoder.import_error) if decoder.import_error else "generated protobuf modules not found"
-                    click.echo(
-                        "Warning: TradingDecoderV2 unavailable "
-                        f"({detail}). Run python scripts/generate_protos.py to compile the protobufs; "
-                        "falling back to V1 decoder.",
-                        err=True,
-                    )
-                listings = extract_listing_blocks(raw)
-                decoder_choice = 'v1'
-            elif not listings:
-                # Fall back to the heuristic decoder if the protobuf path fails to decode frames.
-                listings = extract_listing_blocks(raw)
-                decoder_choice = 'v1'
+            if not decoder.available and not quiet:
+                _warn_v2_unavailable(decoder)
+            # Segments the protobuf schema rejects fall back to the heuristic decoder in the same pass.
+            listings = decoder.decode_hybrid(raw, typedefs, item_filter)
+            sources = sorted({listing.source for listing in listings if listing.source}, reverse=True)
+            decoder_choice = '+'.join(sources) if sources else 'v2'
         else:
-            listings = extract_listing_blocks(raw)
+            listings = extract_listing_blocks(raw, typedefs, item_filter)
     except Exception as e:
         click.echo(f"Error: Failed to decode trading center packets: {e}", err=True)
         return 1
 
     if not listings:
-        click.echo("No trading center listings found in capture file", err=True)
+        click.echo(not_found, err=True)
         return 1
 
     # Load item mapping if requested
@@ -92,7 +278,11 @@ def main(
         return mapping.get(item_id) if mapping else None
 
     # Consolidate and deduplicate listings
-    consolidated = consolidate(listings, resolver=resolver if mapping else None)
+    consolidated = consolidate(
+        listings,
+        resolver=resolver if mapping else None,
+        include_raw=not no_raw_entries,
+    )
 
     # Write output
     output.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,66 @@
+"""CLI that discovers static message classes for unmapped combat methods."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.method_discovery import (
+    _DEFAULT_CACHE_PATH,
+    _DEFAULT_MAPPING_PATH,
+    MethodDiscovery,
+)
+
+
+@click.command()
+@click.argument('captures', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--mapping', type=click.Path(dir_okay=False, path_type=Path), default=_DEFAULT_MAPPING_PATH, show_default=True, help='combat_method_map.json to update')
+@click.option('--cache', 'cache_path', type=click.Path(dir_okay=False, path_type=Path), default=_DEFAULT_CACHE_PATH, show_default=True, help='Trial score cache used for incremental runs')
+@click.option('--max-samples', type=int, default=8, show_default=True, help='Distinct payloads scored per method')
+@click.option('--min-score', type=float, default=0.9, show_default=True, help='Minimum mean score to accept a candidate')
+@click.option('--accept-ambiguous', is_flag=True, help='Also write winners that tie with their runner-up')
+@click.option('--dry-run', is_flag=True, help='Report discoveries without writing the mapping')
+def main(
+    captures: tuple[Path, ...],
+    mapping: Path,
+    cache_path: Path,
+    max_samples: int,
+    min_score: float,
+    accept_ambiguous: bool,
+    dry_run: bool,
+) -> int:
+    """Map unknown combat method ids to protobuf message types."""
+    try:
+        discovery = MethodDiscovery(
+            mapping_path=mapping,
+            cache_path=cache_path,
+            max_samples=max_samples,
+            min_score=min_score,
+        )
+        results = discovery.discover(list(captures))
+    except Exception as e:
+        click.echo(f"Error: Method discovery failed: {e}", err=True)
+        return 1
+
+    if not results:
+        click.echo("No unmapped methods found in the supplied captures", err=True)
+        return 0
+
+    for result in results:
+        name = result.best.full_name if result.best else "-"
+        note = " (ambiguous)" if result.ambiguous else ""
+        click.echo(
+            f"0x{result.method_id:08x}  samples={result.samples:<3} "
+            f"score={result.score:.3f} runner_up={result.runner_up_score:.3f}  {name}{note}"
+        )
+
+    if dry_run:
+        return 0
+    added = discovery.write_mapping(results, include_ambiguous=accept_ambiguous)
+    click.echo(f"Added {added} method(s) to {mapping}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
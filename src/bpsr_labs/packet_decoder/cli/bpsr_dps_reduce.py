@@ -8,13 +8,19 @@ from pathlib import Path
 import click
 
 from bpsr_labs.packet_decoder.decoder.combat_reduce import reduce_file
+from bpsr_labs.packet_decoder.decoder.skill_catalog import load_skill_mapping
 
 
 @click.command()
 @click.argument('decoded', type=click.Path(exists=True, path_type=Path))
 @click.argument('output', type=click.Path(path_type=Path))
-def main(decoded: Path, output: Path) -> int:
-    """Reduce decoded combat JSONL into a DPS summary."""
+@click.option('--no-skill-names', is_flag=True, help='Skip skill name resolution')
+def main(decoded: Path, output: Path, no_skill_names: bool = False) -> int:
+    """Reduce decoded combat JSONL into a DPS summary.
+
+    Skills are named from the skill catalog (see ``update-skills``) when one
+    is available.
+    """
     # Input validation
     if not decoded.exists():
         click.echo(f"Error: Input file not found: {decoded}", err=True)
@@ -29,8 +35,10 @@ def main(decoded: Path, output: Path) -> int:
         click.echo(f"Error: File too large ({decoded.stat().st_size} bytes). Maximum size: {max_size} bytes", err=True)
         return 1
 
+    skill_mapping = None if no_skill_names else load_skill_mapping()
+
     try:
-        summary = reduce_file(decoded, output)
+        summary = reduce_file(decoded, output, skill_mapping=skill_mapping or None)
         click.echo(json.dumps(summary, indent=2))
         return 0
     except Exception as e:
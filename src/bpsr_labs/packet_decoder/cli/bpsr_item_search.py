@@ -0,0 +1,50 @@
+"""CLI that looks up item ids by (partial or misspelled) name."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import load_item_mapping
+from bpsr_labs.packet_decoder.decoder.item_search import load_search_index
+
+
+@click.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=10, show_default=True, help='Maximum number of results')
+@click.option('--mapping', 'mapping_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), help='Item mapping JSON or compiled catalog to search (default: bundled mapping)')
+@click.option('--json', 'as_json', is_flag=True, help='Emit JSON instead of a table')
+def main(query: tuple[str, ...], limit: int, mapping_path: Optional[Path], as_json: bool) -> int:
+    """Find items whose names match QUERY.
+
+    Every word of QUERY must start a word of the item name; misspelled
+    names fall back to fuzzy matches, marked with ``~``. A numeric QUERY
+    also matches that item id.
+    """
+    mapping = load_item_mapping([mapping_path]) if mapping_path is not None else None
+    if mapping is not None and not mapping:
+        click.echo(f"Error: No items found in {mapping_path}", err=True)
+        return 1
+    index = load_search_index(mapping)
+    if not len(index):
+        click.echo("Error: Item name mapping not found; run 'bpsr-labs update-items' first", err=True)
+        return 1
+
+    hits = index.search(" ".join(query), limit=limit)
+    if as_json:
+        click.echo(json.dumps([hit.to_dict() for hit in hits], indent=2, ensure_ascii=False))
+        return 0
+    if not hits:
+        click.echo(f"No items match {' '.join(query)!r}", err=True)
+        return 0
+    for hit in hits:
+        marker = "~" if hit.fuzzy else " "
+        click.echo(f"{hit.item_id:>10} {marker} {hit.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""CLI that decodes a batch of trading center captures into one merged file."""
+
+from __future__ import annotations
+
+import glob
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import load_item_mapping, select_items
+from bpsr_labs.packet_decoder.decoder.trade_batch import decode_captures
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import (
+    _DEFAULT_TYPEDEF_CACHE,
+    ListingTypedefCache,
+)
+
+_CAPTURE_SUFFIXES = ('.bin', '.dat', '.raw')
+
+
+def _expand_inputs(inputs: tuple[str, ...]) -> List[Path]:
+    """Expand directories and glob patterns into a sorted, de-duplicated file list."""
+    paths: List[Path] = []
+    for spec in inputs:
+        candidate = Path(spec)
+        if candidate.is_dir():
+            paths.extend(p for p in candidate.iterdir() if p.is_file() and p.suffix.lower() in _CAPTURE_SUFFIXES)
+        elif glob.has_magic(spec):
+            paths.extend(Path(p) for p in glob.glob(spec, recursive=True) if Path(p).is_file())
+        elif candidate.is_file():
+            paths.append(candidate)
+        else:
+            raise click.BadParameter(f"No such file, directory or pattern match: {spec}", param_hint='INPUTS')
+    return sorted(set(paths))
+
+
+@click.command()
+@click.argument('inputs', nargs=-1, required=True)
+@click.argument('output', type=click.Path(dir_okay=False, path_type=Path))
+@click.option('--workers', type=click.IntRange(min=1), default=None, help='Worker processes (default: CPU count)')
+@click.option(
+    '--decoder',
+    'decoder_version',
+    type=click.Choice(['v1', 'v2'], case_sensitive=False),
+    default='v2',
+    show_default=True,
+    help='Select the trading center decoder implementation',
+)
+@click.option(
+    '--typedef-cache',
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=_DEFAULT_TYPEDEF_CACHE,
+    show_default=True,
+    help='Learned listing typedef shared with every worker',
+)
+@click.option('--no-typedef-cache', is_flag=True, help='Do not load or save the learned V1 typedef')
+@click.option('--no-item-names', is_flag=True, help='Skip item name resolution')
+@click.option('--no-raw-entries', is_flag=True, help='Omit metadata.raw_entry from the output')
+@click.option(
+    '--format',
+    'output_format',
+    type=click.Choice(['json', 'ndjson'], case_sensitive=False),
+    default='json',
+    show_default=True,
+    help='Merged output as one indented array or one listing per line',
+)
+@click.option(
+    '--summary',
+    'summary_path',
+    type=click.Path(dir_okay=False, path_type=Path),
+    help='Per-capture summary JSON (default: OUTPUT with a .summary.json suffix)',
+)
+@click.option(
+    '--category',
+    'categories',
+    type=int,
+    multiple=True,
+    help='Only decode listings for items of this ItemTable category (repeatable)',
+)
+@click.option('--min-rarity', type=int, help='Only decode listings for items of at least this rarity')
+@click.option('--quiet', is_flag=True, help='Suppress progress output')
+def main(
+    inputs: tuple[str, ...],
+    output: Path,
+    workers: Optional[int],
+    decoder_version: str,
+    typedef_cache: Path,
+    no_typedef_cache: bool,
+    no_item_names: bool,
+    no_raw_entries: bool,
+    output_format: str,
+    summary_path: Optional[Path],
+    quiet: bool,
+    categories: tuple[int, ...] = (),
+    min_rarity: Optional[int] = None,
+) -> int:
+    """Decode every capture in INPUTS in parallel and merge them into OUTPUT.
+
+    INPUTS may be capture files, directories (their .bin/.dat/.raw files) or
+    glob patterns. Listings are deduplicated across captures; each keeps the
+    name of the first capture it appeared in as ``metadata.capture``.
+    ``--category``/``--min-rarity`` restrict every worker to the matching items.
+    """
+    captures = _expand_inputs(inputs)
+    if not captures:
+        click.echo("Error: No capture files matched INPUTS", err=True)
+        return 1
+
+    include_raw = not no_raw_entries
+    item_filter = None
+    if categories or min_rarity is not None:
+        try:
+            item_filter = select_items(
+                load_item_mapping(), categories=categories or None, min_rarity=min_rarity
+            )
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return 1
+    # One mapping load for the whole batch; workers attach to it through shared memory
+    mapping = None
+    if not no_item_names:
+        mapping = load_item_mapping()
+        if not mapping and not quiet:
+            click.echo("Warning: Item name mapping not found; output will include item IDs only", err=True)
+
+    typedefs = ListingTypedefCache(None if no_typedef_cache else typedef_cache)
+    batch = decode_captures(
+        captures,
+        decoder_version=decoder_version.lower(),
+        typedef_cache=typedefs,
+        include_raw=include_raw,
+        max_workers=workers,
+        item_mapping=mapping or None,
+        item_filter=item_filter,
+    )
+    merged = batch.merged(include_raw=include_raw)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as handle:
+        if output_format.lower() == 'ndjson':
+            for payload in merged:
+                handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        else:
+            json.dump(list(merged), handle, indent=2, ensure_ascii=False)
+
+    summaries = [summary.to_dict() for summary in batch.summaries]
+    summary_path = summary_path or output.with_name(f"{output.stem}.summary.json")
+    summary_path.write_text(json.dumps(summaries, indent=2), encoding="utf-8")
+
+    failed = [summary for summary in batch.summaries if summary.error is not None]
+    for summary in failed:
+        click.echo(f"Error: Failed to decode {summary.capture}: {summary.error}", err=True)
+    if not quiet:
+        for summary in batch.summaries:
+            if summary.error is None:
+                click.echo(
+                    f"{summary.capture.name}: {summary.listings} listings, "
+                    f"{summary.unique} unique, {summary.new} new"
+                )
+        total = sum(summary.new for summary in batch.summaries)
+        click.echo(f"Merged {total} unique listings from {len(captures) - len(failed)}/{len(captures)} captures")
+        click.echo(f"Output written to: {output}")
+        click.echo(f"Summary written to: {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""CLI that loads decoded trading center listings into the market history store."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.market_store import (
+    _DEFAULT_DB_PATH,
+    MarketStore,
+    parse_timestamp_ms,
+)
+
+
+def _read_listings(path: Path) -> Iterator[dict]:
+    """Yield listings from a ``trade-decode`` JSON array or NDJSON file.
+
+    NDJSON files are read line by line, so they never have to fit in memory.
+    """
+    with path.open(encoding="utf-8") as handle:
+        head = handle.read(1)
+        while head.isspace():
+            head = handle.read(1)
+        if head == "[":
+            handle.seek(0)
+            listings = json.load(handle)
+            if not isinstance(listings, list):
+                raise ValueError("expected a JSON list of listings")
+            yield from listings
+            return
+        if head != "{" and head:
+            raise ValueError("expected a JSON list or one listing object per line")
+        handle.seek(0)
+        for line_no, line in enumerate(handle, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {line_no}: {e}") from None
+
+
+@click.command()
+@click.argument('inputs', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option('--db', 'db_path', type=click.Path(dir_okay=False, path_type=Path), default=_DEFAULT_DB_PATH, show_default=True, help='SQLite market history database')
+@click.option('--capture-id', help='Capture identifier (default: input file stem; single input only)')
+@click.option('--observed-at', help='Observation time as epoch ms or ISO-8601 (default: input file mtime)')
+@click.option('--quiet', is_flag=True, help='Suppress progress output')
+def main(
+    inputs: tuple[Path, ...],
+    db_path: Path,
+    capture_id: Optional[str],
+    observed_at: Optional[str],
+    quiet: bool,
+) -> int:
+    """Ingest trade-decode JSON or NDJSON output into the market history database."""
+    if capture_id is not None and len(inputs) > 1:
+        click.echo("Error: --capture-id can only be used with a single input", err=True)
+        return 1
+    try:
+        fixed_time = parse_timestamp_ms(observed_at) if observed_at is not None else None
+    except ValueError as e:
+        click.echo(f"Error: Invalid --observed-at value: {e}", err=True)
+        return 1
+
+    with MarketStore(db_path) as store:
+        for path in inputs:
+            try:
+                result = store.ingest(
+                    _read_listings(path),
+                    capture_id=capture_id or path.stem,
+                    observed_at=fixed_time if fixed_time is not None else int(path.stat().st_mtime * 1000),
+                )
+            except Exception as e:
+                click.echo(f"Error: Failed to ingest {path}: {e}", err=True)
+                return 1
+            if not quiet:
+                click.echo(
+                    f"{path}: {result.inserted} new, {result.duplicates} already stored, "
+                    f"{result.skipped} without item id"
+                )
+
+    if not quiet:
+        click.echo(f"Market history: {db_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""CLI that reports windowed price statistics from the market history store."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.market_store import (
+    _DEFAULT_DB_PATH,
+    MarketStore,
+    parse_timestamp_ms,
+)
+
+
+@click.command()
+@click.argument('item_id', type=int)
+@click.option('--db', 'db_path', type=click.Path(exists=True, dir_okay=False, path_type=Path), default=_DEFAULT_DB_PATH, show_default=True, help='SQLite market history database')
+@click.option('--window', 'window_ms', type=click.IntRange(min=1), default=3_600_000, show_default=True, help='Bucket width in milliseconds')
+@click.option('--since', help='Inclusive start as epoch ms or ISO-8601')
+@click.option('--until', help='Exclusive end as epoch ms or ISO-8601')
+@click.option('--json', 'as_json', is_flag=True, help='Emit JSON instead of a table')
+def main(
+    item_id: int,
+    db_path: Path,
+    window_ms: int,
+    since: Optional[str],
+    until: Optional[str],
+    as_json: bool,
+) -> int:
+    """Show min, median and VWAP prices for ITEM_ID per time window."""
+    try:
+        since_ms = parse_timestamp_ms(since) if since is not None else None
+        until_ms = parse_timestamp_ms(until) if until is not None else None
+    except ValueError as e:
+        click.echo(f"Error: Invalid time bound: {e}", err=True)
+        return 1
+
+    with MarketStore(db_path) as store:
+        windows = store.price_windows(item_id, window_ms, since=since_ms, until=until_ms)
+
+    if as_json:
+        click.echo(json.dumps([window.to_dict() for window in windows], indent=2))
+        return 0
+    if not windows:
+        click.echo(f"No listings stored for item {item_id}", err=True)
+        return 0
+
+    click.echo(f"{'window start (UTC)':<20} {'listings':>8} {'volume':>10} {'min':>10} {'median':>10} {'vwap':>10}")
+    for window in windows:
+        start = datetime.fromtimestamp(window.start_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        vwap = f"{window.vwap:.1f}" if window.vwap is not None else "-"
+        click.echo(
+            f"{start:<20} {window.listings:>8} {window.volume:>10} {window.min_price:>10} "
+            f"{window.median_price:>10.1f} {vwap:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    main()
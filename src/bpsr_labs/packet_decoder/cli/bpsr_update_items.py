@@ -7,11 +7,12 @@ from pathlib import Path
 
 import click
 
+from bpsr_labs.packet_decoder.decoder.item_catalog import ITEM_COLUMNS
 from bpsr_labs.packet_decoder.decoder.update_item_mapping import (
-    _iter_candidate_files,
-    _serialize,
-    build_mapping_from_sources,
     DEFAULT_SOURCE_ROOTS,
+    log_update,
+    parse_columns,
+    update_item_catalog,
 )
 
 LOGGER = logging.getLogger(__name__)
@@ -41,41 +42,44 @@ LOGGER = logging.getLogger(__name__)
     is_flag=True,
     help='Suppress informational logging output'
 )
-def main(source: tuple[Path, ...], output: Path, indent: int, quiet: bool) -> int:
-    """Regenerate the item id → name mapping from Star Resonance data dumps."""
+@click.option(
+    '--force',
+    is_flag=True,
+    help='Re-parse every source and rewrite the outputs, ignoring the manifest'
+)
+@click.option(
+    '--columns',
+    default=','.join(ITEM_COLUMNS),
+    show_default=True,
+    help='Comma-separated ItemTable columns to keep; empty for names only'
+)
+def main(
+    source: tuple[Path, ...],
+    output: Path,
+    indent: int,
+    quiet: bool,
+    force: bool,
+    columns: str,
+) -> int:
+    """Regenerate the item id → name mapping from Star Resonance data dumps.
+
+    Only sources that changed since the last run (per the manifest written
+    next to OUTPUT) are parsed again. Rarity, category and stack size are
+    kept alongside the names unless --columns says otherwise.
+    """
     
     # Setup logging
     logging.basicConfig(level=logging.INFO if not quiet else logging.WARNING)
     
-    # Determine source paths
     source_roots = source if source else DEFAULT_SOURCE_ROOTS
-    candidates = list(_iter_candidate_files(source_roots))
-    
-    if not candidates:
-        LOGGER.error("No candidate files discovered under: %s", ", ".join(str(p) for p in source_roots))
+    try:
+        result = update_item_catalog(
+            source_roots, output, indent=indent, force=force, columns=parse_columns(columns)
+        )
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
         return 1
-
-    LOGGER.info("Discovered %d candidate file(s)", len(candidates))
-    
-    # Build mapping
-    mapping = build_mapping_from_sources(candidates)
-    if not mapping:
-        LOGGER.error("Failed to construct mapping from candidates. Check source data integrity.")
-        return 1
-
-    LOGGER.info("Compiled %d unique item entries", len(mapping))
-
-    # Validate output path
-    if output.exists() and output.is_dir():
-        LOGGER.error("Output path %s is a directory", output)
-        return 1
-    
-    # Write output
-    output.parent.mkdir(parents=True, exist_ok=True)
-    payload = _serialize(mapping, indent=indent)
-    output.write_text(payload, encoding="utf-8")
-    LOGGER.info("Wrote mapping to %s", output)
-    
+    log_update(result)
     return 0
 
 
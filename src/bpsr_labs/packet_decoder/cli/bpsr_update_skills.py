@@ -0,0 +1,64 @@
+"""CLI for updating skill name mappings from Star Resonance data."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import click
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import COMPILED_SUFFIX
+from bpsr_labs.packet_decoder.decoder.skill_catalog import (
+    DEFAULT_SOURCE_ROOTS,
+    update_skill_catalog,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option(
+    '--source', '-s',
+    type=click.Path(exists=True, path_type=Path),
+    multiple=True,
+    help='Directory or file to scan for Star Resonance skill tables'
+)
+@click.option(
+    '--output', '-o',
+    type=click.Path(path_type=Path),
+    default=Path('data/game-data/skill_name_map.json'),
+    help='Destination path for the generated mapping'
+)
+@click.option(
+    '--indent',
+    type=int,
+    default=2,
+    help='Indentation level for the JSON output'
+)
+@click.option(
+    '--quiet',
+    is_flag=True,
+    help='Suppress informational logging output'
+)
+def main(source: tuple[Path, ...], output: Path, indent: int, quiet: bool) -> int:
+    """Regenerate the skill id → name mapping from Star Resonance data dumps.
+
+    A compiled copy is written next to OUTPUT with a ``.bin`` suffix.
+    """
+
+    logging.basicConfig(level=logging.INFO if not quiet else logging.WARNING)
+
+    source_roots = source if source else DEFAULT_SOURCE_ROOTS
+    try:
+        mapping = update_skill_catalog(source_roots, output, indent=indent)
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
+        return 1
+    LOGGER.info("Compiled %d unique skill entries", len(mapping))
+    LOGGER.info("Wrote mapping to %s", output)
+    LOGGER.info("Wrote compiled catalog to %s", output.with_suffix(COMPILED_SUFFIX))
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,22 @@
-"""Packet decoder module exports for combat and trading decoders."""
+"""Packet decoder module exports for combat and trading decoders.
 
-from .combat_decode import CombatDecoder, FrameReader
-from .combat_decode_v2 import CombatDecoderV2
-from .combat_reduce import CombatReducer, reduce_file
-from .framing import FrameReader as FramingReader, NotifyFrame
-from .trading_center_decode import Listing, consolidate, extract_listing_blocks
-from .trading_center_decode_v2 import TradingDecoderV2
+Exports are resolved lazily so importing a single submodule (for example
+``combat_reduce`` from the ``dps`` command) does not drag in protobuf,
+zstandard and blackboxprotobuf.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover - static imports for type checkers only
+    from .combat_decode import CombatDecoder, FrameReader
+    from .combat_decode_v2 import CombatDecoderV2
+    from .combat_reduce import CombatReducer, reduce_file
+    from .framing import FrameReader as FramingReader, NotifyFrame
+    from .trading_center_decode import Listing, consolidate, extract_listing_blocks
+    from .trading_center_decode_v2 import TradingDecoderV2
 
 __all__ = [
     "CombatDecoder",
@@ -20,3 +31,30 @@ __all__ = [
     "consolidate",
     "extract_listing_blocks",
 ]
+
+_EXPORTS: dict[str, tuple[str, str]] = {
+    "CombatDecoder": (".combat_decode", "CombatDecoder"),
+    "CombatDecoderV2": (".combat_decode_v2", "CombatDecoderV2"),
+    "FrameReader": (".combat_decode", "FrameReader"),
+    "CombatReducer": (".combat_reduce", "CombatReducer"),
+    "reduce_file": (".combat_reduce", "reduce_file"),
+    "FramingReader": (".framing", "FrameReader"),
+    "NotifyFrame": (".framing", "NotifyFrame"),
+    "TradingDecoderV2": (".trading_center_decode_v2", "TradingDecoderV2"),
+    "Listing": (".trading_center_decode", "Listing"),
+    "consolidate": (".trading_center_decode", "consolidate"),
+    "extract_listing_blocks": (".trading_center_decode", "extract_listing_blocks"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _EXPORTS[name]
+    value = getattr(import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,485 @@
+"""Compiled id → name catalog format shared by the item and skill catalogs.
+
+Both catalogs are merged from JSON dumps (streamed with
+:func:`iter_json_object`) and compiled into the same binary layout: sorted
+int64 ids, name and icon offset tables, optional int32 columns and one
+UTF-8 blob. :class:`CompiledCatalog` reads that layout in place from an
+mmap or shared memory; each catalog subclasses it with its own magic and
+record type. Records only need a ``name`` and an ``icon``
+(:class:`CatalogRecord`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import operator
+import os
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from collections import ChainMap
+from collections.abc import Mapping
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Protocol,
+    Self,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - only needed for annotations
+    from multiprocessing.shared_memory import SharedMemory
+
+__all__ = [
+    "COLUMN_MISSING",
+    "COMPILED_SUFFIX",
+    "CatalogRecord",
+    "CompiledCatalog",
+    "compiled_parts",
+    "iter_candidate_files",
+    "iter_json_object",
+    "merge_sources",
+    "open_compiled_sibling",
+    "segment_buffer",
+    "write_parts",
+]
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CatalogRecord(Protocol):
+    """What a record needs to be stored in a compiled catalog."""
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def icon(self) -> Optional[str]: ...
+
+
+RecordT = TypeVar("RecordT", bound=CatalogRecord)
+CatalogT = TypeVar("CatalogT", bound="CompiledCatalog[Any]")
+
+
+_JSON_CHUNK_CHARS = 1 << 16
+_JSON_WHITESPACE = " \t\n\r"
+_JSON_NUMBER_CHARS = "0123456789+-.eE"
+_JSON_DECODER = json.JSONDecoder()
+
+
+def iter_json_object(path: Path, chunk_chars: int = _JSON_CHUNK_CHARS) -> Iterator[tuple[str, object]]:
+    """Yield the top-level ``(key, value)`` pairs of a JSON object file one at a time.
+
+    Only the current entry and one read chunk are held in memory, rather
+    than the whole text and the fully parsed document. A file whose top
+    level is not an object yields nothing.
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+
+    with path.open("r", encoding="utf-8") as handle:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            """Append a chunk, dropping what was consumed; False at EOF."""
+            nonlocal buffer, pos, eof
+            chunk = handle.read(chunk_chars)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            return not eof
+
+        def skip_whitespace() -> None:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        def decode() -> object:
+            """Decode the value at *pos*, reading more until it is complete."""
+            nonlocal pos
+            while True:
+                try:
+                    value, end = _JSON_DECODER.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    continue
+                # A number cut at the chunk edge ("-0" of "-0.5") decodes early
+                if eof or (end < len(buffer) and buffer[end] not in _JSON_NUMBER_CHARS):
+                    pos = end
+                    return value
+                fill()
+
+        def expect(chars: str) -> str:
+            skip_whitespace()
+            if pos >= len(buffer) or buffer[pos] not in chars:
+                raise json.JSONDecodeError(f"Expecting one of {chars!r}", buffer, pos)
+            return buffer[pos]
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != "{":
+            decode()  # non-object documents hold no entries but must still be valid JSON
+            return
+        pos += 1
+        if expect('"}') == '"':
+            while True:
+                key = str(decode())  # object keys are always JSON strings
+                expect(":")
+                pos += 1
+                skip_whitespace()
+                yield key, decode()
+                if expect(",}") == "}":
+                    break
+                pos += 1
+                expect('"')
+        pos += 1
+        skip_whitespace()
+        if pos < len(buffer):
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+
+
+# magic, version, record count, blob length; followed by int64 ids, two uint32
+# offset tables of count + 1 entries (names, icons), the column directory and
+# the UTF-8 blob. Version 1 files have no column directory.
+_COMPILED_HEADER = struct.Struct("<8sIIQ")
+_COMPILED_VERSION = 2
+_COMPILED_VERSIONS = (1, _COMPILED_VERSION)
+# column count (+ padding); then per column a name and int32[count], each
+# array padded to 8 bytes. COLUMN_MISSING marks records without a value.
+_COLUMN_DIRECTORY = struct.Struct("<I4x")
+_COLUMN_NAME = struct.Struct("<16s")
+COLUMN_MISSING = -(1 << 31)
+COMPILED_SUFFIX = ".bin"
+
+
+class CompiledCatalog(Mapping[int, RecordT], ABC):
+    """Read-only id → record mapping backed by a compiled catalog buffer.
+
+    Lookups binary-search the id array in place and decode only the
+    requested name, so opening a catalog costs no parsing regardless of its
+    size. Instances behave like ``dict[int, RecordT]`` for reading.
+
+    Concrete catalogs set :attr:`MAGIC`, which keeps catalogs of different
+    tables apart, and build their record type in :meth:`_make_record`; a
+    subclass missing either cannot be instantiated.
+
+    Args:
+        buffer: Compiled catalog bytes, e.g. an :class:`mmap.mmap`.
+
+    Raises:
+        ValueError: If *buffer* is not a compiled catalog of this version.
+    """
+
+    @property
+    @abstractmethod
+    def MAGIC(self) -> bytes:
+        """Eight-byte tag identifying the catalog kind; override as a class attribute."""
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> None:
+        if sys.byteorder != "little":
+            raise ValueError("Compiled catalogs are only supported on little-endian hosts")
+        if len(buffer) < _COMPILED_HEADER.size:
+            raise ValueError("Truncated compiled catalog")
+        magic, version, count, blob_size = _COMPILED_HEADER.unpack_from(buffer)
+        if magic != self.MAGIC or version not in _COMPILED_VERSIONS:
+            raise ValueError("Not a compiled catalog of this kind (or unsupported version)")
+        ids_end = _COMPILED_HEADER.size + 8 * count
+        names_end = ids_end + 4 * (count + 1)
+        icons_end = names_end + 4 * (count + 1)
+        view = memoryview(buffer)
+        column_spans: list[tuple[str, int]] = []
+        blob_start = icons_end
+        if version >= 2:
+            if len(buffer) < icons_end + _COLUMN_DIRECTORY.size:
+                raise ValueError("Truncated compiled catalog")
+            (column_count,) = _COLUMN_DIRECTORY.unpack_from(buffer, icons_end)
+            blob_start += _COLUMN_DIRECTORY.size
+            column_size = (4 * count + 7) & ~7
+            for _ in range(column_count):
+                if len(buffer) < blob_start + _COLUMN_NAME.size:
+                    raise ValueError("Truncated compiled catalog")
+                (raw_name,) = _COLUMN_NAME.unpack_from(buffer, blob_start)
+                blob_start += _COLUMN_NAME.size
+                column_spans.append((raw_name.rstrip(b"\0").decode("ascii"), blob_start))
+                blob_start += column_size
+        if len(buffer) < blob_start + blob_size:
+            raise ValueError("Truncated compiled catalog")
+        self._buffer: Optional[Union[bytes, bytearray, memoryview, mmap.mmap]] = buffer
+        self._view = view
+        self._ids = view[_COMPILED_HEADER.size:ids_end].cast("q")
+        self._names = view[ids_end:names_end].cast("I")
+        self._icons = view[names_end:icons_end].cast("I")
+        self._columns = {
+            name: view[start:start + 4 * count].cast("i") for name, start in column_spans
+        }
+        self._blob = view[blob_start:blob_start + blob_size]
+        self._count: int = count
+        self._segment: Optional[SharedMemory] = None
+
+    @classmethod
+    def attach_shared(cls, name: str) -> Self:
+        """Attach read-only to a catalog published in shared memory segment *name*.
+
+        See :class:`~bpsr_labs.packet_decoder.decoder.item_catalog.SharedItemCatalog`.
+        """
+
+        from multiprocessing import shared_memory
+
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            catalog = cls(segment_buffer(segment))
+        except ValueError:
+            segment.close()
+            raise
+        catalog._segment = segment
+        return catalog
+
+    @classmethod
+    def open(cls, path: Path) -> Self:
+        """Memory-map the compiled catalog at *path*."""
+
+        with open(path, "rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                raise ValueError(f"Empty compiled catalog: {path}")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped)
+        except ValueError:
+            mapped.close()
+            raise
+
+    def close(self) -> None:
+        """Release the views and close the underlying mmap or shared memory, if any."""
+
+        for view in (self._ids, self._names, self._icons, *self._columns.values(), self._blob, self._view):
+            view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._segment is not None:
+            self._buffer = None
+            self._segment.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _index(self, record_id: Any) -> int:
+        try:
+            record_id = operator.index(record_id)
+        except TypeError:
+            return -1
+        ids = self._ids
+        index = bisect_left(ids, record_id)
+        if index < self._count and ids[index] == record_id:
+            return index
+        return -1
+
+    def _text(self, offsets: memoryview, index: int) -> str:
+        return str(self._blob[offsets[index]:offsets[index + 1]], "utf-8")
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Names of the integer columns stored in this catalog."""
+
+        return tuple(self._columns)
+
+    def column(self, name: str) -> Optional[memoryview]:
+        """Return column *name* as an int32 view aligned with the sorted ids.
+
+        Records without a value hold :data:`COLUMN_MISSING`. Returns ``None`` when the
+        catalog was compiled without that column.
+        """
+
+        return self._columns.get(name)
+
+    def __getitem__(self, record_id: int) -> RecordT:
+        index = self._index(record_id)
+        if index < 0:
+            raise KeyError(record_id)
+        icon = self._text(self._icons, index)
+        extras: dict[str, int] = {}
+        for name, values in self._columns.items():
+            value = values[index]
+            if value != COLUMN_MISSING:
+                extras[name] = value
+        return self._make_record(self._ids[index], self._text(self._names, index), icon or None, extras)
+
+    @abstractmethod
+    def _make_record(self, record_id: int, name: str, icon: Optional[str], columns: dict[str, int]) -> RecordT:
+        """Build the record for one entry; *columns* holds its set column values."""
+
+    def __contains__(self, record_id: object) -> bool:
+        return self._index(record_id) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+
+def compiled_parts(
+    mapping: Mapping[int, CatalogRecord], magic: bytes, columns: Iterable[str] = ()
+) -> list[Union[bytes, bytearray, array]]:
+    """Serialise *mapping* into the compiled catalog layout, as consecutive buffers.
+
+    Args:
+        mapping: Records to store, by id.
+        magic: Catalog kind, e.g. :attr:`CompiledCatalog.MAGIC` of the reader.
+        columns: Optional integer record attributes to store as columns.
+            Records lacking one (or holding ``None``) store it as missing;
+            columns no record has are left out.
+    """
+
+    ids = array("q", sorted(mapping))
+    names = array("I", [0])
+    icons = array("I", [0])
+    name_blob = bytearray()
+    icon_blob = bytearray()
+    arrays = {field: array("i") for field in columns}
+    for record_id in ids:
+        record = mapping[record_id]
+        name_blob += record.name.encode("utf-8")
+        names.append(len(name_blob))
+        icon_blob += (record.icon or "").encode("utf-8")
+        icons.append(len(icon_blob))
+        for field, values in arrays.items():
+            value = getattr(record, field, None)
+            values.append(COLUMN_MISSING if value is None else value)
+    # Icons live after the names in the shared blob
+    icons = array("I", (len(name_blob) + offset for offset in icons))
+    # Only store columns that at least one record has a value for
+    stored = {
+        field: values for field, values in arrays.items()
+        if any(value != COLUMN_MISSING for value in values)
+    }
+
+    if sys.byteorder != "little":
+        for table in (ids, names, icons, *stored.values()):
+            table.byteswap()
+    header = _COMPILED_HEADER.pack(magic, _COMPILED_VERSION, len(ids), len(name_blob) + len(icon_blob))
+    parts: list[Union[bytes, bytearray, array]] = [header, ids, names, icons, _COLUMN_DIRECTORY.pack(len(stored))]
+    padding = b"\0" * (-4 * len(ids) % 8)
+    for field, values in stored.items():
+        parts += [_COLUMN_NAME.pack(field.encode("ascii")), values, padding]
+    return parts + [name_blob, icon_blob]
+
+
+def write_parts(parts: Iterable[Union[bytes, bytearray, array]], path: Path) -> None:
+    """Write the buffers from :func:`compiled_parts` to *path*, replacing it atomically."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as handle:
+        for part in parts:
+            handle.write(part)
+    os.replace(tmp, path)
+
+
+def segment_buffer(segment: SharedMemory) -> memoryview:
+    """Return *segment*'s buffer, which ``SharedMemory`` drops once closed."""
+
+    buffer = segment.buf
+    if buffer is None:
+        raise ValueError(f"Shared memory segment {segment.name} is closed")
+    return buffer
+
+
+def open_compiled_sibling(path: Path, catalog_cls: type[CatalogT]) -> Optional[CatalogT]:
+    """Open ``path`` with a ``.bin`` suffix if it is at least as new as *path*."""
+
+    compiled = path.with_suffix(COMPILED_SUFFIX)
+    try:
+        compiled_mtime = compiled.stat().st_mtime_ns
+    except OSError:
+        return None
+    try:
+        if path.stat().st_mtime_ns > compiled_mtime:
+            return None  # stale: the JSON was edited after compiling
+    except OSError:
+        pass  # only the compiled catalog is present
+    try:
+        return catalog_cls.open(compiled)
+    except (OSError, ValueError):
+        return None
+
+
+def merge_sources(
+    paths: Iterable[Path],
+    catalog_cls: type[CompiledCatalog[RecordT]],
+    build: Callable[[list[Path]], Mapping[int, RecordT]],
+) -> Mapping[int, RecordT]:
+    """Load *paths* in precedence order, memory-mapping fresh compiled siblings.
+
+    Runs of paths without a compiled sibling are parsed together by *build*.
+    """
+
+    sources: list[Mapping[int, RecordT]] = []
+    pending: list[Path] = []
+    for path in paths:
+        compiled = open_compiled_sibling(path, catalog_cls)
+        if compiled is None:
+            pending.append(path)
+            continue
+        if pending:
+            sources.append(build(pending))
+            pending = []
+        sources.append(compiled)
+    if pending or not sources:
+        sources.append(build(pending))
+    sources = [source for source in sources if source]
+    if len(sources) == 1:
+        return sources[0]
+    if not sources:
+        return {}
+    # Later sources win, as when *build* merges them. ChainMap is typed for
+    # mutable maps but only ever read here.
+    return ChainMap(*reversed(sources))  # type: ignore[arg-type]
+
+
+def iter_candidate_files(sources: Sequence[Path], patterns: Sequence[str]) -> Iterator[Path]:
+    """Yield the source files to merge, in precedence order.
+
+    Files in *sources* are yielded as given; directories are searched
+    recursively for each of *patterns* in turn. A file reached twice, e.g.
+    ``ItemTable.json`` and ``itemtable.json`` on a case-insensitive
+    filesystem, is yielded only the first time.
+    """
+
+    seen: set[Path] = set()
+    for source in sources:
+        if source.is_file():
+            matches = [source]
+        elif not source.exists():
+            LOGGER.debug("Skipping missing source %s", source)
+            continue
+        elif not source.is_dir():
+            LOGGER.debug("Skipping non-file, non-directory source %s", source)
+            continue
+        else:
+            matches = [match for pattern in patterns for match in sorted(source.rglob(pattern))]
+        for match in matches:
+            resolved = match.resolve()
+            if match.is_file() and resolved not in seen:
+                seen.add(resolved)
+                yield match
@@ -7,17 +7,13 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Optional
 
-from google.protobuf import (
-    descriptor_pb2,
-    descriptor_pool,
-    json_format,
-    message_factory,
-)
+from google.protobuf import json_format
 
+from .descriptor_registry import DescriptorRegistry, get_descriptor_registry
 from .framing import FrameReader, NotifyFrame
 
 SERVICE_UID = 0x0000000063335342
-_DESCRIPTOR_PATH = Path(__file__).parent.parent.parent.parent / "data" / "schemas" / "bundle" / "schema" / "descriptor_blueprotobuf.pb"
+_DESCRIPTOR_PATH = Path(__file__).resolve().parents[4] / "data" / "schemas" / "bundle" / "schema" / "descriptor_blueprotobuf.pb"
 
 _METHOD_TO_MESSAGE: Dict[int, str] = {
     0x00000006: "blueprotobuf_package.SyncNearEntities",
@@ -51,19 +47,21 @@ class DecodedRecord:
 
 
 class CombatDecoder:
-    """Decode combat Notify frames using a dynamic descriptor pool."""
+    """Decode combat Notify frames using a dynamic descriptor pool.
+
+    The pool is shared process-wide through :func:`get_descriptor_registry`,
+    so constructing additional decoders for the same descriptor set is cheap.
+    """
 
     def __init__(self, descriptor_path: Path = _DESCRIPTOR_PATH) -> None:
-        descriptor_path = Path(descriptor_path)
-        if not descriptor_path.exists():
-            raise FileNotFoundError(f"Descriptor set not found: {descriptor_path}")
+        self._registry = get_descriptor_registry(Path(descriptor_path))
+        self._pool = self._registry.pool
 
-        file_set = descriptor_pb2.FileDescriptorSet()
-        file_set.ParseFromString(descriptor_path.read_bytes())
+    @property
+    def registry(self) -> DescriptorRegistry:
+        """Shared descriptor registry backing this decoder."""
 
-        self._pool = descriptor_pool.DescriptorPool()
-        for file_proto in file_set.file:
-            self._pool.Add(file_proto)
+        return self._registry
 
     def decode(self, frame: NotifyFrame) -> Optional[DecodedRecord]:
         if frame.service_uid != SERVICE_UID:
@@ -73,8 +71,9 @@ class CombatDecoder:
         if not message_name:
             return None
 
-        message_descriptor = self._pool.FindMessageTypeByName(message_name)
-        message_cls = message_factory.GetMessageClass(message_descriptor)
+        message_cls = self._registry.message_class(message_name)
+        if message_cls is None:
+            return None
         message = message_cls()
         message.ParseFromString(frame.payload)
         data = json_format.MessageToDict(message, preserving_proto_field_name=True)
@@ -83,7 +82,7 @@ class CombatDecoder:
             service_uid=f"0x{frame.service_uid:016x}",
             stub_id=frame.stub_id,
             method_id=frame.method_id,
-            message_type=message_descriptor.full_name,
+            message_type=message_cls.DESCRIPTOR.full_name,
             data=data,
         )
 
@@ -3,7 +3,6 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from importlib import import_module
 from pathlib import Path
 from typing import Dict, Optional
 
@@ -17,30 +16,64 @@ from .combat_decode import (
     FrameReader,
     NotifyFrame,
 )
+from .generated_registry import get_generated_registry
 
 _DEFAULT_MAPPING_PATH = (
-    Path(__file__).resolve().parent.parent.parent / "data" / "schemas" / "combat_method_map.json"
+    Path(__file__).resolve().parents[4] / "data" / "schemas" / "combat_method_map.json"
 )
 
 
 @dataclass(frozen=True)
 class _MethodSpec:
-    module: str
+    # ``module`` is None when ``message`` is a full name in the descriptor set
+    module: Optional[str]
     message: str
     response_field: Optional[str] = None
 
 
+@dataclass
+class _MethodRoute:
+    """Per-method routing state and counters."""
+
+    v2_hits: int = 0
+    v2_failures: int = 0
+    fallbacks: int = 0
+    consecutive_failures: int = 0
+    bypass_v2: bool = False
+    reason: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "v2_hits": self.v2_hits,
+            "v2_failures": self.v2_failures,
+            "fallbacks": self.fallbacks,
+            "routed_to_fallback": self.bypass_v2,
+            "reason": self.reason,
+        }
+
+
 class CombatDecoderV2:
-    """Decode combat Notify frames using static protobuf modules when possible."""
+    """Decode combat Notify frames using static protobuf modules when possible.
+
+    Routing is adaptive per method: a method whose static class cannot be
+    resolved is sent straight to the dynamic fallback, and a method whose
+    payloads fail to parse ``failure_threshold`` times in a row stops trying
+    the static class altogether. Per-method counters are available from
+    :meth:`method_stats`.
+    """
 
     def __init__(
         self,
         mapping_path: Path | None = None,
         descriptor_path: Path | None = None,
+        failure_threshold: int = 3,
     ) -> None:
         self._mapping_path = Path(mapping_path or _DEFAULT_MAPPING_PATH)
         self._method_specs = self._load_mapping(self._mapping_path)
-        self._message_cache: Dict[str, type[Message]] = {}
+        # Misses are cached as None so failing imports are attempted only once
+        self._message_cache: Dict[str, Optional[type[Message]]] = {}
+        self._routes: Dict[int, _MethodRoute] = {}
+        self._failure_threshold = max(1, failure_threshold)
         self._fallback = CombatDecoder(descriptor_path=descriptor_path) if descriptor_path else CombatDecoder()
 
     @staticmethod
@@ -57,7 +90,10 @@ class CombatDecoderV2:
                 continue
             module = value.get("module")
             message = value.get("message")
-            if not module or not message:
+            descriptor = value.get("descriptor")
+            if descriptor:
+                module, message = None, descriptor
+            elif not module or not message:
                 continue
             result[method_id] = _MethodSpec(
                 module=module,
@@ -67,11 +103,16 @@ class CombatDecoderV2:
         return result
 
     def _resolve_message(self, spec: _MethodSpec) -> Optional[type[Message]]:
-        cache_key = f"{spec.module}:{spec.message}"
+        cache_key = f"{spec.module or 'descriptor'}:{spec.message}"
         if cache_key in self._message_cache:
             return self._message_cache[cache_key]
+        self._message_cache[cache_key] = None
+        if spec.module is None:
+            message_cls = self._fallback.registry.message_class(spec.message)
+            self._message_cache[cache_key] = message_cls
+            return message_cls
         try:
-            module = import_module(spec.module)
+            module = get_generated_registry().module(spec.module)
         except ModuleNotFoundError:
             return None
         attr_path = spec.message.split(".")
@@ -85,20 +126,44 @@ class CombatDecoderV2:
         self._message_cache[cache_key] = obj
         return obj
 
+    def _route(self, method_id: int) -> _MethodRoute:
+        route = self._routes.get(method_id)
+        if route is None:
+            route = self._routes[method_id] = _MethodRoute()
+        return route
+
+    def method_stats(self) -> Dict[str, Dict[str, object]]:
+        """Return per-method V2 hit/fallback counters keyed by hex method id."""
+
+        return {
+            f"0x{method_id:08x}": route.as_dict()
+            for method_id, route in sorted(self._routes.items())
+        }
+
     def decode(self, frame: NotifyFrame) -> Optional[DecodedRecord]:
         if frame.service_uid != SERVICE_UID:
             return None
 
+        route = self._route(frame.method_id)
         spec = self._method_specs.get(frame.method_id)
-        if spec:
+        if spec and not route.bypass_v2:
             message_cls = self._resolve_message(spec)
-            if message_cls is not None:
+            if message_cls is None:
+                route.bypass_v2 = True
+                route.reason = f"unresolved {spec.module or 'descriptor'}:{spec.message}"
+            else:
                 message = message_cls()
                 try:
                     message.ParseFromString(frame.payload)
                 except DecodeError:
-                    pass
+                    route.v2_failures += 1
+                    route.consecutive_failures += 1
+                    if route.consecutive_failures >= self._failure_threshold:
+                        route.bypass_v2 = True
+                        route.reason = f"{route.consecutive_failures} consecutive decode errors"
                 else:
+                    route.v2_hits += 1
+                    route.consecutive_failures = 0
                     payload: Message | Dict = message
                     if spec.response_field and hasattr(message, spec.response_field):
                         payload = getattr(message, spec.response_field)
@@ -114,6 +179,7 @@ class CombatDecoderV2:
                         data=data,
                     )
 
+        route.fallbacks += 1
         return self._fallback.decode(frame)
 
 
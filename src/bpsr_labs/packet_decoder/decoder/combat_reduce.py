@@ -20,7 +20,9 @@ import json
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Mapping, Optional
+
+from bpsr_labs.packet_decoder.decoder.skill_catalog import SkillRecord, resolve_skill_names
 
 
 def _parse_int(value: Optional[object]) -> Optional[int]:
@@ -296,12 +298,19 @@ class CombatReducer:
     # ------------------------------------------------------------------
     # Export helpers
     # ------------------------------------------------------------------
-    def summary(self) -> Dict:
+    def summary(self, skill_mapping: Optional[Mapping[int, SkillRecord]] = None) -> Dict:
         """Generate a comprehensive DPS summary from collected statistics.
         
         Calculates final DPS metrics including total damage, hit counts,
         critical hit rates, and breakdowns by skill and target.
         
+        Args:
+            skill_mapping: Skill catalog, e.g. from
+                :func:`~bpsr_labs.packet_decoder.decoder.skill_catalog.load_skill_mapping`.
+                When given, each skill entry gains a ``name`` if the catalog
+                knows it. Names are looked up once per distinct skill here,
+                never per hit.
+        
         Returns:
             Dict: Summary containing total stats, DPS, and breakdowns.
         """
@@ -314,16 +323,21 @@ class CombatReducer:
         # Calculate DPS (damage per second)
         dps = self.total_damage / duration_s if duration_s > 0 else 0.0
 
+        skills: Dict[str, Dict[str, object]] = {
+            key: dict(bucket.as_dict())
+            for key, bucket in sorted(self.skill_buckets.items())
+        }
+        if skill_mapping is not None:
+            for skill_id, name in resolve_skill_names(skills, skill_mapping).items():
+                skills[str(skill_id)]["name"] = name
+
         return {
             "total_damage": self.total_damage,
             "hits": self.hits,
             "crits": self.crits,
             "active_duration_s": duration_s,
             "dps": dps,
-            "skills": {
-                key: bucket.as_dict()
-                for key, bucket in sorted(self.skill_buckets.items())
-            },
+            "skills": skills,
             "targets": {
                 key: bucket.as_dict()
                 for key, bucket in sorted(self.target_buckets.items())
@@ -331,7 +345,11 @@ class CombatReducer:
         }
 
 
-def reduce_file(input_path: Path, output_path: Path) -> Dict:
+def reduce_file(
+    input_path: Path,
+    output_path: Path,
+    skill_mapping: Optional[Mapping[int, SkillRecord]] = None,
+) -> Dict:
     """Process a combat JSONL file and generate DPS summary.
     
     Convenience function that creates a CombatReducer, processes all records
@@ -340,6 +358,7 @@ def reduce_file(input_path: Path, output_path: Path) -> Dict:
     Args:
         input_path: Path to the input JSONL file containing combat data.
         output_path: Path where the DPS summary JSON will be written.
+        skill_mapping: Optional skill catalog used to name the skills.
     
     Returns:
         Dict: The generated DPS summary dictionary.
@@ -356,7 +375,7 @@ def reduce_file(input_path: Path, output_path: Path) -> Dict:
     reducer = CombatReducer()
     with input_path.open("r", encoding="utf-8") as handle:
         reducer.process_records(handle)
-    summary = reducer.summary()
+    summary = reducer.summary(skill_mapping)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
     return summary
@@ -0,0 +1,163 @@
+"""Process-wide cache of descriptor pools built from ``descriptor_blueprotobuf.pb``.
+
+Parsing the bundled ``FileDescriptorSet`` and adding every file to a fresh
+``DescriptorPool`` dominates decoder construction time. This module builds the
+pool once per process and shares it between every :class:`CombatDecoder` and
+:class:`CombatDecoderV2` instance that points at the same descriptor file.
+
+Registries are keyed by the resolved descriptor path *and* a SHA-256 of its
+contents, so replacing the descriptor on disk yields a fresh pool while
+unchanged files are never re-parsed. The content hash itself is only recomputed
+when the file's size or mtime changes.
+
+Example:
+    >>> from bpsr_labs.packet_decoder.decoder.descriptor_registry import get_descriptor_registry
+    >>> registry = get_descriptor_registry(Path('descriptor_blueprotobuf.pb'))
+    >>> registry.message_class('blueprotobuf_package.SyncServerTime')
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from google.protobuf.descriptor import Descriptor
+from google.protobuf.message import Message
+
+__all__ = [
+    "DescriptorRegistry",
+    "clear_descriptor_registries",
+    "get_descriptor_registry",
+]
+
+
+class DescriptorRegistry:
+    """Descriptor pool plus a lazily populated message-class table.
+
+    Instances are created by :func:`get_descriptor_registry` and should be
+    treated as shared, read-mostly objects. Message classes are generated on
+    first request and memoized, so the method → class lookup performed for
+    every decoded frame is a single dictionary hit.
+
+    Attributes:
+        path: Resolved path of the descriptor set.
+        digest: Hex SHA-256 of the descriptor set contents.
+        pool: Descriptor pool containing every file from the set.
+        file_names: Names of the files contained in the set.
+    """
+
+    def __init__(self, path: Path, digest: str, payload: bytes) -> None:
+        self.path = path
+        self.digest = digest
+
+        file_set = descriptor_pb2.FileDescriptorSet()
+        file_set.ParseFromString(payload)
+
+        self.pool = descriptor_pool.DescriptorPool()
+        for file_proto in file_set.file:
+            self.pool.Add(file_proto)
+        self.file_names = tuple(file_proto.name for file_proto in file_set.file)
+
+        self._classes: Dict[str, Optional[type[Message]]] = {}
+        self._lock = threading.Lock()
+
+    def find_descriptor(self, full_name: str) -> Optional[Descriptor]:
+        """Return the message descriptor for *full_name*, or ``None`` if absent."""
+
+        try:
+            return self.pool.FindMessageTypeByName(full_name)
+        except KeyError:
+            return None
+
+    def iter_message_descriptors(self) -> Iterator[Descriptor]:
+        """Yield every message descriptor in the set, nested types included."""
+
+        def _walk(descriptor: Descriptor) -> Iterator[Descriptor]:
+            yield descriptor
+            for nested in descriptor.nested_types:
+                yield from _walk(nested)
+
+        for file_name in self.file_names:
+            file_descriptor = self.pool.FindFileByName(file_name)
+            for descriptor in file_descriptor.message_types_by_name.values():
+                yield from _walk(descriptor)
+
+    def message_class(self, full_name: str) -> Optional[type[Message]]:
+        """Return the generated message class for *full_name*.
+
+        Misses are cached as well, so unknown names cost one pool lookup per
+        process rather than one per frame.
+        """
+
+        try:
+            return self._classes[full_name]
+        except KeyError:
+            pass
+        with self._lock:
+            if full_name not in self._classes:
+                descriptor = self.find_descriptor(full_name)
+                self._classes[full_name] = (
+                    message_factory.GetMessageClass(descriptor) if descriptor is not None else None
+                )
+            return self._classes[full_name]
+
+
+_REGISTRIES: Dict[tuple[Path, str], DescriptorRegistry] = {}
+# path -> (mtime_ns, size, digest); avoids re-hashing unchanged descriptor files
+_DIGESTS: Dict[Path, tuple[int, int, str]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_descriptor_registry(descriptor_path: Path) -> DescriptorRegistry:
+    """Return the shared :class:`DescriptorRegistry` for *descriptor_path*.
+
+    The first call for a given path/content pair parses the descriptor set;
+    subsequent calls only ``stat`` the file.
+
+    Args:
+        descriptor_path: Path to a serialized ``FileDescriptorSet``.
+
+    Returns:
+        DescriptorRegistry: Registry shared by every caller in this process.
+
+    Raises:
+        FileNotFoundError: If the descriptor set does not exist.
+    """
+
+    path = Path(descriptor_path).resolve()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Descriptor set not found: {descriptor_path}") from None
+
+    with _REGISTRY_LOCK:
+        cached = _DIGESTS.get(path)
+        payload: Optional[bytes] = None
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            digest = cached[2]
+        else:
+            payload = path.read_bytes()
+            digest = hashlib.sha256(payload).hexdigest()
+            _DIGESTS[path] = (stat.st_mtime_ns, stat.st_size, digest)
+
+        registry = _REGISTRIES.get((path, digest))
+        if registry is None:
+            if payload is None:
+                payload = path.read_bytes()
+            registry = DescriptorRegistry(path, digest, payload)
+            # Drop pools built from previous contents of the same file
+            for key in [key for key in _REGISTRIES if key[0] == path]:
+                del _REGISTRIES[key]
+            _REGISTRIES[(path, digest)] = registry
+        return registry
+
+
+def clear_descriptor_registries() -> None:
+    """Forget every cached registry (mainly useful in tests)."""
+
+    with _REGISTRY_LOCK:
+        _REGISTRIES.clear()
+        _DIGESTS.clear()
@@ -0,0 +1,212 @@
+"""Lazy loader for the generated ``*_pb2`` modules.
+
+The modules produced by ``scripts/generate_protos.py`` register large
+descriptor graphs when imported, and they import each other as top-level
+modules (``import serv_world_pb2``), which requires the generated directory to
+be on ``sys.path``. This registry defers both costs until a message class is
+actually needed and records how long each import took and, when
+``tracemalloc`` is active, how much memory it allocated.
+
+Example:
+    >>> from bpsr_labs.packet_decoder.decoder.generated_registry import get_generated_registry
+    >>> registry = get_generated_registry()
+    >>> ret_cls = registry.resolve_attr("serv_world_pb2", "World.ExchangeNoticeDetail_Ret")
+    >>> for stats in registry.load_stats():
+    ...     print(stats.module, stats.seconds)
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from importlib import import_module
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional, cast
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+from google.protobuf.message import Message
+
+__all__ = [
+    "GeneratedModuleRegistry",
+    "ModuleLoadStats",
+    "get_generated_registry",
+]
+
+_GENERATED_DIR = Path(__file__).resolve().parent.parent / "generated"
+# Matches the serialized FileDescriptorProto literal emitted by protoc
+_SERIALIZED_FILE_RE = re.compile(rb"AddSerializedFile\((b'(?:[^'\\]|\\.)*')\)")
+
+
+@dataclass(frozen=True)
+class ModuleLoadStats:
+    """Cost of importing a single generated module.
+
+    Attributes:
+        module: Top-level module name, e.g. ``serv_world_pb2``.
+        seconds: Wall-clock import time, including modules it imported.
+        allocated_bytes: Net memory allocated by the import, or ``None`` when
+            ``tracemalloc`` was not tracing.
+    """
+
+    module: str
+    seconds: float
+    allocated_bytes: Optional[int] = None
+
+
+class GeneratedModuleRegistry:
+    """Resolve generated message classes on first use.
+
+    Args:
+        generated_dir: Directory containing the generated ``*_pb2`` modules.
+        track_memory: Start ``tracemalloc`` around imports to record their
+            memory cost. Off by default because tracing slows every
+            allocation while it is active.
+    """
+
+    def __init__(self, generated_dir: Path = _GENERATED_DIR, track_memory: bool = False) -> None:
+        self.generated_dir = Path(generated_dir)
+        self.track_memory = track_memory
+        self._modules: Dict[str, ModuleType] = {}
+        self._stats: Dict[str, ModuleLoadStats] = {}
+        self._index: Optional[Dict[str, str]] = None
+        self._lock = threading.RLock()
+
+    def _ensure_on_path(self) -> None:
+        path = str(self.generated_dir)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    def module(self, name: str) -> ModuleType:
+        """Import generated module *name*, recording its load cost once.
+
+        Raises:
+            ModuleNotFoundError: If the module has not been generated.
+        """
+
+        cached = self._modules.get(name)
+        if cached is not None:
+            return cached
+        with self._lock:
+            if name in self._modules:
+                return self._modules[name]
+            self._ensure_on_path()
+
+            started_tracing = self.track_memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            tracing = tracemalloc.is_tracing()
+            before = tracemalloc.get_traced_memory()[0] if tracing else 0
+            start = time.perf_counter()
+            try:
+                module = import_module(name)
+            finally:
+                elapsed = time.perf_counter() - start
+                allocated = tracemalloc.get_traced_memory()[0] - before if tracing else None
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self._modules[name] = module
+            self._stats[name] = ModuleLoadStats(name, elapsed, allocated)
+            return module
+
+    def resolve_attr(self, module: str, attr_path: str) -> type[Message]:
+        """Return the message class at dotted *attr_path* inside *module*.
+
+        Raises:
+            ModuleNotFoundError: If the module has not been generated.
+            AttributeError: If the attribute path does not exist.
+            TypeError: If the attribute path does not name a message class.
+        """
+
+        obj: object = self.module(module)
+        for attr in attr_path.split("."):
+            obj = getattr(obj, attr)
+        if not isinstance(obj, type) or not issubclass(obj, Message):
+            raise TypeError(f"{module}.{attr_path} is not a protobuf message class")
+        return obj
+
+    def resolve(self, full_name: str, module: Optional[str] = None) -> type[Message]:
+        """Return the message class for protobuf *full_name*.
+
+        Only the module that defines the type (and its imports) is loaded. When
+        *module* is omitted it is looked up in an index built from the
+        serialized descriptors embedded in the generated sources, without
+        importing them.
+
+        Raises:
+            KeyError: If no generated module defines *full_name*.
+        """
+
+        pool = descriptor_pool.Default()
+        try:
+            return cast(type[Message], message_factory.GetMessageClass(pool.FindMessageTypeByName(full_name)))
+        except KeyError:
+            pass
+        module = module or self.index().get(full_name)
+        if module is None:
+            raise KeyError(f"No generated module defines {full_name}")
+        self.module(module)
+        return cast(type[Message], message_factory.GetMessageClass(pool.FindMessageTypeByName(full_name)))
+
+    def index(self) -> Dict[str, str]:
+        """Return a message full name → module name index of the generated tree."""
+
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is None:
+                index: Dict[str, str] = {}
+                for path in sorted(self.generated_dir.glob("*_pb2.py")):
+                    match = _SERIALIZED_FILE_RE.search(path.read_bytes())
+                    if match is None:
+                        continue
+                    file_proto = descriptor_pb2.FileDescriptorProto.FromString(
+                        ast.literal_eval(match.group(1).decode("latin-1"))
+                    )
+                    self._index_messages(index, file_proto.package, file_proto.message_type, path.stem)
+                self._index = index
+            return self._index
+
+    @classmethod
+    def _index_messages(
+        cls,
+        index: Dict[str, str],
+        prefix: str,
+        messages: Iterable[descriptor_pb2.DescriptorProto],
+        module: str,
+    ) -> None:
+        for message in messages:
+            full_name = f"{prefix}.{message.name}" if prefix else message.name
+            index.setdefault(full_name, module)
+            cls._index_messages(index, full_name, message.nested_type, module)
+
+    def loaded_modules(self) -> List[str]:
+        """Return the names of modules imported through this registry."""
+
+        return list(self._modules)
+
+    def load_stats(self) -> List[ModuleLoadStats]:
+        """Return per-module import statistics in load order."""
+
+        return list(self._stats.values())
+
+
+_DEFAULT_REGISTRY: Optional[GeneratedModuleRegistry] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def get_generated_registry() -> GeneratedModuleRegistry:
+    """Return the process-wide registry for the bundled generated modules."""
+
+    global _DEFAULT_REGISTRY
+    if _DEFAULT_REGISTRY is None:
+        with _DEFAULT_LOCK:
+            if _DEFAULT_REGISTRY is None:
+                _DEFAULT_REGISTRY = GeneratedModuleRegistry()
+    return _DEFAULT_REGISTRY
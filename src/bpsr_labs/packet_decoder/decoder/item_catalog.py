@@ -7,6 +7,18 @@ multiple sources and provides efficient lookup capabilities.
 The module handles various item data formats from different sources including
 JSON files and game data dumps, with automatic fallback between sources.
 
+``update-items`` also writes a compiled catalog next to the JSON mapping (same
+name, ``.bin`` suffix). It holds a sorted array of item ids, name/icon offset
+tables and one UTF-8 string blob (see :mod:`catalog_format`), so it can be
+memory-mapped and searched without parsing anything. :func:`load_item_mapping` prefers the compiled
+sibling of a source whenever it is at least as new as the JSON file.
+
+Besides names and icons, ``ItemTable.json`` rows carry a few numeric columns
+(rarity, category, stack size, see :data:`ITEM_COLUMNS`). Those are kept on
+:class:`ItemRecord` and stored in the compiled catalog as int32 columns
+aligned with the id array, so :func:`select_items` can turn a category or
+rarity filter into an item id set without building a record per item.
+
 Example:
     Basic usage of item catalog:
     >>> from bpsr_labs.packet_decoder.decoder.item_catalog import resolve_item_name
@@ -18,16 +30,40 @@ Example:
 from __future__ import annotations
 
 import json
+import threading
+import time
+from collections import ChainMap
+from collections.abc import Mapping
 from dataclasses import dataclass
 from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, Union, overload
+
+from bpsr_labs.packet_decoder.decoder.catalog_format import (
+    COLUMN_MISSING,
+    COMPILED_SUFFIX,
+    CompiledCatalog,
+    compiled_parts,
+    iter_json_object,
+    merge_sources,
+    segment_buffer,
+    write_parts,
+)
 
 __all__ = [
+    "COMPILED_SUFFIX",
+    "ITEM_COLUMNS",
+    "CompiledItemCatalog",
+    "ItemCatalogHandle",
     "ItemRecord",
+    "SharedItemCatalog",
     "build_mapping_from_sources",
     "load_item_mapping",
+    "load_source_file",
     "resolve_item_name",
+    "select_items",
+    "write_compiled_catalog",
 ]
 
 _DEFAULT_SEARCH_LOCATIONS: tuple[Path, ...] = (
@@ -37,6 +73,13 @@ _DEFAULT_SEARCH_LOCATIONS: tuple[Path, ...] = (
     Path("ref/StarResonanceData/ztable/ItemTable.json"),
 )
 
+# ItemRecord field -> ItemTable.json column for the optional numeric columns
+ITEM_COLUMNS: dict[str, str] = {
+    "rarity": "Quality",
+    "category": "Type",
+    "stack_size": "Overlap",
+}
+
 
 @dataclass(frozen=True)
 class ItemRecord:
@@ -50,6 +93,9 @@ class ItemRecord:
         item_id: Unique identifier for the item in the game.
         name: Human-readable display name for the item.
         icon: Optional path or identifier for the item's icon.
+        rarity: ItemTable ``Quality`` value, if loaded.
+        category: ItemTable ``Type`` value, if loaded.
+        stack_size: ItemTable ``Overlap`` value, if loaded.
     
     Example:
         >>> item = ItemRecord(12345, "Iron Sword", "sword_iron.png")
@@ -59,6 +105,22 @@ class ItemRecord:
     item_id: int
     name: str
     icon: Optional[str] = None
+    rarity: Optional[int] = None
+    category: Optional[int] = None
+    stack_size: Optional[int] = None
+
+    def columns(self) -> dict[str, int]:
+        """Return the optional numeric columns that are set on this record."""
+
+        return {
+            field: value
+            for field in ITEM_COLUMNS
+            if (value := getattr(self, field)) is not None
+        }
+
+
+def _int_column(value: object) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
 
 
 def _load_raw_mapping(path: Path) -> dict[int, ItemRecord]:
@@ -66,7 +128,8 @@ def _load_raw_mapping(path: Path) -> dict[int, ItemRecord]:
     
     Parses JSON files containing item data in various formats and converts
     them to a standardized ItemRecord format. Handles different field names
-    and data structures used by different data sources.
+    and data structures used by different data sources. Entries are read
+    one at a time, so memory use does not grow with the size of the file.
     
     Args:
         path: Path to the JSON file containing item data.
@@ -83,43 +146,47 @@ def _load_raw_mapping(path: Path) -> dict[int, ItemRecord]:
         >>> print(len(mapping))
         1500
     """
-    text = path.read_text(encoding="utf-8")
-    payload = json.loads(text)
-
     mapping: dict[int, ItemRecord] = {}
-    if isinstance(payload, dict):
-        for raw_key, value in payload.items():
-            try:
-                item_id = int(raw_key)
-            except (TypeError, ValueError):
-                # Skip non-numeric keys (metadata, comments, etc.)
-                continue
+    for raw_key, value in iter_json_object(path):
+        try:
+            item_id = int(raw_key)
+        except (TypeError, ValueError):
+            # Skip non-numeric keys (metadata, comments, etc.)
+            continue
 
-            # Handle different data formats from various sources
-            if isinstance(value, dict):
-                # Structured format with separate name/icon fields
-                name = value.get("name") or value.get("Name")
-                icon = value.get("icon") or value.get("Icon")
-            else:
-                # Simple format where value is just the name
-                name = str(value)
-                icon = None
-
-            if not isinstance(name, str) or not name:
-                continue
-            mapping[item_id] = ItemRecord(item_id=item_id, name=name, icon=icon)
+        # Handle different data formats from various sources
+        if isinstance(value, dict):
+            # Structured format with separate name/icon fields
+            name = value.get("name") or value.get("Name")
+            icon = value.get("icon") or value.get("Icon")
+            extras = {field: _int_column(value.get(field)) for field in ITEM_COLUMNS}
+        else:
+            # Simple format where value is just the name
+            name = str(value)
+            icon = None
+            extras = {}
+
+        if not isinstance(name, str) or not name:
+            continue
+        mapping[item_id] = ItemRecord(item_id=item_id, name=name, icon=icon, **extras)
     return mapping
 
 
-def _load_from_item_table(path: Path) -> dict[int, ItemRecord]:
+def _load_from_item_table(
+    path: Path, columns: Iterable[str] = tuple(ITEM_COLUMNS)
+) -> dict[int, ItemRecord]:
     """Load item mapping from ItemTable.json format.
     
     Handles the specific format used by ItemTable.json files where each
     entry is a dictionary with Id, Name, and Icon fields. This format
     is different from the simple key-value mapping used by other sources.
+    Rows are read one at a time and reduced to those three fields plus the
+    selected *columns*, so the table's other columns are never held for
+    more than one row.
     
     Args:
         path: Path to the ItemTable.json file.
+        columns: :data:`ITEM_COLUMNS` fields to keep on each record.
     
     Returns:
         dict[int, ItemRecord]: Dictionary mapping item IDs to ItemRecord objects.
@@ -128,36 +195,113 @@ def _load_from_item_table(path: Path) -> dict[int, ItemRecord]:
         FileNotFoundError: If the file does not exist.
         json.JSONDecodeError: If the file contains invalid JSON.
     """
-    text = path.read_text(encoding="utf-8")
-    payload = json.loads(text)
+    wanted = [(field, ITEM_COLUMNS[field]) for field in columns]
     mapping: dict[int, ItemRecord] = {}
-    if isinstance(payload, dict):
-        for raw_key, value in payload.items():
-            if not isinstance(value, dict):
-                continue
-            
-            # Extract fields from ItemTable format
-            item_id = value.get("Id")
-            name = value.get("Name")
-            icon = value.get("Icon")
-            
-            # Fallback to using raw_key as item_id if Id field is missing
-            if not isinstance(item_id, int) or not isinstance(name, str) or not name:
-                try:
-                    item_id = int(raw_key)
-                except (TypeError, ValueError):
-                    continue
-            if not isinstance(name, str) or not name:
+    for raw_key, value in iter_json_object(path):
+        if not isinstance(value, dict):
+            continue
+        
+        # Extract fields from ItemTable format
+        item_id = value.get("Id")
+        name = value.get("Name")
+        icon = value.get("Icon")
+        
+        # Fallback to using raw_key as item_id if Id field is missing
+        if not isinstance(item_id, int) or not isinstance(name, str) or not name:
+            try:
+                item_id = int(raw_key)
+            except (TypeError, ValueError):
                 continue
-            
-            mapping[int(item_id)] = ItemRecord(
-                item_id=int(item_id), 
-                name=name, 
-                icon=icon if isinstance(icon, str) else None
-            )
+        if not isinstance(name, str) or not name:
+            continue
+        
+        mapping[int(item_id)] = ItemRecord(
+            item_id=int(item_id), 
+            name=name, 
+            icon=icon if isinstance(icon, str) else None,
+            **{field: _int_column(value.get(column)) for field, column in wanted},
+        )
     return mapping
 
 
+class CompiledItemCatalog(CompiledCatalog[ItemRecord]):
+    """Read-only item mapping backed by a compiled catalog buffer.
+
+    Lookups binary-search the id array in place and decode only the
+    requested name, so opening a catalog costs no parsing regardless of its
+    size. Instances behave like ``dict[int, ItemRecord]`` for reading; the
+    :data:`ITEM_COLUMNS` are stored as int32 columns (:meth:`column`).
+
+    Args:
+        buffer: Compiled catalog bytes, e.g. an :class:`mmap.mmap`.
+
+    Raises:
+        ValueError: If *buffer* is not a compiled item catalog of a supported version.
+    """
+
+    MAGIC = b"BPSRITEM"
+
+    def _make_record(self, record_id: int, name: str, icon: Optional[str], columns: dict[str, int]) -> ItemRecord:
+        return ItemRecord(item_id=record_id, name=name, icon=icon, **columns)
+
+
+def write_compiled_catalog(mapping: Mapping[int, ItemRecord], path: Path) -> None:
+    """Write *mapping* as a compiled catalog, replacing *path* atomically."""
+
+    write_parts(compiled_parts(mapping, CompiledItemCatalog.MAGIC, ITEM_COLUMNS), path)
+
+
+class SharedItemCatalog:
+    """A compiled catalog published in :mod:`multiprocessing.shared_memory`.
+
+    The publishing process owns the segment. Workers attach to it by
+    :attr:`name` with :meth:`CompiledItemCatalog.attach_shared` and read
+    the same physical pages, so a pool of any size holds one copy of the
+    catalog and workers start without parsing anything.
+
+    Args:
+        mapping: Items to publish.
+
+    Example:
+        >>> with SharedItemCatalog(load_item_mapping()) as shared:
+        ...     pool.map(work, jobs, [shared.name] * len(jobs))
+    """
+
+    def __init__(self, mapping: Mapping[int, ItemRecord]) -> None:
+        from multiprocessing import shared_memory
+
+        parts = compiled_parts(mapping, CompiledItemCatalog.MAGIC, ITEM_COLUMNS)
+        size = sum(memoryview(part).nbytes for part in parts)
+        self._segment = shared_memory.SharedMemory(create=True, size=size)
+        buffer = segment_buffer(self._segment)
+        offset = 0
+        for part in parts:
+            view = memoryview(part).cast("B")
+            buffer[offset:offset + view.nbytes] = view
+            offset += view.nbytes
+
+    @property
+    def name(self) -> str:
+        """Segment name to pass to :meth:`CompiledItemCatalog.attach_shared`."""
+
+        return self._segment.name
+
+    def close(self) -> None:
+        """Unmap and destroy the segment; attached workers must be done with it."""
+
+        self._segment.close()
+        try:
+            self._segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SharedItemCatalog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
 def build_mapping_from_sources(paths: Iterable[Path]) -> dict[int, ItemRecord]:
     """Construct a mapping from the provided candidate files.
 
@@ -182,26 +326,42 @@ def build_mapping_from_sources(paths: Iterable[Path]) -> dict[int, ItemRecord]:
     for candidate in paths:
         if not candidate.is_file():
             continue
-        try:
-            # Use different parser based on file name
-            if candidate.name.lower() == "itemtable.json":
-                mapping = _load_from_item_table(candidate)
-            else:
-                mapping = _load_raw_mapping(candidate)
-        except (OSError, json.JSONDecodeError):
-            # Skip files that can't be parsed (corrupted, wrong format, etc.)
-            continue
-        if not mapping:
-            continue
         # Later sources override earlier ones for the same item ID
-        merged.update(mapping)
+        merged.update(load_source_file(candidate))
     return merged
 
 
+def load_source_file(path: Path, columns: Iterable[str] = tuple(ITEM_COLUMNS)) -> dict[int, ItemRecord]:
+    """Parse one item source file, choosing the parser from its name.
+
+    *columns* selects the :data:`ITEM_COLUMNS` kept from an
+    ``ItemTable.json``; mapping files keep whatever columns they hold.
+    Returns an empty mapping for files that can't be read or parsed
+    (corrupted, wrong format, etc.).
+    """
+
+    try:
+        if path.name.lower() == "itemtable.json":
+            return _load_from_item_table(path, columns)
+        return _load_raw_mapping(path)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
 @lru_cache(maxsize=1)
-def load_item_mapping(search_paths: Iterable[Path] | None = None) -> dict[int, ItemRecord]:
+def _load_item_mapping(search_paths: Optional[tuple[Path, ...]]) -> Mapping[int, ItemRecord]:
+    paths = search_paths if search_paths is not None else _DEFAULT_SEARCH_LOCATIONS
+    return merge_sources(paths, CompiledItemCatalog, build_mapping_from_sources)
+
+
+def load_item_mapping(search_paths: Iterable[Path] | None = None) -> Mapping[int, ItemRecord]:
     """Attempt to load an item id → :class:`ItemRecord` mapping.
 
+    A source whose compiled ``.bin`` sibling is at least as new as the JSON
+    file is memory-mapped instead of parsed. The result of the most recent
+    call is cached; use ``load_item_mapping.cache_clear()`` to reload, or an
+    :class:`ItemCatalogHandle` to follow source updates automatically.
+
     Parameters
     ----------
     search_paths:
@@ -209,7 +369,8 @@ def load_item_mapping(search_paths: Iterable[Path] | None = None) -> dict[int, I
         repository-relative locations is used.
     
     Returns:
-        dict[int, ItemRecord]: Item mapping loaded from specified or default sources.
+        Mapping[int, ItemRecord]: Item mapping loaded from specified or
+        default sources; a ``dict`` unless a compiled catalog was used.
     
     Example:
         >>> mapping = load_item_mapping()
@@ -218,9 +379,194 @@ def load_item_mapping(search_paths: Iterable[Path] | None = None) -> dict[int, I
         "Iron Sword"
     """
 
-    paths = list(search_paths) if search_paths is not None else list(_DEFAULT_SEARCH_LOCATIONS)
-    mapping = build_mapping_from_sources(paths)
-    return mapping
+    # Normalise to a hashable key so lists and generators can be passed too
+    key = tuple(Path(path) for path in search_paths) if search_paths is not None else None
+    return _load_item_mapping(key)
+
+
+load_item_mapping.cache_clear = _load_item_mapping.cache_clear  # type: ignore[attr-defined]
+
+
+_T = TypeVar("_T")
+
+
+class ItemCatalogHandle(Mapping):
+    """Item mapping that picks up rewritten sources in long-running processes.
+
+    :func:`load_item_mapping` caches its result for the life of the process.
+    A handle keeps its own mapping and, at most once per *check_interval*
+    seconds, stats every source and compiled sibling. When a size or mtime
+    changed, it loads a fresh mapping and swaps it in with one attribute
+    assignment.
+
+    Only the thread that wins a non-blocking lock does the stat and reload.
+    Every other thread keeps resolving against the current mapping, so
+    lookups never wait. A reload that yields no items, e.g. a source caught
+    mid-write, keeps the previous mapping and retries on the next check.
+
+    Args:
+        search_paths: Paths to probe, as for :func:`load_item_mapping`.
+        check_interval: Minimum seconds between stat checks; ``0`` checks
+            on every lookup.
+        clock: Monotonic time source (for tests).
+
+    Example:
+        >>> catalog = ItemCatalogHandle()
+        >>> for listing in stream:
+        ...     record = catalog.get(listing.item_config_id)
+    """
+
+    def __init__(
+        self,
+        search_paths: Iterable[Path] | None = None,
+        check_interval: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._paths = tuple(Path(path) for path in search_paths) if search_paths is not None else None
+        self._interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._signature = self._stat_signature()
+        self._mapping: Mapping[int, ItemRecord] = _load_item_mapping.__wrapped__(self._paths)
+        self._next_check = clock() + check_interval
+
+    def _stat_signature(self) -> tuple[Optional[tuple[int, int]], ...]:
+        signature: list[Optional[tuple[int, int]]] = []
+        for path in self._paths if self._paths is not None else _DEFAULT_SEARCH_LOCATIONS:
+            for candidate in (path, path.with_suffix(COMPILED_SUFFIX)):
+                try:
+                    stat = candidate.stat()
+                except OSError:
+                    signature.append(None)
+                else:
+                    signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the mapping if a source changed; return whether it was swapped.
+
+        Without *force*, this is a no-op until *check_interval* has passed
+        since the last check. It also returns immediately while another
+        thread is checking.
+        """
+
+        now = self._clock()
+        if not force and now < self._next_check:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = now + self._interval
+            signature = self._stat_signature()
+            if not force and signature == self._signature:
+                return False
+            mapping = _load_item_mapping.__wrapped__(self._paths)
+            if not mapping and self._mapping:
+                return False
+            self._signature = signature
+            self._mapping = mapping
+            return True
+        finally:
+            self._lock.release()
+
+    @property
+    def mapping(self) -> Mapping[int, ItemRecord]:
+        """The current mapping, refreshed first if it is due for a check."""
+
+        self.refresh()
+        return self._mapping
+
+    def __getitem__(self, item_id: int) -> ItemRecord:
+        return self.mapping[item_id]
+
+    @overload
+    def get(self, item_id: int, /) -> Optional[ItemRecord]: ...
+
+    @overload
+    def get(self, item_id: int, default: Union[ItemRecord, _T], /) -> Union[ItemRecord, _T]: ...
+
+    def get(self, item_id: int, default: object = None) -> object:
+        return self.mapping.get(item_id, default)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self.mapping
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.mapping)
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+
+def _filter_rows(source: Mapping[int, ItemRecord]) -> Iterator[tuple[int, Optional[int], Optional[int]]]:
+    """Yield ``(item_id, category, rarity)`` for every item in *source*."""
+
+    if isinstance(source, CompiledItemCatalog):
+        # Read the int32 columns directly instead of building records
+        missing = repeat(COLUMN_MISSING)
+        categories = source.column("category") or missing
+        rarities = source.column("rarity") or missing
+        for item_id, category, rarity in zip(source, categories, rarities):
+            yield (
+                item_id,
+                None if category == COLUMN_MISSING else category,
+                None if rarity == COLUMN_MISSING else rarity,
+            )
+    else:
+        for item_id, record in source.items():
+            yield item_id, record.category, record.rarity
+
+
+def select_items(
+    mapping: Mapping[int, ItemRecord],
+    categories: Optional[Iterable[int]] = None,
+    min_rarity: Optional[int] = None,
+) -> frozenset[int]:
+    """Return the ids of the items in *mapping* that match every given filter.
+
+    The result is meant to be handed to the trade decoders as their
+    ``item_filter`` so listings for other items are skipped before they are
+    built, resolved or serialised.
+
+    Args:
+        mapping: Item catalog, e.g. from :func:`load_item_mapping`.
+        categories: Keep only items whose ``category`` is one of these.
+        min_rarity: Keep only items whose ``rarity`` is at least this.
+
+    Returns:
+        frozenset[int]: Matching item ids; every id when no filter is given.
+
+    Raises:
+        ValueError: If a filter is given but no item in *mapping* has that
+            column, i.e. the catalog was built without it.
+
+    Example:
+        >>> wanted = select_items(load_item_mapping(), categories=[5], min_rarity=4)
+        >>> listings = decode_hybrid(frames, item_filter=wanted)
+    """
+
+    if isinstance(mapping, ItemCatalogHandle):
+        mapping = mapping.mapping
+    wanted_categories = frozenset(categories) if categories is not None else None
+    # ChainMap lists the winning source first; apply them in override order
+    sources = list(reversed(mapping.maps)) if isinstance(mapping, ChainMap) else [mapping]
+    selected: set[int] = set()
+    has_category = has_rarity = False
+    for source in sources:
+        selected.difference_update(source)
+        for item_id, category, rarity in _filter_rows(source):
+            has_category = has_category or category is not None
+            has_rarity = has_rarity or rarity is not None
+            if wanted_categories is not None and category not in wanted_categories:
+                continue
+            if min_rarity is not None and (rarity is None or rarity < min_rarity):
+                continue
+            selected.add(item_id)
+    if wanted_categories is not None and not has_category:
+        raise ValueError("Item catalog has no category column; rebuild it with update-items")
+    if min_rarity is not None and not has_rarity:
+        raise ValueError("Item catalog has no rarity column; rebuild it with update-items")
+    return frozenset(selected)
 
 
 def resolve_item_name(item_id: int) -> Optional[str]:
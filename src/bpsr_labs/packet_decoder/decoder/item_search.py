@@ -0,0 +1,212 @@
+"""Name → item id search over the item catalog.
+
+:class:`ItemSearchIndex` answers queries such as ``"frostjade"`` or
+``"wind serum 1"`` without scanning every :class:`ItemRecord`:
+
+* a token inverted index maps each lower-cased word of an item name to the
+  ids containing it. Its sorted vocabulary lets every query word match as a
+  prefix with :func:`bisect.bisect_left`, and ids matching all query words
+  are intersected;
+* a trigram index over that vocabulary covers typos (``"frostjde"``). Each
+  query word is matched to the vocabulary words sharing its trigrams,
+  ranked by Jaccard similarity, and the items containing them are
+  intersected the same way.
+
+A numeric query also matches the item with that id.
+
+Example:
+    >>> index = load_search_index()
+    >>> [hit.name for hit in index.search("frostjade", limit=3)]
+    ['Frostjade Staff - Magic Wand', ...]
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord, load_item_mapping
+
+__all__ = ["ItemSearchIndex", "SearchHit", "load_search_index"]
+
+_WORD = re.compile(r"\w+")
+
+
+def _normalise(text: str) -> str:
+    """Casefold and strip accents so ``"Ünïcode"`` matches ``"unicode"``."""
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(_normalise(text))
+
+
+def _trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """One search result.
+
+    Attributes:
+        item_id: Matching item id.
+        name: Item display name.
+        score: Relevance in ``(0, 1]``; ``1`` for exact word or id matches.
+        fuzzy: Whether the hit came from trigram similarity.
+    """
+
+    item_id: int
+    name: str
+    score: float
+    fuzzy: bool = False
+
+    def to_dict(self) -> dict:
+        return {"item_id": self.item_id, "name": self.name, "score": round(self.score, 3), "fuzzy": self.fuzzy}
+
+
+class ItemSearchIndex:
+    """Token and trigram indexes over item names.
+
+    Args:
+        names: Item id → display name.
+    """
+
+    def __init__(self, names: Mapping[int, str]) -> None:
+        self._names: Dict[int, str] = dict(names)
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for item_id, name in self._names.items():
+            for token in _tokens(name):
+                postings[token].add(item_id)
+        self._vocabulary: List[str] = sorted(postings)
+        self._postings: Dict[str, frozenset] = {token: frozenset(ids) for token, ids in postings.items()}
+        grams: Dict[str, List[int]] = defaultdict(list)
+        self._gram_counts: List[int] = []
+        for position, token in enumerate(self._vocabulary):
+            token_grams = _trigrams(token)
+            self._gram_counts.append(len(token_grams))
+            for gram in token_grams:
+                grams[gram].append(position)
+        self._grams = dict(grams)
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[int, ItemRecord]) -> "ItemSearchIndex":
+        """Build an index from an item mapping such as :func:`load_item_mapping`."""
+
+        return cls({item_id: record.name for item_id, record in mapping.items()})
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _prefix_ids(self, word: str) -> Tuple[Set[int], Set[int]]:
+        """Return ``(exact, prefix)`` id sets for vocabulary words starting with *word*."""
+
+        exact = set(self._postings.get(word, ()))
+        prefixed: Set[int] = set()
+        vocabulary = self._vocabulary
+        index = bisect_left(vocabulary, word)
+        while index < len(vocabulary) and vocabulary[index].startswith(word):
+            prefixed.update(self._postings[vocabulary[index]])
+            index += 1
+        return exact, prefixed
+
+    def _token_hits(self, words: List[str]) -> Dict[int, float]:
+        matched: Optional[Set[int]] = None
+        exact_counts: Counter = Counter()
+        for word in words:
+            exact, prefixed = self._prefix_ids(word)
+            matched = prefixed if matched is None else matched & prefixed
+            if not matched:
+                return {}
+            exact_counts.update(exact & matched)
+        # Names containing the query words verbatim rank above prefix matches
+        return {
+            item_id: 0.5 + 0.5 * exact_counts[item_id] / len(words)
+            for item_id in matched or ()
+        }
+
+    def _similar_words(self, word: str, threshold: float) -> Dict[str, float]:
+        """Return vocabulary words whose trigram Jaccard similarity to *word* reaches *threshold*."""
+
+        grams = _trigrams(word)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        similar = {}
+        for position, common in shared.items():
+            similarity = common / (len(grams) + self._gram_counts[position] - common)
+            if similarity >= threshold:
+                similar[self._vocabulary[position]] = similarity
+        return similar
+
+    def _fuzzy_hits(self, words: List[str], threshold: float) -> Dict[int, float]:
+        combined: Optional[Dict[int, float]] = None
+        for word in words:
+            best: Dict[int, float] = {}
+            for token, similarity in self._similar_words(word, threshold).items():
+                for item_id in self._postings[token]:
+                    if similarity > best.get(item_id, 0.0):
+                        best[item_id] = similarity
+            if combined is None:
+                combined = best
+            else:
+                combined = {i: combined[i] + s for i, s in best.items() if i in combined}
+            if not combined:
+                return {}
+        return {item_id: total / len(words) for item_id, total in (combined or {}).items()}
+
+    def search(self, query: str, limit: int = 10, fuzzy_threshold: float = 0.4) -> List[SearchHit]:
+        """Return up to *limit* items matching *query*, best first.
+
+        Every query word must prefix a word of the item name. When that
+        yields fewer than *limit* hits, items with a word resembling each
+        query word (trigram Jaccard similarity of at least
+        *fuzzy_threshold*) fill the remainder, scored by mean similarity.
+        """
+
+        words = _tokens(query)
+        if not words or limit <= 0:
+            return []
+        scores: Dict[int, float] = {}
+        if len(words) == 1 and words[0].isdigit() and int(words[0]) in self._names:
+            scores[int(words[0])] = 1.0
+        for item_id, score in self._token_hits(words).items():
+            scores.setdefault(item_id, score)
+
+        def ranked(candidates: Dict[int, float]) -> List[int]:
+            return sorted(candidates, key=lambda i: (-candidates[i], len(self._names[i]), i))
+
+        hits = [SearchHit(i, self._names[i], scores[i]) for i in ranked(scores)[:limit]]
+        if len(hits) < limit:
+            fuzzy = {i: s for i, s in self._fuzzy_hits(words, fuzzy_threshold).items() if i not in scores}
+            hits.extend(
+                SearchHit(i, self._names[i], fuzzy[i], fuzzy=True)
+                for i in ranked(fuzzy)[: limit - len(hits)]
+            )
+        return hits
+
+
+_default_index: Optional[Tuple[Mapping[int, ItemRecord], ItemSearchIndex]] = None
+
+
+def load_search_index(mapping: Optional[Mapping[int, ItemRecord]] = None) -> ItemSearchIndex:
+    """Return a search index over *mapping* (default: :func:`load_item_mapping`).
+
+    The index for the default mapping is built once per process and rebuilt
+    only after ``load_item_mapping.cache_clear()`` produces a new mapping.
+    """
+
+    global _default_index
+    if mapping is not None:
+        return ItemSearchIndex.from_mapping(mapping)
+    mapping = load_item_mapping()
+    if _default_index is None or _default_index[0] is not mapping:
+        _default_index = (mapping, ItemSearchIndex.from_mapping(mapping))
+    return _default_index[1]
@@ -0,0 +1,151 @@
+"""Incremental change stream between successive trading-center snapshots.
+
+Every ``ExchangeNoticeDetail_Ret`` reply is a full snapshot of one page of an
+item's listings, so re-emitting decoded listings repeats the whole page each
+time the client refreshes. :class:`SnapshotDiffer` remembers the last
+snapshot per ``(item_id, page)`` and emits only what changed, at price-level
+granularity:
+
+* ``added``: a price level that was not in the previous snapshot;
+* ``removed``: a price level that disappeared;
+* ``changed``: a price level whose total quantity differs.
+
+Snapshots are ordered by ``server_sequence``; a reply that is not newer than
+the one already applied for its key is ignored, so replayed or out-of-order
+captures cannot roll the state back.
+
+Example:
+    >>> differ = SnapshotDiffer()
+    >>> for change in differ.diff_stream(listings):
+    ...     print(change.kind, change.item_id, change.price, change.quantity)
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+__all__ = ["ListingChange", "SnapshotDiffer"]
+
+SnapshotKey = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class ListingChange:
+    """One price-level change between two snapshots of an item page.
+
+    Attributes:
+        kind: ``"added"``, ``"removed"`` or ``"changed"``.
+        item_id: Item config id.
+        page: Page of the item's listings the snapshot covered.
+        price: Unit price of the level.
+        quantity: Quantity now listed at the price (0 when removed).
+        previous_quantity: Quantity listed before (0 when added).
+        server_sequence: Sequence of the snapshot that produced the change.
+    """
+
+    kind: str
+    item_id: int
+    page: int
+    price: int
+    quantity: int
+    previous_quantity: int
+    server_sequence: int
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "item_id": self.item_id,
+            "page": self.page,
+            "price_luno": self.price,
+            "quantity": self.quantity,
+            "previous_quantity": self.previous_quantity,
+            "server_sequence": self.server_sequence,
+        }
+
+
+class SnapshotDiffer:
+    """Keep the last snapshot per item page and report deltas against it."""
+
+    def __init__(self) -> None:
+        self._levels: Dict[SnapshotKey, Dict[int, int]] = {}
+        self._sequences: Dict[SnapshotKey, int] = {}
+
+    def snapshot(self, item_id: int, page: int = 0) -> Dict[int, int]:
+        """Return the current ``price -> quantity`` levels for an item page."""
+
+        return dict(self._levels.get((item_id, page), {}))
+
+    def apply(self, listings: Iterable[Listing], page: int = 0) -> List[ListingChange]:
+        """Apply the listings of one reply as the new snapshot of *page*.
+
+        Listings are grouped by item, so a reply covering several items
+        updates each of them. Listings without an item id are ignored.
+
+        Args:
+            listings: Listings decoded from a single reply.
+            page: Page index the reply covers; replies that do not carry a
+                page number all share page ``0``.
+
+        Returns:
+            List[ListingChange]: Changes ordered by item, then price.
+        """
+
+        levels_by_item: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        sequences: Dict[int, int] = {}
+        for listing in listings:
+            item_id = listing.item_config_id
+            if item_id is None:
+                continue
+            levels_by_item[item_id][listing.price_luno] += listing.quantity
+            sequences[item_id] = max(sequences.get(item_id, -1), listing.server_sequence)
+
+        changes: List[ListingChange] = []
+        for item_id in sorted(levels_by_item):
+            key = (item_id, page)
+            sequence = sequences[item_id]
+            if sequence <= self._sequences.get(key, -1):
+                continue  # stale or replayed reply
+            current = dict(levels_by_item[item_id])
+            previous = self._levels.get(key, {})
+            self._levels[key] = current
+            self._sequences[key] = sequence
+            changes.extend(self._diff(item_id, page, sequence, previous, current))
+        return changes
+
+    @staticmethod
+    def _diff(
+        item_id: int,
+        page: int,
+        sequence: int,
+        previous: Dict[int, int],
+        current: Dict[int, int],
+    ) -> Iterator[ListingChange]:
+        if previous == current:
+            return
+        for price in sorted(previous.keys() | current.keys()):
+            before = previous.get(price, 0)
+            after = current.get(price, 0)
+            if before == after:
+                continue
+            kind = "added" if not before else "removed" if not after else "changed"
+            yield ListingChange(kind, item_id, page, price, after, before, sequence)
+
+    def diff_stream(self, listings: Iterable[Listing], page: int = 0) -> Iterator[ListingChange]:
+        """Yield changes for a stream of decoded listings, reply by reply.
+
+        Consecutive listings sharing ``(frame_offset, server_sequence)`` are
+        treated as one reply, which matches how both trading decoders emit
+        them.
+
+        Args:
+            listings: Listings in decode order.
+            page: Page index shared by every reply.
+        """
+
+        for _, reply in groupby(listings, key=lambda listing: (listing.frame_offset, listing.server_sequence)):
+            yield from self.apply(reply, page=page)
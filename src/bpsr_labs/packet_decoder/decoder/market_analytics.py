@@ -0,0 +1,194 @@
+"""Vectorised price statistics over decoded trading-center listings.
+
+Listings are converted once into parallel NumPy columns (``item_id``,
+``price_luno``, ``quantity``, ``server_sequence``). Per-item statistics are
+then computed for every item at once: the columns are sorted by
+``(item_id, price)`` in a single argsort, group boundaries are found
+with :func:`numpy.flatnonzero`, and sums come from :func:`numpy.add.reduceat`.
+Because each group is sorted by price, min/max are its first/last rows and
+percentiles are index arithmetic. Nothing loops over items in Python.
+
+Example:
+    >>> from bpsr_labs.packet_decoder.decoder.market_analytics import item_summary
+    >>> summary = item_summary(listings, percentiles=(10, 90))
+    >>> summary.loc[1015091, ["min_price", "median_price", "p90", "vwap", "depth"]]
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:  # pragma: no cover - avoid importing zstandard/bbpb for analytics
+    from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+__all__ = ["ListingColumns", "item_summary", "listing_columns", "listings_frame"]
+
+ListingLike = Union["Listing", Mapping[str, Any]]
+
+_COLUMNS = ("item_id", "price_luno", "quantity", "server_sequence")
+_ROW_DTYPE = np.dtype([(name, np.int64) for name in _COLUMNS])
+
+
+@dataclass(frozen=True)
+class ListingColumns:
+    """Decoded listings as equal-length ``int64`` arrays.
+
+    Listings without an item id are dropped during conversion.
+    """
+
+    item_id: np.ndarray
+    price_luno: np.ndarray
+    quantity: np.ndarray
+    server_sequence: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.item_id)
+
+    def take(self, index: np.ndarray) -> "ListingColumns":
+        """Return the rows selected by *index* (an index array or boolean mask)."""
+
+        return ListingColumns(*(getattr(self, name)[index] for name in _COLUMNS))
+
+    def latest_snapshot(self) -> "ListingColumns":
+        """Keep, per item, only the listings from its highest ``server_sequence``.
+
+        Every trading-center reply is a full snapshot of an item's page, so
+        older replies for the same item repeat or contradict the newest one.
+        """
+
+        if not len(self):
+            return self
+        order = np.argsort(self.item_id, kind="stable")
+        items = self.item_id[order]
+        starts = np.flatnonzero(np.r_[True, items[1:] != items[:-1]])
+        latest = np.maximum.reduceat(self.server_sequence[order], starts)
+        counts = np.diff(np.r_[starts, len(items)])
+        keep = np.zeros(len(self), dtype=bool)
+        keep[order] = self.server_sequence[order] == np.repeat(latest, counts)
+        return self.take(keep)
+
+
+def _sort_order(items: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """Return the permutation ordering rows by item, then price."""
+
+    if items.min() >= 0 and items.max() < 2**31 and prices.min() >= 0 and prices.max() < 2**32:
+        # One packed int64 key sorts several times faster than a two-key lexsort
+        return np.argsort((items << 32) | prices)
+    return np.lexsort((prices, items))
+
+
+def _fields(listing: ListingLike) -> tuple:
+    if not isinstance(listing, Mapping):
+        return listing.item_config_id, listing.price_luno, listing.quantity, listing.server_sequence
+    metadata = listing.get("metadata") or {}
+    return (
+        listing.get("item_id"),
+        listing["price_luno"],
+        listing["quantity"],
+        metadata.get("server_sequence", 0),
+    )
+
+
+def listing_columns(listings: Iterable[ListingLike]) -> ListingColumns:
+    """Convert :class:`Listing` objects or ``trade-decode`` dicts to columns."""
+
+    rows = (row for row in map(_fields, listings) if row[0] is not None)
+    table = np.fromiter(rows, dtype=_ROW_DTYPE)
+    return ListingColumns(*(np.ascontiguousarray(table[name]) for name in _COLUMNS))
+
+
+def listings_frame(listings: Union[ListingColumns, Iterable[ListingLike]]) -> pd.DataFrame:
+    """Return listings as a DataFrame with one column per listing field."""
+
+    columns = listings if isinstance(listings, ListingColumns) else listing_columns(listings)
+    return pd.DataFrame({name: getattr(columns, name) for name in _COLUMNS})
+
+
+def item_summary(
+    listings: Union[ListingColumns, Iterable[ListingLike]],
+    percentiles: Sequence[float] = (10, 25, 75, 90),
+    weighted: bool = False,
+    latest_only: bool = False,
+) -> pd.DataFrame:
+    """Compute per-item price statistics for every item in *listings*.
+
+    Args:
+        listings: Listings, ``trade-decode`` dicts or prebuilt columns.
+        percentiles: Percentiles (0-100) reported as ``p<N>`` columns.
+        weighted: Rank prices by unit rather than by listing, so ``p90`` is
+            the price below which 90% of the listed *quantity* sits. The
+            unweighted form interpolates linearly between listings, like
+            :func:`numpy.percentile`.
+        latest_only: Only use each item's newest snapshot
+            (see :meth:`ListingColumns.latest_snapshot`).
+
+    Returns:
+        pandas.DataFrame: Indexed by ``item_id`` (ascending) with columns
+        ``listings``, ``depth``, ``min_price``, ``max_price``,
+        ``median_price``, ``vwap`` and one ``p<N>`` column per percentile.
+
+    Raises:
+        ValueError: If a percentile lies outside ``[0, 100]``.
+    """
+
+    ranks = np.asarray(list(percentiles), dtype=np.float64) / 100.0
+    if ranks.size and (ranks.min() < 0 or ranks.max() > 1):
+        raise ValueError("percentiles must lie within [0, 100]")
+    names = [f"p{p:g}" for p in percentiles]
+    columns = listings if isinstance(listings, ListingColumns) else listing_columns(listings)
+    if latest_only:
+        columns = columns.latest_snapshot()
+
+    if not len(columns):
+        int_columns = ["listings", "depth", "min_price", "max_price"]
+        dtypes: dict[str, type[np.generic]] = dict.fromkeys(int_columns, np.int64)
+        dtypes.update(dict.fromkeys(["median_price", "vwap", *names], np.float64))
+        empty = {name: np.empty(0, dtype=dtype) for name, dtype in dtypes.items()}
+        return pd.DataFrame(empty, index=pd.Index([], dtype=np.int64, name="item_id"))
+
+    order = _sort_order(columns.item_id, columns.price_luno)
+    items = columns.item_id[order]
+    prices = columns.price_luno[order]
+    quantities = columns.quantity[order]
+
+    starts = np.flatnonzero(np.r_[True, items[1:] != items[:-1]])
+    ends = np.r_[starts[1:], len(items)]
+    counts = ends - starts
+    depth = np.add.reduceat(quantities, starts)
+    notional = np.add.reduceat(prices * quantities, starts)
+    vwap = np.where(depth > 0, notional / np.maximum(depth, 1), np.nan)
+
+    all_ranks = np.r_[0.5, ranks]
+    if weighted:
+        # Price of the ceil(rank * depth)-th unit, by searching cumulative quantity
+        cumulative = np.cumsum(quantities)
+        before = cumulative[starts] - quantities[starts]
+        targets = before[:, None] + np.maximum(np.ceil(all_ranks[None, :] * depth[:, None]), 1)
+        index = np.searchsorted(cumulative, targets, side="left")
+        index = np.minimum(index, (ends - 1)[:, None])
+        ladder = prices[index].astype(np.float64)
+    else:
+        position = starts[:, None] + all_ranks[None, :] * (counts - 1)[:, None]
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        fraction = position - low
+        ladder = prices[low] + (prices[high] - prices[low]) * fraction
+
+    frame = pd.DataFrame(
+        {
+            "listings": counts,
+            "depth": depth,
+            "min_price": prices[starts],
+            "max_price": prices[ends - 1],
+            "median_price": ladder[:, 0],
+            "vwap": vwap,
+        },
+        index=pd.Index(items[starts], name="item_id"),
+    )
+    for column, name in enumerate(names, start=1):
+        frame[name] = ladder[:, column]
+    return frame
@@ -0,0 +1,301 @@
+"""Local SQLite history of trading-center listings.
+
+``trade-decode`` produces a one-shot JSON list per capture. This module keeps
+every sweep in a single SQLite database so prices can be tracked over time:
+
+* Listings are keyed by ``(capture_id, server_sequence, item_id, price,
+  quantity)``; re-ingesting a capture is a no-op.
+* Inserts are batched with ``executemany`` inside one transaction per batch.
+* A covering index on ``(item_id, observed_at, price, quantity)`` lets the
+  windowed price query read only the index, even with millions of rows.
+
+Example:
+    >>> from bpsr_labs.packet_decoder.decoder.market_store import MarketStore
+    >>> with MarketStore(Path('market.sqlite3')) as store:
+    ...     store.ingest(listings, capture_id='sweep-01', observed_at=1700000000000)
+    ...     windows = store.price_windows(1015091, window_ms=3_600_000)
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Mapping, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover - avoid importing zstandard/bbpb for queries
+    from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+__all__ = [
+    "IngestResult",
+    "MarketStore",
+    "PriceWindow",
+    "parse_timestamp_ms",
+]
+
+_DEFAULT_DB_PATH = Path(__file__).resolve().parents[4] / "data" / "market" / "market.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,
+    capture_id TEXT NOT NULL,
+    server_sequence INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    observed_at INTEGER NOT NULL,
+    UNIQUE (capture_id, server_sequence, item_id, price, quantity)
+);
+CREATE INDEX IF NOT EXISTS idx_listings_item_observed
+    ON listings (item_id, observed_at, price, quantity);
+"""
+
+_INSERT = """
+INSERT INTO listings (capture_id, server_sequence, item_id, price, quantity, observed_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (capture_id, server_sequence, item_id, price, quantity) DO NOTHING
+"""
+
+# Median uses the middle one or two rows of each bucket ranked by price
+_WINDOW_QUERY = """
+WITH ranked AS (
+    SELECT
+        observed_at - (observed_at % :window) AS bucket,
+        price,
+        quantity,
+        ROW_NUMBER() OVER (PARTITION BY observed_at - (observed_at % :window) ORDER BY price) AS rn,
+        COUNT(*) OVER (PARTITION BY observed_at - (observed_at % :window)) AS cnt
+    FROM listings
+    WHERE item_id = :item_id AND observed_at >= :since AND observed_at < :until
+)
+SELECT
+    bucket,
+    COUNT(*),
+    SUM(quantity),
+    MIN(price),
+    AVG(CASE WHEN rn IN ((cnt + 1) / 2, (cnt + 2) / 2) THEN price END),
+    CAST(SUM(price * quantity) AS REAL) / NULLIF(SUM(quantity), 0)
+FROM ranked
+GROUP BY bucket
+ORDER BY bucket
+"""
+
+ListingLike = Union["Listing", Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    """Outcome of :meth:`MarketStore.ingest`.
+
+    Attributes:
+        received: Listings offered for ingestion.
+        inserted: New rows written.
+        skipped: Listings without an item id, which cannot be indexed.
+    """
+
+    received: int
+    inserted: int
+    skipped: int
+
+    @property
+    def duplicates(self) -> int:
+        """Listings already present in the store."""
+
+        return self.received - self.inserted - self.skipped
+
+
+@dataclass(frozen=True)
+class PriceWindow:
+    """Price statistics for one item over one time bucket.
+
+    Attributes:
+        start_ms: Bucket start, in milliseconds since the Unix epoch.
+        listings: Number of listings observed in the bucket.
+        volume: Total quantity listed.
+        min_price: Lowest unit price.
+        median_price: Median unit price across listings (unweighted).
+        vwap: Volume-weighted average unit price, or ``None`` with zero volume.
+    """
+
+    start_ms: int
+    listings: int
+    volume: int
+    min_price: int
+    median_price: float
+    vwap: Optional[float]
+
+    def to_dict(self) -> dict:
+        return {
+            "start_ms": self.start_ms,
+            "listings": self.listings,
+            "volume": self.volume,
+            "min_price": self.min_price,
+            "median_price": self.median_price,
+            "vwap": self.vwap,
+        }
+
+
+def parse_timestamp_ms(value: Union[str, int, float, datetime]) -> int:
+    """Convert epoch milliseconds, an ISO-8601 string or a datetime to epoch ms.
+
+    Naive datetimes and ISO strings without an offset are taken as UTC.
+
+    Raises:
+        ValueError: If *value* is not a recognised timestamp.
+    """
+
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, (int, float)):
+        return int(value)
+    else:
+        text = value.strip()
+        if text.lstrip("-").isdigit():
+            return int(text)
+        moment = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def _row_fields(listing: ListingLike) -> tuple[Optional[int], int, int, int]:
+    """Return ``(item_id, price, quantity, server_sequence)`` for *listing*."""
+
+    if not isinstance(listing, Mapping):
+        return (
+            listing.item_config_id,
+            listing.price_luno,
+            listing.quantity,
+            listing.server_sequence,
+        )
+    metadata = listing.get("metadata") or {}
+    return (
+        listing.get("item_id"),
+        int(listing["price_luno"]),
+        int(listing["quantity"]),
+        int(metadata.get("server_sequence", 0)),
+    )
+
+
+class MarketStore:
+    """SQLite-backed listing history.
+
+    Args:
+        path: Database file, created on first use. ``":memory:"`` gives a
+            throwaway in-process store.
+    """
+
+    def __init__(self, path: Union[Path, str] = _DEFAULT_DB_PATH) -> None:
+        self.path = path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "MarketStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def ingest(
+        self,
+        listings: Iterable[ListingLike],
+        capture_id: str,
+        observed_at: int,
+        batch_size: int = 50_000,
+    ) -> IngestResult:
+        """Insert *listings* observed in capture *capture_id* at *observed_at*.
+
+        Args:
+            listings: :class:`Listing` objects or dicts in ``trade-decode``
+                output form.
+            capture_id: Identifier of the sweep the listings came from.
+            observed_at: Observation time in milliseconds since the epoch.
+            batch_size: Rows written per ``executemany`` transaction.
+
+        Returns:
+            IngestResult: Counts of received, inserted and skipped listings.
+        """
+
+        received = 0
+        skipped = 0
+
+        def rows() -> Iterator[tuple]:
+            nonlocal received, skipped
+            for listing in listings:
+                received += 1
+                item_id, price, quantity, server_sequence = _row_fields(listing)
+                if item_id is None:
+                    skipped += 1
+                    continue
+                yield (capture_id, server_sequence, int(item_id), price, quantity, observed_at)
+
+        inserted = 0
+        pending = rows()
+        while True:
+            batch = list(islice(pending, batch_size))
+            if not batch:
+                break
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.executemany(_INSERT, batch)
+            inserted += self._conn.total_changes - before
+        return IngestResult(received=received, inserted=inserted, skipped=skipped)
+
+    def price_windows(
+        self,
+        item_id: int,
+        window_ms: int,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> List[PriceWindow]:
+        """Return min, median and VWAP for *item_id* per *window_ms* bucket.
+
+        Buckets are aligned to multiples of *window_ms* since the epoch and
+        only buckets containing listings are returned.
+
+        Args:
+            item_id: Item config id to query.
+            window_ms: Bucket width in milliseconds.
+            since: Inclusive lower bound on ``observed_at`` (epoch ms).
+            until: Exclusive upper bound on ``observed_at`` (epoch ms).
+
+        Raises:
+            ValueError: If *window_ms* is not positive.
+        """
+
+        if window_ms <= 0:
+            raise ValueError("window_ms must be positive")
+        params = {
+            "item_id": item_id,
+            "window": window_ms,
+            "since": since if since is not None else -(2**63),
+            "until": until if until is not None else 2**63 - 1,
+        }
+        return [
+            PriceWindow(
+                start_ms=bucket,
+                listings=count,
+                volume=volume,
+                min_price=min_price,
+                median_price=median,
+                vwap=vwap,
+            )
+            for bucket, count, volume, min_price, median, vwap in self._conn.execute(
+                _WINDOW_QUERY, params
+            )
+        ]
+
+    def item_ids(self) -> List[int]:
+        """Return every item id with at least one stored listing."""
+
+        query = "SELECT DISTINCT item_id FROM listings ORDER BY item_id"
+        return [row[0] for row in self._conn.execute(query)]
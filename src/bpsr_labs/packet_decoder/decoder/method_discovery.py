@@ -0,0 +1,444 @@
+"""Discover static message classes for combat Notify methods.
+
+``combat_method_map.json`` tells :class:`CombatDecoderV2` which generated
+protobuf class to use for each ``method_id``. This module fills that table
+automatically: it samples Notify payloads for every method that is not yet
+mapped, trial-parses each sample against every message type found in the
+generated ``*_pb2`` modules and in the bundled descriptor set, scores the
+candidates and keeps the best one per method.
+
+A candidate scores well when the payload parses cleanly, leaves no unknown
+fields behind, re-encodes to roughly the original size and contains plausible
+values (printable strings, finite floats, known enum numbers). Trial scores
+are cached per payload hash so repeated runs over new captures only parse the
+new samples.
+
+Example:
+    >>> from bpsr_labs.packet_decoder.decoder.method_discovery import MethodDiscovery
+    >>> discovery = MethodDiscovery()
+    >>> results = discovery.discover([Path('capture.bin')])
+    >>> discovery.write_mapping(results)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from google.protobuf import message_factory
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+from google.protobuf.message import DecodeError, Message
+from google.protobuf.unknown_fields import UnknownFieldSet
+
+from .combat_decode import _DESCRIPTOR_PATH, _METHOD_TO_MESSAGE, SERVICE_UID
+from .combat_decode_v2 import _DEFAULT_MAPPING_PATH
+from .descriptor_registry import get_descriptor_registry
+from .framing import FrameReader
+from .generated_registry import GeneratedModuleRegistry
+
+__all__ = [
+    "Candidate",
+    "DiscoveredMethod",
+    "MethodDiscovery",
+    "score_payload",
+]
+
+LOGGER = logging.getLogger(__name__)
+
+_GENERATED_DIR = Path(__file__).resolve().parent.parent / "generated"
+_DEFAULT_CACHE_PATH = _DEFAULT_MAPPING_PATH.with_name(".combat_method_discovery_cache.json")
+# Bump whenever score_payload changes so stale cached scores are discarded
+_SCORER_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A message type that a method payload may be parsed as.
+
+    Attributes:
+        full_name: Fully qualified protobuf message name.
+        module: Generated module defining the class, or ``None`` for message
+            types that only exist in the descriptor set.
+        attr_path: Dotted attribute path of the class inside ``module``.
+    """
+
+    full_name: str
+    module: Optional[str] = None
+    attr_path: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        if self.module is None:
+            return f"descriptor:{self.full_name}"
+        return f"module:{self.module}:{self.attr_path}"
+
+    def mapping_entry(self) -> Dict[str, str]:
+        """Return the ``combat_method_map.json`` entry selecting this candidate."""
+
+        if self.module is None:
+            return {"descriptor": self.full_name}
+        return {"module": self.module, "message": self.attr_path or self.full_name}
+
+
+@dataclass
+class DiscoveredMethod:
+    """Outcome of the discovery pass for a single method.
+
+    Attributes:
+        method_id: Notify method identifier.
+        samples: Number of payload samples the scores are based on.
+        best: Winning candidate, or ``None`` if nothing scored above threshold.
+        score: Mean score of ``best`` over all samples.
+        runner_up_score: Mean score of the second best candidate.
+        ambiguous: True when the runner-up ties ``best`` and only the weak
+            tie breakers (populated field count, name order) separate them.
+    """
+
+    method_id: int
+    samples: int
+    best: Optional[Candidate]
+    score: float
+    runner_up_score: float
+    ambiguous: bool = False
+
+
+def _is_plausible(field: FieldDescriptor, value: object) -> bool:
+    if field.type == FieldDescriptor.TYPE_STRING:
+        text = str(value)
+        if not text:
+            return True
+        printable = sum(1 for ch in text if ch.isprintable() or ch.isspace())
+        return printable / len(text) >= 0.9
+    if field.type in (FieldDescriptor.TYPE_FLOAT, FieldDescriptor.TYPE_DOUBLE):
+        number = float(value)  # type: ignore[arg-type]
+        return math.isfinite(number) and (number == 0.0 or 1e-30 < abs(number) < 1e15)
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        return value in field.enum_type.values_by_number
+    return True
+
+
+def _inspect(message: Message) -> tuple[int, int, int, bool]:
+    """Return ``(values, plausible_values, distinct_fields, has_unknown)`` recursively."""
+
+    values = plausible = distinct = 0
+    has_unknown = len(UnknownFieldSet(message)) > 0
+    for field, value in message.ListFields():
+        distinct += 1
+        items = value if field.is_repeated else [value]
+        if field.message_type is not None and field.message_type.GetOptions().map_entry:
+            items = list(value.values()) if hasattr(value, "values") else []
+            if not items:
+                values += 1
+                plausible += 1
+                continue
+        for item in items:
+            if isinstance(item, Message):
+                sub_values, sub_plausible, sub_distinct, sub_unknown = _inspect(item)
+                values += sub_values + 1
+                plausible += sub_plausible + 1
+                distinct += sub_distinct
+                has_unknown = has_unknown or sub_unknown
+            else:
+                values += 1
+                plausible += _is_plausible(field, item)
+    return values, plausible, distinct, has_unknown
+
+
+def score_payload(message_cls: type[Message], payload: bytes) -> tuple[float, int]:
+    """Score how well *payload* fits *message_cls*.
+
+    Args:
+        message_cls: Protobuf message class to trial-parse with.
+        payload: Raw Notify payload.
+
+    Returns:
+        tuple[float, int]: Score in ``[0, 1]`` and the number of distinct
+        fields populated by the parse (used as a tie breaker).
+    """
+
+    if not payload:
+        return 0.0, 0
+    message = message_cls()
+    try:
+        message.ParseFromString(payload)
+    except (DecodeError, RuntimeError, ValueError):
+        return 0.0, 0
+
+    values, plausible, distinct, has_unknown = _inspect(message)
+    if values == 0:
+        return 0.0, 0
+    message.DiscardUnknownFields()
+    coverage = min(1.0, message.ByteSize() / len(payload))
+    score = coverage * (plausible / values)
+    if has_unknown:
+        score *= 0.5
+    return round(score, 6), distinct
+
+
+def _iter_descriptor_tree(descriptor: Descriptor, prefix: str = "") -> Iterator[tuple[Descriptor, str]]:
+    attr_path = f"{prefix}.{descriptor.name}" if prefix else descriptor.name
+    if not descriptor.GetOptions().map_entry:
+        yield descriptor, attr_path
+    for nested in descriptor.nested_types:
+        yield from _iter_descriptor_tree(nested, attr_path)
+
+
+class MethodDiscovery:
+    """Sample, trial-parse and score Notify payloads to map methods to classes.
+
+    Args:
+        mapping_path: ``combat_method_map.json`` to read known methods from and
+            write discoveries to.
+        descriptor_path: Descriptor set contributing descriptor-only candidates.
+        cache_path: JSON file holding cached trial scores.
+        generated_dir: Directory containing generated ``*_pb2`` modules.
+        max_samples: Maximum distinct payloads scored per method.
+        min_score: Minimum mean score for a candidate to be accepted.
+    """
+
+    def __init__(
+        self,
+        mapping_path: Path = _DEFAULT_MAPPING_PATH,
+        descriptor_path: Path = _DESCRIPTOR_PATH,
+        cache_path: Optional[Path] = _DEFAULT_CACHE_PATH,
+        generated_dir: Path = _GENERATED_DIR,
+        max_samples: int = 8,
+        min_score: float = 0.9,
+    ) -> None:
+        self.mapping_path = Path(mapping_path)
+        self.descriptor_path = Path(descriptor_path)
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.generated_dir = Path(generated_dir)
+        self.max_samples = max_samples
+        self.min_score = min_score
+        self._candidates: Optional[Dict[str, tuple[Candidate, type[Message]]]] = None
+
+    # ------------------------------------------------------------------
+    # Candidates
+    # ------------------------------------------------------------------
+    def _iter_generated_candidates(self) -> Iterator[tuple[Candidate, type[Message]]]:
+        if not self.generated_dir.is_dir():
+            return
+        registry = GeneratedModuleRegistry(self.generated_dir)
+        for path in sorted(self.generated_dir.glob("*_pb2.py")):
+            try:
+                module = registry.module(path.stem)
+            except Exception as exc:  # generated modules may have unmet imports
+                LOGGER.debug("Skipping generated module %s: %s", path.stem, exc)
+                continue
+            for top in module.DESCRIPTOR.message_types_by_name.values():
+                for descriptor, attr_path in _iter_descriptor_tree(top):
+                    candidate = Candidate(descriptor.full_name, path.stem, attr_path)
+                    yield candidate, message_factory.GetMessageClass(descriptor)
+
+    def _iter_descriptor_candidates(self) -> Iterator[tuple[Candidate, type[Message]]]:
+        if not self.descriptor_path.exists():
+            return
+        registry = get_descriptor_registry(self.descriptor_path)
+        for descriptor in registry.iter_message_descriptors():
+            if descriptor.GetOptions().map_entry:
+                continue
+            message_cls = registry.message_class(descriptor.full_name)
+            if message_cls is not None:
+                yield Candidate(descriptor.full_name), message_cls
+
+    def candidates(self) -> Dict[str, tuple[Candidate, type[Message]]]:
+        """Return every candidate keyed by :attr:`Candidate.key`.
+
+        Generated classes take precedence over descriptor-only types with the
+        same full name since they need no dynamic pool at decode time.
+        """
+
+        if self._candidates is None:
+            found: Dict[str, tuple[Candidate, type[Message]]] = {}
+            generated_names: set[str] = set()
+            for candidate, message_cls in self._iter_generated_candidates():
+                found[candidate.key] = (candidate, message_cls)
+                generated_names.add(candidate.full_name)
+            for candidate, message_cls in self._iter_descriptor_candidates():
+                if candidate.full_name not in generated_names:
+                    found[candidate.key] = (candidate, message_cls)
+            self._candidates = found
+        return self._candidates
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256(f"scorer:{_SCORER_VERSION}".encode())
+        for key in sorted(self.candidates()):
+            digest.update(key.encode())
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Mapping and cache I/O
+    # ------------------------------------------------------------------
+    def _load_mapping(self) -> Dict[str, Any]:
+        if not self.mapping_path.exists():
+            return {"service_uid": f"0x{SERVICE_UID:016x}", "methods": {}}
+        mapping = json.loads(self.mapping_path.read_text(encoding="utf-8"))
+        if not isinstance(mapping, dict):
+            raise TypeError(f"Method mapping {self.mapping_path} is not a JSON object")
+        return mapping
+
+    def known_methods(self) -> set[int]:
+        """Return method ids already present in the mapping file."""
+
+        known: set[int] = set()
+        for key in self._load_mapping().get("methods", {}):
+            try:
+                known.add(int(key, 0))
+            except ValueError:
+                continue
+        return known
+
+    def _load_cache(self) -> Dict[str, Dict[str, Dict[str, list]]]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        if payload.get("fingerprint") != self._fingerprint():
+            LOGGER.info("Candidate set changed; discarding cached trial scores")
+            return {}
+        methods = payload.get("methods")
+        return methods if isinstance(methods, dict) else {}
+
+    def _save_cache(self, methods: Dict[str, Dict[str, Dict[str, list]]]) -> None:
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"fingerprint": self._fingerprint(), "methods": methods}
+        self.cache_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+    def collect_samples(
+        self, captures: Iterable[Path], skip: Iterable[int] = ()
+    ) -> Dict[int, Dict[str, bytes]]:
+        """Collect distinct non-empty payloads per unmapped method.
+
+        Args:
+            captures: Binary capture files to scan.
+            skip: Method ids to ignore (typically the already mapped ones).
+
+        Returns:
+            Dict[int, Dict[str, bytes]]: method id → payload hash → payload.
+        """
+
+        skipped = set(skip)
+        samples: Dict[int, Dict[str, bytes]] = defaultdict(dict)
+        for capture in captures:
+            reader = FrameReader()
+            for frame in reader.iter_notify_frames(Path(capture).read_bytes()):
+                if frame.service_uid != SERVICE_UID or frame.method_id in skipped:
+                    continue
+                bucket = samples[frame.method_id]
+                if not frame.payload or len(bucket) >= self.max_samples:
+                    continue
+                bucket.setdefault(hashlib.sha1(frame.payload).hexdigest(), bytes(frame.payload))
+        return dict(samples)
+
+    def discover(self, captures: Sequence[Path]) -> List[DiscoveredMethod]:
+        """Run the discovery pass over *captures*.
+
+        Payloads whose hashes are already in the cache are not re-parsed.
+
+        Args:
+            captures: Binary capture files to sample payloads from.
+
+        Returns:
+            List[DiscoveredMethod]: One result per sampled method, sorted by id.
+        """
+
+        candidates = self.candidates()
+        cache = self._load_cache()
+        known = self.known_methods()
+        samples = self.collect_samples(captures, skip=known)
+        # Methods sampled by earlier runs are ranked again from the cache alone
+        method_ids = set(samples) | {int(key, 16) for key in cache} - known
+
+        results: List[DiscoveredMethod] = []
+        for method_id in sorted(method_ids):
+            method_key = f"0x{method_id:08x}"
+            scored = cache.setdefault(method_key, {})
+            for payload_hash, payload in samples.get(method_id, {}).items():
+                if payload_hash in scored or len(scored) >= self.max_samples:
+                    continue
+                trial: Dict[str, list] = {}
+                for key, (_, message_cls) in candidates.items():
+                    score, distinct = score_payload(message_cls, payload)
+                    if score > 0:
+                        trial[key] = [score, distinct]
+                scored[payload_hash] = trial
+            results.append(self._rank(method_id, scored))
+
+        self._save_cache(cache)
+        return results
+
+    def _rank(self, method_id: int, scored: Dict[str, Dict[str, list]]) -> DiscoveredMethod:
+        totals: Dict[str, float] = defaultdict(float)
+        fields: Dict[str, int] = defaultdict(int)
+        for trial in scored.values():
+            for key, (score, distinct) in trial.items():
+                totals[key] += score
+                fields[key] += distinct
+
+        sample_count = len(scored)
+        candidates = self.candidates()
+        # The hand-maintained V1 table acts as a prior for structurally identical types
+        prior = _METHOD_TO_MESSAGE.get(method_id)
+
+        def _strength(key: str) -> tuple[float, bool]:
+            return round(totals[key], 6), candidates[key][0].full_name == prior
+
+        ranked = sorted(
+            (key for key in totals if key in candidates),
+            key=lambda key: (tuple(-v for v in _strength(key)), -fields[key], key),
+        )
+        if not ranked or sample_count == 0:
+            return DiscoveredMethod(method_id, sample_count, None, 0.0, 0.0)
+
+        best_score = totals[ranked[0]] / sample_count
+        runner_up = totals[ranked[1]] / sample_count if len(ranked) > 1 else 0.0
+        ambiguous = len(ranked) > 1 and _strength(ranked[0]) == _strength(ranked[1])
+        best = candidates[ranked[0]][0] if best_score >= self.min_score else None
+        return DiscoveredMethod(method_id, sample_count, best, best_score, runner_up, ambiguous)
+
+    def write_mapping(
+        self, results: Iterable[DiscoveredMethod], include_ambiguous: bool = False
+    ) -> int:
+        """Merge accepted discoveries into the mapping file.
+
+        Existing entries are never overwritten, and ambiguous winners are
+        skipped unless *include_ambiguous* is set.
+
+        Returns:
+            int: Number of methods added.
+        """
+
+        mapping = self._load_mapping()
+        methods = mapping.setdefault("methods", {})
+        added = 0
+        for result in results:
+            key = f"0x{result.method_id:08x}"
+            if result.best is None or key in methods:
+                continue
+            if result.ambiguous and not include_ambiguous:
+                continue
+            entry: Dict[str, object] = dict(result.best.mapping_entry())
+            entry["score"] = round(result.score, 4)
+            entry["samples"] = result.samples
+            methods[key] = entry
+            added += 1
+        mapping["methods"] = dict(sorted(methods.items()))
+        self.mapping_path.parent.mkdir(parents=True, exist_ok=True)
+        self.mapping_path.write_text(json.dumps(mapping, indent=2) + "\n", encoding="utf-8")
+        return added
@@ -0,0 +1,334 @@
+"""In-memory trading-center order book built from decoded listings.
+
+:func:`~bpsr_labs.packet_decoder.decoder.trading_center_decode.consolidate`
+flattens listings into a deduplicated list, which cannot answer questions such
+as "what are the five cheapest offers for item X" or "how much does it cost to
+buy 300 units". :class:`OrderBook` keeps one price-sorted book per item. Each
+book has two Fenwick (binary indexed) trees over its price levels, one for
+quantity and one for notional value (``price * quantity``). With those:
+
+* best price and fill cost are answered in ``O(log n)`` by descending the
+  quantity tree;
+* a quantity change at an existing price level is an ``O(log n)`` update;
+* a new price level marks the book dirty and the trees are rebuilt in
+  ``O(n)`` on the next query, so a burst of updates pays for one rebuild.
+
+Example:
+    >>> book = OrderBook.from_listings(listings)
+    >>> book.best_price(1015091)
+    2063
+    >>> book.fill_cost(1015091, 20).cost
+    41971
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+__all__ = ["FillQuote", "OrderBook", "PriceLevel"]
+
+
+@dataclass(frozen=True)
+class PriceLevel:
+    """Total quantity offered at one unit price."""
+
+    price: int
+    quantity: int
+
+
+@dataclass(frozen=True)
+class FillQuote:
+    """Cost of buying *requested* units of an item from the cheapest offers.
+
+    Attributes:
+        item_id: Item config id.
+        requested: Units asked for.
+        filled: Units available to buy, at most *requested*.
+        cost: Total price of the *filled* units.
+        worst_price: Highest unit price paid, or ``None`` if nothing filled.
+    """
+
+    item_id: int
+    requested: int
+    filled: int
+    cost: int
+    worst_price: Optional[int]
+
+    @property
+    def complete(self) -> bool:
+        """Whether the book held enough depth to fill the whole request."""
+
+        return self.filled == self.requested
+
+    @property
+    def average_price(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled else None
+
+
+class _Fenwick:
+    """Binary indexed tree of integer sums over positions ``0..n-1``."""
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, values: List[int]) -> None:
+        tree = [0] + values
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, index: int, delta: int) -> None:
+        tree = self._tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count: int) -> int:
+        """Sum of the first *count* positions."""
+
+        tree = self._tree
+        total = 0
+        while count > 0:
+            total += tree[count]
+            count -= count & -count
+        return total
+
+    def lower_bound(self, target: int) -> int:
+        """Smallest position whose inclusive prefix sum reaches *target*.
+
+        Requires non-negative values and ``0 < target <= prefix(n)``.
+        """
+
+        tree = self._tree
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] < target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+class _ItemBook:
+    """Price levels for a single item.
+
+    ``pages`` holds the levels each snapshot page contributed, so a page can
+    be replaced without touching the others.
+    """
+
+    __slots__ = ("prices", "quantities", "pages", "page_sequences", "_trees_cache")
+
+    def __init__(self) -> None:
+        self.prices: List[int] = []
+        self.quantities: Dict[int, int] = {}
+        self.pages: Dict[int, Dict[int, int]] = {}
+        self.page_sequences: Dict[int, int] = {}
+        # (quantity tree, notional tree); None until the next query rebuilds it
+        self._trees_cache: Optional[tuple[_Fenwick, _Fenwick]] = None
+
+    def adjust(self, price: int, delta: int) -> None:
+        current = self.quantities.get(price)
+        if current is None:
+            if delta < 0:
+                raise ValueError(f"No quantity listed at price {price}")
+            if delta == 0:
+                return
+            self.quantities[price] = delta
+            insort(self.prices, price)
+            self._trees_cache = None  # rebuilt lazily on next query
+            return
+        updated = current + delta
+        if updated < 0:
+            raise ValueError(f"Only {current} listed at price {price}, cannot remove {-delta}")
+        self.quantities[price] = updated
+        if self._trees_cache is not None:
+            qty, notional = self._trees_cache
+            index = bisect_left(self.prices, price)
+            qty.add(index, delta)
+            notional.add(index, delta * price)
+
+    def replace_page(self, page: int, levels: Dict[int, int]) -> None:
+        """Swap the levels *page* contributed for *levels*, leaving other pages alone."""
+
+        previous = self.pages.get(page, {})
+        for price, quantity in previous.items():
+            if price not in levels:
+                self.adjust(price, -quantity)
+        for price, quantity in levels.items():
+            self.adjust(price, quantity - previous.get(price, 0))
+        self.pages[page] = dict(levels)
+
+    def _trees(self) -> tuple[_Fenwick, _Fenwick]:
+        if self._trees_cache is None:
+            # Drop emptied levels while rebuilding anyway
+            self.prices = [price for price in self.prices if self.quantities[price]]
+            self.quantities = {price: self.quantities[price] for price in self.prices}
+            self._trees_cache = (
+                _Fenwick([self.quantities[price] for price in self.prices]),
+                _Fenwick([price * self.quantities[price] for price in self.prices]),
+            )
+        return self._trees_cache
+
+    def depth(self) -> int:
+        qty, _ = self._trees()
+        return qty.prefix(len(self.prices))
+
+    def best_price(self) -> Optional[int]:
+        qty, _ = self._trees()
+        if qty.prefix(len(self.prices)) == 0:
+            return None
+        return self.prices[qty.lower_bound(1)]
+
+    def fill(self, quantity: int) -> tuple[int, int, Optional[int]]:
+        """Return ``(filled, cost, worst_price)`` for buying *quantity* units."""
+
+        qty, notional = self._trees()
+        total = qty.prefix(len(self.prices))
+        if quantity <= 0 or total == 0:
+            return 0, 0, None
+        if quantity >= total:
+            return total, notional.prefix(len(self.prices)), self.prices[qty.lower_bound(total)]
+        index = qty.lower_bound(quantity)
+        before = qty.prefix(index)
+        price = self.prices[index]
+        return quantity, notional.prefix(index) + (quantity - before) * price, price
+
+
+class OrderBook:
+    """Per-item order books supporting best-price and fill-cost queries.
+
+    Listings without an item id are ignored, since they cannot be attributed
+    to a book.
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[int, _ItemBook] = {}
+
+    @classmethod
+    def from_listings(cls, listings: Iterable[Listing]) -> "OrderBook":
+        """Build a book holding every listing in *listings*."""
+
+        book = cls()
+        for listing in listings:
+            book.add(listing)
+        return book
+
+    def _book(self, item_id: int) -> _ItemBook:
+        book = self._books.get(item_id)
+        if book is None:
+            book = self._books[item_id] = _ItemBook()
+        return book
+
+    def add(self, listing: Listing) -> None:
+        """Add *listing*'s quantity at its price."""
+
+        if listing.item_config_id is None:
+            return
+        self._book(listing.item_config_id).adjust(listing.price_luno, listing.quantity)
+
+    def remove(self, listing: Listing) -> None:
+        """Remove *listing*'s quantity at its price.
+
+        Raises:
+            ValueError: If the book holds less than that quantity at the price.
+        """
+
+        if listing.item_config_id is None:
+            return
+        book = self._books.get(listing.item_config_id)
+        if book is None:
+            raise ValueError(f"No listings for item {listing.item_config_id}")
+        book.adjust(listing.price_luno, -listing.quantity)
+
+    def apply_snapshot(self, listings: Iterable[Listing], page: int = 0) -> List[int]:
+        """Replace one page of item books with freshly decoded replies.
+
+        Each reply is a snapshot of one page of an item's listings, so, as in
+        :class:`~bpsr_labs.packet_decoder.decoder.listing_diff.SnapshotDiffer`,
+        snapshots are kept per ``(item_id, page)``. Listings are grouped by
+        item; the levels *page* contributed to each item's book are replaced
+        by its group from the highest ``server_sequence`` present, and other
+        pages keep theirs. Groups older than the snapshot already applied to
+        that item page are ignored. Only levels whose quantity changed are
+        touched, so replaying an unchanged snapshot costs no tree rebuild.
+
+        Args:
+            listings: Listings decoded from the replies for *page*.
+            page: Page index the replies cover; replies that do not carry a
+                page number all share page ``0``.
+
+        Returns:
+            List[int]: Item ids whose page was replaced.
+        """
+
+        latest: Dict[int, int] = {}
+        grouped: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for listing in listings:
+            item_id = listing.item_config_id
+            if item_id is None:
+                continue
+            sequence = listing.server_sequence
+            if sequence > latest.get(item_id, -1):
+                latest[item_id] = sequence
+                grouped[item_id] = defaultdict(int)
+            if sequence == latest[item_id]:
+                grouped[item_id][listing.price_luno] += listing.quantity
+
+        replaced: List[int] = []
+        for item_id, levels in grouped.items():
+            book = self._book(item_id)
+            if latest[item_id] < book.page_sequences.get(page, -1):
+                continue
+            book.replace_page(page, levels)
+            book.page_sequences[page] = latest[item_id]
+            replaced.append(item_id)
+        return replaced
+
+    def items(self) -> List[int]:
+        """Return item ids with at least one unit listed."""
+
+        return sorted(item_id for item_id, book in self._books.items() if book.depth())
+
+    def depth(self, item_id: int) -> int:
+        """Return the total quantity listed for *item_id*."""
+
+        book = self._books.get(item_id)
+        return book.depth() if book is not None else 0
+
+    def best_price(self, item_id: int) -> Optional[int]:
+        """Return the lowest unit price listed for *item_id*, if any."""
+
+        book = self._books.get(item_id)
+        return book.best_price() if book is not None else None
+
+    def fill_cost(self, item_id: int, quantity: int) -> FillQuote:
+        """Quote buying *quantity* units of *item_id* from the cheapest offers."""
+
+        book = self._books.get(item_id)
+        filled, cost, worst = book.fill(quantity) if book is not None else (0, 0, None)
+        return FillQuote(item_id=item_id, requested=quantity, filled=filled, cost=cost, worst_price=worst)
+
+    def cheapest(self, item_id: int, n: int) -> List[PriceLevel]:
+        """Return the *n* cheapest non-empty price levels for *item_id*."""
+
+        book = self._books.get(item_id)
+        if book is None or n <= 0:
+            return []
+        levels: List[PriceLevel] = []
+        for price in book.prices:
+            quantity = book.quantities[price]
+            if quantity:
+                levels.append(PriceLevel(price, quantity))
+                if len(levels) == n:
+                    break
+        return levels
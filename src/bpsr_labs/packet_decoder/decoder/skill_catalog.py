@@ -0,0 +1,259 @@
+"""Helpers for resolving combat skill IDs into human-readable names.
+
+Damage events identify the skill that dealt them by ``owner_id`` (or
+``hit_event_id``). This module maps those ids to names from the
+StarResonanceData skill tables, the same way :mod:`item_catalog` does for
+items: several sources are merged with later sources winning, and
+``update-skills`` writes a compiled catalog (``.bin`` sibling, the
+:mod:`catalog_format` layout under its own magic) that is memory-mapped instead of
+parsed whenever it is at least as new as its JSON file.
+
+Example:
+    Naming the skills of a DPS summary:
+    >>> from bpsr_labs.packet_decoder.decoder.skill_catalog import resolve_skill_names
+    >>> resolve_skill_names([1701, 1702])
+    {1701: "Frost Lance", 1702: "Ice Arrow"}
+"""
+
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Mapping, Optional, Sequence, Union
+
+from bpsr_labs.packet_decoder.decoder.catalog_format import (
+    COMPILED_SUFFIX,
+    CompiledCatalog,
+    compiled_parts,
+    iter_candidate_files,
+    iter_json_object,
+    merge_sources,
+    write_parts,
+)
+
+__all__ = [
+    "CompiledSkillCatalog",
+    "SkillRecord",
+    "build_mapping_from_sources",
+    "load_skill_mapping",
+    "load_source_file",
+    "resolve_skill_names",
+    "update_skill_catalog",
+    "write_compiled_skill_catalog",
+]
+
+_DEFAULT_SEARCH_LOCATIONS: tuple[Path, ...] = (
+    Path("data/game-data/skill_name_map.json"),
+    Path("ref/StarResonanceData/skill_name_map.json"),
+    Path("ref/StarResonanceData/ztable/SkillTable.json"),
+)
+
+DEFAULT_SOURCE_ROOTS: tuple[Path, ...] = (Path("ref/StarResonanceData"),)
+DEFAULT_PATTERNS: tuple[str, ...] = (
+    "skill_name_map.json",
+    "SkillTable.json",
+    "skilltable.json",
+)
+
+
+@dataclass(frozen=True)
+class SkillRecord:
+    """Immutable record representing a combat skill.
+
+    Attributes:
+        skill_id: Skill id as it appears in damage events.
+        name: Human-readable display name for the skill.
+        icon: Optional path or identifier for the skill's icon.
+    """
+
+    skill_id: int
+    name: str
+    icon: Optional[str] = None
+
+
+def _load_raw_mapping(path: Path) -> dict[int, SkillRecord]:
+    """Load a ``{id: name}`` or ``{id: {"name", "icon"}}`` skill map."""
+
+    mapping: dict[int, SkillRecord] = {}
+    for raw_key, value in iter_json_object(path):
+        try:
+            skill_id = int(raw_key)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(value, dict):
+            name = value.get("name") or value.get("Name")
+            icon = value.get("icon") or value.get("Icon")
+        else:
+            name = str(value)
+            icon = None
+        if not isinstance(name, str) or not name:
+            continue
+        mapping[skill_id] = SkillRecord(skill_id, name, icon if isinstance(icon, str) else None)
+    return mapping
+
+
+def _load_from_skill_table(path: Path) -> dict[int, SkillRecord]:
+    """Load ``SkillTable.json`` rows, keeping only Id, Name and Icon."""
+
+    mapping: dict[int, SkillRecord] = {}
+    for raw_key, value in iter_json_object(path):
+        if not isinstance(value, dict):
+            continue
+        skill_id = value.get("Id")
+        name = value.get("Name")
+        icon = value.get("Icon")
+        if not isinstance(skill_id, int):
+            try:
+                skill_id = int(raw_key)
+            except (TypeError, ValueError):
+                continue
+        if not isinstance(name, str) or not name:
+            continue
+        mapping[skill_id] = SkillRecord(skill_id, name, icon if isinstance(icon, str) else None)
+    return mapping
+
+
+def load_source_file(path: Path) -> dict[int, SkillRecord]:
+    """Parse one skill source file, choosing the parser from its name.
+
+    Returns an empty mapping for files that can't be read or parsed.
+    """
+
+    try:
+        if path.name.lower() == "skilltable.json":
+            return _load_from_skill_table(path)
+        return _load_raw_mapping(path)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def build_mapping_from_sources(paths: Iterable[Path]) -> dict[int, SkillRecord]:
+    """Merge every readable file in *paths*; later files win per skill id."""
+
+    merged: dict[int, SkillRecord] = {}
+    for candidate in paths:
+        if candidate.is_file():
+            merged.update(load_source_file(candidate))
+    return merged
+
+
+class CompiledSkillCatalog(CompiledCatalog[SkillRecord]):
+    """Read-only skill mapping backed by a compiled catalog buffer.
+
+    Same layout and API as
+    :class:`~bpsr_labs.packet_decoder.decoder.item_catalog.CompiledItemCatalog`,
+    but a distinct magic so item and skill catalogs can't be mixed up, and
+    lookups return :class:`SkillRecord`.
+    """
+
+    MAGIC = b"BPSRSKIL"
+
+    def _make_record(self, record_id: int, name: str, icon: Optional[str], columns: dict[str, int]) -> SkillRecord:
+        return SkillRecord(skill_id=record_id, name=name, icon=icon)
+
+
+def write_compiled_skill_catalog(mapping: Mapping[int, SkillRecord], path: Path) -> None:
+    """Write *mapping* as a compiled skill catalog, replacing *path* atomically."""
+
+    write_parts(compiled_parts(mapping, CompiledSkillCatalog.MAGIC), path)
+
+
+@lru_cache(maxsize=1)
+def _load_skill_mapping(search_paths: Optional[tuple[Path, ...]]) -> Mapping[int, SkillRecord]:
+    paths = search_paths if search_paths is not None else _DEFAULT_SEARCH_LOCATIONS
+    return merge_sources(paths, CompiledSkillCatalog, build_mapping_from_sources)
+
+
+def load_skill_mapping(search_paths: Iterable[Path] | None = None) -> Mapping[int, SkillRecord]:
+    """Load a skill id → :class:`SkillRecord` mapping.
+
+    Behaves like :func:`~bpsr_labs.packet_decoder.decoder.item_catalog.load_item_mapping`:
+    fresh compiled siblings are memory-mapped, later sources win and the
+    most recent result is cached (``load_skill_mapping.cache_clear()``).
+
+    Args:
+        search_paths: Paths to probe. When omitted, a default set of
+            repository-relative locations is used.
+
+    Returns:
+        Mapping[int, SkillRecord]: Possibly empty skill mapping.
+    """
+
+    key = tuple(Path(path) for path in search_paths) if search_paths is not None else None
+    return _load_skill_mapping(key)
+
+
+load_skill_mapping.cache_clear = _load_skill_mapping.cache_clear  # type: ignore[attr-defined]
+
+
+def resolve_skill_names(
+    skill_ids: Iterable[Union[int, str]],
+    mapping: Optional[Mapping[int, SkillRecord]] = None,
+) -> dict[int, str]:
+    """Resolve the distinct ids in *skill_ids* to names in one pass.
+
+    Args:
+        skill_ids: Skill ids, as ints or numeric strings (e.g. the keys of
+            a DPS summary). Duplicates are looked up once.
+        mapping: Skill mapping to use; :func:`load_skill_mapping` when omitted.
+
+    Returns:
+        dict[int, str]: Names of the ids that were found.
+    """
+
+    if mapping is None:
+        mapping = load_skill_mapping()
+    names: dict[int, str] = {}
+    for skill_id in {int(skill_id) for skill_id in skill_ids}:
+        record = mapping.get(skill_id)
+        if record is not None:
+            names[skill_id] = record.name
+    return names
+
+
+def update_skill_catalog(
+    source_roots: Sequence[Path],
+    output: Path,
+    indent: Optional[int] = 2,
+) -> dict[int, SkillRecord]:
+    """Rebuild the skill mapping JSON and its compiled catalog at *output*.
+
+    Args:
+        source_roots: Files or directories scanned for skill tables.
+        output: Mapping JSON path; the compiled catalog is written next to it.
+        indent: JSON indentation for the mapping.
+
+    Returns:
+        dict[int, SkillRecord]: The merged mapping that was written.
+
+    Raises:
+        ValueError: If no sources are found or they yield no skills.
+    """
+
+    candidates = list(iter_candidate_files(source_roots, DEFAULT_PATTERNS))
+    if not candidates:
+        raise ValueError(
+            "No candidate files discovered under: " + ", ".join(str(p) for p in source_roots)
+        )
+    mapping = build_mapping_from_sources(candidates)
+    if not mapping:
+        raise ValueError("Failed to construct skill mapping from candidates. Check source data integrity.")
+
+    serializable: OrderedDict[str, dict[str, str]] = OrderedDict()
+    for skill_id in sorted(mapping):
+        record = mapping[skill_id]
+        entry = {"name": record.name}
+        if record.icon:
+            entry["icon"] = record.icon
+        serializable[str(skill_id)] = entry
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    tmp.write_text(json.dumps(serializable, ensure_ascii=False, indent=indent) + "\n", encoding="utf-8")
+    tmp.replace(output)
+    # Written after the JSON so its mtime marks it as fresh
+    write_compiled_skill_catalog(mapping, output.with_suffix(COMPILED_SUFFIX))
+    return mapping
@@ -0,0 +1,299 @@
+"""Decode many trading-center captures in parallel and merge the results.
+
+``trade-decode`` handles one capture per invocation. Collectors produce many
+captures per hour, so :func:`decode_captures` fans them out over a process
+pool instead:
+
+* each worker frames, inflates and decodes one capture and deduplicates its
+  listings locally, so only unique listings cross the process boundary;
+* the parent merges the per-capture results in input order, deduplicating
+  across captures with the same ``(item, price, quantity)`` key as
+  :func:`consolidate`;
+* given an item mapping, the parent publishes it once as a
+  :class:`SharedItemCatalog`. Workers attach to it read-only and render
+  named output dicts in parallel, so no worker parses or copies the
+  catalog;
+* the parent's learned V1 typedef is seeded into every worker, and a typedef
+  a worker had to learn is handed back so the parent can persist it.
+
+Example:
+    >>> batch = decode_captures(sorted(Path('captures').glob('*.bin')), item_mapping=mapping, max_workers=8)
+    >>> merged = list(batch.merged())
+    >>> [summary.to_dict() for summary in batch.summaries]
+"""
+
+from __future__ import annotations
+
+import atexit
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import (
+    CompiledItemCatalog,
+    ItemRecord,
+    SharedItemCatalog,
+)
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import (
+    Listing,
+    ListingTypedefCache,
+    iter_frames,
+    iter_listing_blocks,
+)
+
+__all__ = ["BatchResult", "CaptureSummary", "decode_captures"]
+
+ListingKey = Tuple[Optional[int], int, int]
+
+
+@dataclass
+class CaptureSummary:
+    """Decode statistics for one capture of a batch.
+
+    Attributes:
+        capture: Path of the capture file.
+        listings: Listings decoded from the capture.
+        unique: Distinct ``(item, price, quantity)`` keys within the capture.
+        new: Keys not already contributed by an earlier capture of the batch.
+        decoders: Decoders that produced listings (``"v1"``/``"v2"``).
+        seconds: Wall time the worker spent on the capture.
+        error: Failure message when the capture could not be decoded.
+    """
+
+    capture: Path
+    listings: int = 0
+    unique: int = 0
+    new: int = 0
+    decoders: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        payload = {
+            "capture": str(self.capture),
+            "listings": self.listings,
+            "unique": self.unique,
+            "new": self.new,
+            "decoders": self.decoders,
+            "seconds": round(self.seconds, 3),
+        }
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+@dataclass
+class _CaptureResult:
+    summary: CaptureSummary
+    listings: List[Listing]
+    learned_typedef: Optional[dict] = None
+    # Output dicts rendered by the worker, aligned with listings
+    payloads: Optional[List[dict]] = None
+
+
+# Shared catalogs this worker process has attached to, by segment name
+_ATTACHED_CATALOGS: Dict[str, CompiledItemCatalog] = {}
+
+
+def _close_attached_catalogs() -> None:
+    while _ATTACHED_CATALOGS:
+        _ATTACHED_CATALOGS.popitem()[1].close()
+
+
+def _worker_catalog(catalog: Union[str, Mapping[int, ItemRecord], None]) -> Optional[Mapping[int, ItemRecord]]:
+    if not isinstance(catalog, str):
+        return catalog
+    if catalog not in _ATTACHED_CATALOGS:
+        if not _ATTACHED_CATALOGS:
+            # Spawned workers otherwise tear down the segment while views still point into it
+            atexit.register(_close_attached_catalogs)
+        _ATTACHED_CATALOGS[catalog] = CompiledItemCatalog.attach_shared(catalog)
+    return _ATTACHED_CATALOGS[catalog]
+
+
+def _decode_capture(
+    path: Path,
+    decoder_version: str,
+    typedef: Optional[dict],
+    include_raw: bool,
+    catalog: Union[str, Mapping[int, ItemRecord], None] = None,
+    item_filter: Optional[FrozenSet[int]] = None,
+) -> _CaptureResult:
+    """Worker entry point: decode *path* and keep its first listing per key.
+
+    *catalog* is a mapping, or the name of a :class:`SharedItemCatalog`
+    to attach to. When given, surviving listings are also rendered to named
+    output dicts here rather than in the parent. *item_filter* is passed
+    to the decoders, so other items are never built or rendered.
+    """
+
+    started = time.perf_counter()
+    summary = CaptureSummary(capture=path)
+    cache = ListingTypedefCache()
+    cache.typedef = typedef
+    unique: Dict[ListingKey, Listing] = {}
+    try:
+        data = path.read_bytes()
+        if decoder_version == "v2":
+            from bpsr_labs.packet_decoder.decoder.trading_center_decode_v2 import TradingDecoderV2
+
+            listings = TradingDecoderV2().iter_hybrid_listings(iter_frames(data), cache, item_filter)
+        else:
+            listings = iter_listing_blocks(iter_frames(data), cache, item_filter)
+        sources = set()
+        for listing in listings:
+            summary.listings += 1
+            sources.add(listing.source)
+            unique.setdefault((listing.item_config_id, listing.price_luno, listing.quantity), listing)
+    except Exception as exc:
+        summary.error = str(exc)
+        unique = {}
+    else:
+        summary.decoders = sorted((source for source in sources if source), reverse=True)
+
+    kept = list(unique.values())
+    mapping = _worker_catalog(catalog) if kept else None
+    payloads = None
+    if mapping is not None:
+        payloads = [listing.to_dict(resolver=mapping.get, include_raw=include_raw) for listing in kept]
+    for listing in kept:
+        # Raw loaders close over protobuf messages; render before pickling
+        if include_raw and payloads is None:
+            listing.load_raw_entry()
+        listing.raw_loader = None
+    summary.unique = len(kept)
+    summary.seconds = time.perf_counter() - started
+    learned = cache.typedef if cache.typedef != typedef else None
+    return _CaptureResult(summary, kept, learned, payloads)
+
+
+@dataclass
+class BatchResult:
+    """Results of :func:`decode_captures`, in input order.
+
+    Attributes:
+        summaries: One summary per capture.
+        listings: Per capture, the listings no earlier capture contained.
+        payloads: Per capture, the same listings already rendered by the
+            workers, or ``None`` where no item mapping was given.
+    """
+
+    summaries: List[CaptureSummary]
+    listings: List[List[Listing]]
+    payloads: List[Optional[List[dict]]] = field(default_factory=list)
+
+    def merged(
+        self,
+        resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None,
+        include_raw: bool = True,
+    ) -> Iterator[dict]:
+        """Yield the merged listings as ``trade-decode`` dicts.
+
+        ``metadata.capture`` names the first capture that contained each
+        listing. Listings the workers already rendered are yielded as they
+        are; *resolver* and *include_raw* apply to the rest.
+        """
+
+        payloads = self.payloads or [None] * len(self.listings)
+        for summary, listings, rendered in zip(self.summaries, self.listings, payloads):
+            capture = summary.capture.name
+            dicts: Iterable[dict]
+            if rendered is None:
+                dicts = (listing.to_dict(resolver=resolver, include_raw=include_raw) for listing in listings)
+            else:
+                dicts = rendered
+            for payload in dicts:
+                payload["metadata"]["capture"] = capture
+                yield payload
+
+
+def decode_captures(
+    paths: Sequence[Path],
+    decoder_version: str = "v2",
+    typedef_cache: Optional[ListingTypedefCache] = None,
+    include_raw: bool = True,
+    max_workers: Optional[int] = None,
+    item_mapping: Optional[Mapping[int, ItemRecord]] = None,
+    item_filter: Optional[Iterable[int]] = None,
+) -> BatchResult:
+    """Decode *paths* in a process pool and collect the per-capture results.
+
+    Args:
+        paths: Capture files to decode.
+        decoder_version: ``"v2"`` (hybrid, per-segment V1 fallback) or ``"v1"``.
+        typedef_cache: V1 typedef cache seeded into every worker; a typedef
+            learned by a worker is stored back into it and saved.
+        include_raw: Render ``raw_entry`` in the workers for surviving
+            listings. Disable when the output omits it.
+        max_workers: Pool size (default: CPU count). ``1`` decodes in this
+            process without starting a pool. Without a cached typedef the
+            first capture is decoded in this process to learn it before the
+            rest are handed to the pool.
+        item_mapping: Resolve item names in the workers. A pool receives it
+            once through shared memory instead of a copy per worker.
+        item_filter: Only decode listings for these item ids, e.g. from
+            :func:`~bpsr_labs.packet_decoder.decoder.item_catalog.select_items`.
+
+    Returns:
+        BatchResult: Summaries and unique listings, in the order of *paths*.
+    """
+
+    cache = typedef_cache if typedef_cache is not None else ListingTypedefCache()
+    typedef = cache.typedef
+    pending = [Path(path) for path in paths]
+    wanted = frozenset(item_filter) if item_filter is not None else None
+    results: List[_CaptureResult] = []
+
+    def run_inline(path: Path) -> None:
+        nonlocal typedef
+        result = _decode_capture(path, decoder_version, typedef, include_raw, item_mapping, wanted)
+        typedef = result.learned_typedef or typedef
+        results.append(result)
+
+    if typedef is None and pending:
+        # Learn the V1 typedef once here rather than once in every worker
+        run_inline(pending.pop(0))
+    if max_workers == 1 or len(pending) <= 1:
+        for path in pending:
+            run_inline(path)
+    else:
+        shared = SharedItemCatalog(item_mapping) if item_mapping else None
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results.extend(
+                    pool.map(
+                        _decode_capture,
+                        pending,
+                        [decoder_version] * len(pending),
+                        [typedef] * len(pending),
+                        [include_raw] * len(pending),
+                        [shared.name if shared else None] * len(pending),
+                        [wanted] * len(pending),
+                    )
+                )
+        finally:
+            if shared is not None:
+                shared.close()
+
+    seen: set[ListingKey] = set()
+    for result in results:
+        fresh = []
+        for index, listing in enumerate(result.listings):
+            key = (listing.item_config_id, listing.price_luno, listing.quantity)
+            if key not in seen:
+                seen.add(key)
+                fresh.append(index)
+        if result.payloads is not None:
+            result.payloads = [result.payloads[index] for index in fresh]
+        result.listings = [result.listings[index] for index in fresh]
+        result.summary.new = len(fresh)
+        if result.learned_typedef is not None:
+            cache.learn(result.learned_typedef)
+    cache.save()
+    return BatchResult(
+        summaries=[result.summary for result in results],
+        listings=[result.listings for result in results],
+        payloads=[result.payloads for result in results],
+    )
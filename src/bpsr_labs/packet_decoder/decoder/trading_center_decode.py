@@ -4,40 +4,71 @@ from __future__ import annotations
 
 import io
 import json
+import logging
 import struct
-from collections import OrderedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Iterable, Iterator, List, Optional
+from typing import BinaryIO, Callable, Container, Iterable, Iterator, List, Optional
 
 import zstandard
 from blackboxprotobuf import decode_message  # provided via the bbpb package
 
 from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord, load_item_mapping
 
+LOGGER = logging.getLogger(__name__)
+
+_DEFAULT_TYPEDEF_CACHE = (
+    Path(__file__).resolve().parents[4] / "data" / "schemas" / ".trading_listing_typedef.json"
+)
+
 
 @dataclass
 class Listing:
+    """A single trading-center listing.
+
+    ``raw_entry`` may be left as ``None`` and supplied lazily through
+    ``raw_loader``; the loader runs at most once, the first time
+    :meth:`load_raw_entry` is called, so listings dropped by
+    :func:`consolidate` never pay for rendering it. ``source`` names the
+    decoder that produced the listing (``"v1"`` or ``"v2"``) and is reported
+    as ``metadata.decoder``.
+    """
+
     frame_offset: int
     server_sequence: int
     price_luno: int
     quantity: int
     item_config_id: Optional[int]
-    raw_entry: dict
+    raw_entry: Optional[dict] = None
+    raw_loader: Optional[Callable[[], dict]] = field(default=None, repr=False, compare=False)
+    source: Optional[str] = None
+
+    def load_raw_entry(self) -> Optional[dict]:
+        """Return :attr:`raw_entry`, rendering it from :attr:`raw_loader` if needed."""
+
+        if self.raw_entry is None and self.raw_loader is not None:
+            self.raw_entry = self.raw_loader()
+            self.raw_loader = None
+        return self.raw_entry
 
     def to_dict(
-        self, resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None
+        self,
+        resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None,
+        include_raw: bool = True,
     ) -> dict:
-        payload = {
+        payload: dict[str, object] = {
             "price_luno": self.price_luno,
             "quantity": self.quantity,
             "item_id": self.item_config_id,
         }
-        metadata = {
+        metadata: dict[str, object] = {
             "frame_offset": self.frame_offset,
             "server_sequence": self.server_sequence,
-            "raw_entry": self.raw_entry,
         }
+        if self.source is not None:
+            metadata["decoder"] = self.source
+        if include_raw:
+            metadata["raw_entry"] = self.load_raw_entry()
         if resolver is not None and self.item_config_id is not None:
             resolved = resolver(self.item_config_id)
             if resolved is not None:
@@ -49,9 +80,15 @@ class Listing:
 
 
 _ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Larger declared lengths are treated as garbage by the streaming reader instead
+# of buffering up to that many bytes while waiting for the fragment to complete.
+_MAX_STREAM_FRAME = 16 * 1024 * 1024
 
+# (offset, length, pkt_type, is_zstd, body) as yielded by the frame iterators
+Frame = tuple[int, int, int, bool, bytes]
 
-def read_varint(data: bytes, start: int) -> tuple[int, int]:
+
+def read_varint(data: bytes | memoryview, start: int) -> tuple[int, int]:
     """Decode a protobuf-style varint from *data* starting at *start*."""
 
     shift = 0
@@ -67,6 +104,184 @@ def read_varint(data: bytes, start: int) -> tuple[int, int]:
     raise ValueError("Unexpected end of buffer while decoding varint")
 
 
+class TypedefMismatch(ValueError):
+    """Raised when a buffer does not match a learned blackboxprotobuf typedef."""
+
+
+class TypedefDrift(TypedefMismatch):
+    """Raised when a listing entry carries a field the learned typedef lacks.
+
+    Protobuf schemas evolve by adding fields, so this signals that the cached
+    typedef is stale rather than that the buffer is not a listing block.
+    """
+
+
+_VARINT_TYPES = frozenset({"int", "uint", "sint"})
+_FIXED32_TYPES = {"fixed32": "<I", "sfixed32": "<i", "float": "<f"}
+_FIXED64_TYPES = {"fixed64": "<Q", "sfixed64": "<q", "double": "<d"}
+_LENGTH_TYPES = frozenset({"message", "bytes", "string"})
+# Wrapper messages around the listing entries carry unrelated fields in
+# non-listing segments; only the entries themselves must match exactly.
+_STRICT_DEPTH = 2
+
+
+def _skip_field(data: bytes | memoryview, pos: int, wire_type: int) -> int:
+    if wire_type == 0:
+        return read_varint(data, pos)[1]
+    if wire_type == 1:
+        pos += 8
+    elif wire_type == 2:
+        length, pos = read_varint(data, pos)
+        pos += length
+    elif wire_type == 5:
+        pos += 4
+    else:
+        raise TypedefMismatch(f"Unsupported wire type {wire_type}")
+    if pos > len(data):
+        raise TypedefMismatch("Field extends past end of buffer")
+    return pos
+
+
+def decode_with_typedef(data: bytes | memoryview, typedef: dict, depth: int = 0) -> dict:
+    """Decode *data* following a typedef previously returned by ``decode_message``.
+
+    Unlike ``blackboxprotobuf.decode_message(data, typedef)`` this never guesses:
+    fields missing from the typedef are skipped in the outer wrapper messages
+    and rejected inside listing entries, so the output matches what the
+    guessing decoder produces for buffers that fit the learned schema.
+
+    Raises:
+        TypedefDrift: If a listing entry has a field missing from the typedef.
+        TypedefMismatch: If the buffer's wire layout disagrees with the typedef.
+        ValueError: If the buffer is truncated.
+    """
+
+    fields: dict[str, list] = {}
+    strict = depth >= _STRICT_DEPTH
+    pos = 0
+    end = len(data)
+    while pos < end:
+        key, pos = read_varint(data, pos)
+        number = str(key >> 3)
+        wire_type = key & 0x07
+        field = typedef.get(number)
+        if field is None:
+            if strict:
+                raise TypedefDrift(f"Field {number} is not in the learned typedef")
+            pos = _skip_field(data, pos, wire_type)
+            continue
+
+        field_type = field.get("type")
+        value: object
+        if wire_type == 0 and field_type in _VARINT_TYPES:
+            varint, pos = read_varint(data, pos)
+            if field_type == "int" and varint >= 1 << 63:
+                varint -= 1 << 64
+            elif field_type == "sint":
+                varint = (varint >> 1) ^ -(varint & 1)
+            value = varint
+        elif wire_type == 5 and field_type in _FIXED32_TYPES:
+            if pos + 4 > end:
+                raise TypedefMismatch("Fixed32 field extends past end of buffer")
+            value = struct.unpack_from(_FIXED32_TYPES[field_type], data, pos)[0]
+            pos += 4
+        elif wire_type == 1 and field_type in _FIXED64_TYPES:
+            if pos + 8 > end:
+                raise TypedefMismatch("Fixed64 field extends past end of buffer")
+            value = struct.unpack_from(_FIXED64_TYPES[field_type], data, pos)[0]
+            pos += 8
+        elif wire_type == 2 and field_type in _LENGTH_TYPES:
+            length, pos = read_varint(data, pos)
+            stop = pos + length
+            if stop > end:
+                raise TypedefMismatch("Length-delimited field extends past end of buffer")
+            chunk = data[pos:stop]
+            pos = stop
+            if field_type == "message":
+                value = decode_with_typedef(chunk, field.get("message_typedef", {}), depth + 1)
+            elif field_type == "string":
+                try:
+                    value = bytes(chunk).decode("utf-8")
+                except UnicodeDecodeError:
+                    raise TypedefMismatch(f"Field {number} is not valid UTF-8") from None
+            else:
+                value = bytes(chunk)
+        else:
+            raise TypedefMismatch(
+                f"Field {number} has wire type {wire_type}, typedef expects {field_type!r}"
+            )
+        fields.setdefault(number, []).append(value)
+
+    return {
+        number: values
+        if len(values) > 1 or typedef[number].get("seen_repeated")
+        else values[0]
+        for number, values in fields.items()
+    }
+
+
+class ListingTypedefCache:
+    """Typedef learned from the first listing block that decoded successfully.
+
+    ``blackboxprotobuf`` re-guesses the schema of every buffer it is given,
+    which dominates V1 decoding time. Once one listing block has been decoded
+    the learned typedef is reused for every later segment, and persisted to
+    *path* so subsequent runs never need to guess.
+
+    Args:
+        path: Optional JSON file the typedef is loaded from and saved to.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.typedef: Optional[dict] = None
+        self._dirty = False
+        if self.path is not None:
+            self.load()
+
+    def load(self) -> None:
+        """Load a previously saved typedef, ignoring unreadable files."""
+
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            LOGGER.warning("Ignoring unreadable typedef cache %s: %s", self.path, exc)
+            return
+        if payload.get("version") == self.VERSION and isinstance(payload.get("typedef"), dict):
+            self.typedef = payload["typedef"]
+
+    def learn(self, typedef: dict) -> None:
+        """Replace the cached typedef with one from a freshly guessed listing block."""
+
+        if typedef != self.typedef:
+            self.typedef = typedef
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the typedef to :attr:`path` if it changed since loading."""
+
+        if self.path is None or not self._dirty or self.typedef is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": self.VERSION, "typedef": self.typedef}
+        self.path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        self._dirty = False
+
+
+def _listing_entries(decoded: dict) -> Optional[list]:
+    inner = decoded.get("1")
+    if not isinstance(inner, dict):
+        return None
+    entries = inner.get("2")
+    if not isinstance(entries, list) or not entries:
+        return None
+    return entries
+
+
 def maybe_decompress(data: bytes, is_zstd: bool) -> bytes:
     if not is_zstd or not data:
         return data
@@ -80,7 +295,51 @@ def maybe_decompress(data: bytes, is_zstd: bool) -> bytes:
             return reader.read()
 
 
-def iter_frames(data: bytes) -> Iterator[tuple[int, int, int, bool, bytes]]:
+def iter_length_delimited(
+    data: bytes, tag: int = 0x0A
+) -> Iterator[tuple[int, int, memoryview]]:
+    """Yield candidate length-delimited fields with key byte *tag* in *data*.
+
+    Candidates are found with ``bytes.find`` rather than a per-byte loop. The
+    length varint (at most five bytes, as protobuf lengths are 32-bit) is
+    validated against the remaining buffer before anything is sliced, and a
+    candidate that does not fit is skipped rather than ending the scan. After
+    a field is accepted the scan resumes at its end, so fields never overlap.
+
+    Yields:
+        ``(tag_offset, payload_offset, payload)`` tuples, where *payload* is a
+        zero-copy ``memoryview`` into *data*. The whole field, key byte
+        included, spans ``data[tag_offset:payload_offset + len(payload)]``.
+    """
+
+    view = memoryview(data)
+    size = len(data)
+    find = data.find
+    idx = find(tag)
+    while idx != -1:
+        pos = idx + 1
+        length = 0
+        shift = 0
+        while pos < size and shift < 35:
+            byte = data[pos]
+            pos += 1
+            length |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        else:
+            # Truncated or over-long varint
+            idx = find(tag, idx + 1)
+            continue
+        end = pos + length
+        if end > size:
+            idx = find(tag, idx + 1)
+            continue
+        yield idx, pos, view[pos:end]
+        idx = find(tag, end)
+
+
+def iter_frames(data: bytes) -> Iterator[Frame]:
     """Yield (offset, length, pkt_type, is_zstd, body) tuples for each fragment."""
 
     offset = 0
@@ -97,94 +356,242 @@ def iter_frames(data: bytes) -> Iterator[tuple[int, int, int, bool, bytes]]:
         offset += length
 
 
-def extract_listing_blocks(data: bytes) -> List[Listing]:
-    listings: list[Listing] = []
-    for frame_offset, length, fragment_type, is_zstd, body in iter_frames(data):
+def iter_frames_from_stream(
+    stream: BinaryIO,
+    chunk_size: int = 1 << 16,
+    max_frame_size: int = _MAX_STREAM_FRAME,
+) -> Iterator[Frame]:
+    """Yield the same tuples as :func:`iter_frames`, reading *stream* incrementally.
+
+    Only the bytes of the fragment currently being assembled are buffered, so
+    arbitrarily long captures (or a live pipe) can be processed in constant
+    memory. Offsets are absolute positions in the stream. Declared lengths
+    above *max_frame_size* are treated as garbage and skipped, like lengths
+    running past the end of the capture.
+    """
+
+    read = getattr(stream, "read1", stream.read)
+    buffer = bytearray()
+    base = 0  # stream offset of buffer[0]
+    pos = 0
+    eof = False
+    while True:
+        while pos + 6 <= len(buffer):
+            length = int.from_bytes(buffer[pos : pos + 4], "big")
+            if length == 0 or length > max_frame_size:
+                pos += 1
+                continue
+            if pos + length > len(buffer):
+                if not eof:
+                    break  # wait for the rest of the fragment
+                pos += 1
+                continue
+            pkt_type = int.from_bytes(buffer[pos + 4 : pos + 6], "big")
+            body = bytes(buffer[pos + 6 : pos + length])
+            yield base + pos, length, pkt_type & 0x7FFF, bool(pkt_type & 0x8000), body
+            pos += length
+        if eof:
+            return
+        chunk = read(chunk_size)
+        if not chunk:
+            eof = True
+            continue
+        del buffer[:pos]
+        base += pos
+        pos = 0
+        buffer += chunk
+
+
+def iter_framedown_bodies(frames: Iterable[Frame]) -> Iterator[tuple[int, int, bool, int, bytes]]:
+    """Yield ``(offset, length, is_zstd, server_sequence, nested)`` per FrameDown.
+
+    *nested* is the inflated body following the 4-byte server sequence;
+    fragments with an empty body are skipped.
+
+    Args:
+        frames: Fragments from :func:`iter_frames` or
+            :func:`iter_frames_from_stream`.
+    """
+
+    for frame_offset, length, fragment_type, is_zstd, body in frames:
         if fragment_type != 0x0006:  # FrameDown
             continue
         if len(body) <= 4:
             continue
         server_seq = struct.unpack_from(">I", body, 0)[0]
         nested = maybe_decompress(body[4:], is_zstd)
-        if not nested:
+        if nested:
+            yield frame_offset, length, is_zstd, server_seq, nested
+
+
+def decode_listing_segment(
+    segment: bytes | memoryview,
+    frame_offset: int,
+    server_seq: int,
+    cache: ListingTypedefCache,
+    item_filter: Optional[Container[int]] = None,
+) -> List[Listing]:
+    """Heuristically decode one length-delimited field no.1 as a listing block.
+
+    Args:
+        segment: The whole field, key byte and length included.
+        frame_offset: Capture offset of the enclosing fragment.
+        server_seq: Server sequence of the enclosing FrameDown.
+        cache: Learned-typedef cache to reuse and update.
+        item_filter: Item ids to keep, e.g. from
+            :func:`~bpsr_labs.packet_decoder.decoder.item_catalog.select_items`.
+            Entries for other items are skipped before a :class:`Listing` is
+            built; the block still counts as detected.
+
+    Returns:
+        List[Listing]: The block's (kept) listings, or an empty list if the
+        segment is not a listing block.
+    """
+
+    entries = None
+    typedef = None
+    if cache.typedef is not None:
+        try:
+            entries = _listing_entries(decode_with_typedef(segment, cache.typedef))
+        except ValueError:
+            # TypedefDrift or TypedefMismatch: the block may still be a listing
+            # block with a changed layout, so guess and re-learn below
+            entries = None
+        else:
+            if entries is None:
+                return []  # fits the learned schema but carries no listings
+    if entries is None:
+        try:
+            decoded, typedef = decode_message(bytes(segment))
+        except Exception:
+            return []
+        entries = _listing_entries(decoded)
+        if entries is None:
+            return []
+
+    listings: list[Listing] = []
+    found = 0
+    for entry in entries:
+        if not isinstance(entry, dict):
             continue
+        price = entry.get("1")
+        quantity = entry.get("2")
+        details = entry.get("3") if isinstance(entry.get("3"), dict) else None
+        if (
+            not isinstance(price, int)
+            or not isinstance(quantity, int)
+            or not isinstance(details, dict)
+            or "2" not in details
+        ):
+            continue
+        item_id = details.get("2")
+        found += 1
+        if item_filter is not None and item_id not in item_filter:
+            continue
+        listings.append(
+            Listing(
+                frame_offset=frame_offset,
+                server_sequence=server_seq,
+                price_luno=price,
+                quantity=quantity,
+                item_config_id=item_id if isinstance(item_id, int) else None,
+                raw_entry=entry,
+                source="v1",
+            )
+        )
 
-        idx = 0
-        while idx < len(nested):
-            try:
-                field = nested[idx]
-            except IndexError:
-                break
-            if field != 0x0A:  # length-delimited field no.1
-                idx += 1
-                continue
-            try:
-                msg_len, next_idx = read_varint(nested, idx + 1)
-            except ValueError:
-                idx += 1
-                continue
-            end = next_idx + msg_len
-            if end > len(nested):
-                break
-            segment = nested[idx:end]
-            idx = end
+    if found:
+        if typedef is not None:
+            cache.learn(typedef)
+        kept = f", kept={len(listings)}" if item_filter is not None else ""
+        LOGGER.info(
+            "Detected trade listing block in FrameDown @0x%06x (server_seq=%d, entries=%d%s)",
+            frame_offset,
+            server_seq,
+            found,
+            kept,
+        )
+    return listings
 
-            try:
-                decoded, typedef = decode_message(segment)
-            except Exception:
-                continue
 
-            inner = decoded.get("1")
-            if not isinstance(inner, dict):
-                continue
-            entries = inner.get("2")
-            if not isinstance(entries, list) or not entries:
-                continue
+def iter_listing_blocks(
+    frames: Iterable[Frame],
+    typedef_cache: Optional[ListingTypedefCache] = None,
+    item_filter: Optional[Container[int]] = None,
+) -> Iterator[Listing]:
+    """Heuristically decode listings from *frames*, yielding them as found.
+
+    The typedef cache is saved once the frames are exhausted.
+
+    Args:
+        frames: Fragments from :func:`iter_frames` or
+            :func:`iter_frames_from_stream`.
+        typedef_cache: Learned-typedef cache to reuse and update. When omitted
+            an in-memory cache is used.
+        item_filter: Item ids to keep; see :func:`decode_listing_segment`.
+    """
+
+    cache = typedef_cache if typedef_cache is not None else ListingTypedefCache()
+    for frame_offset, _, _, server_seq, nested in iter_framedown_bodies(frames):
+        view = memoryview(nested)
+        # Length-delimited field no.1 wrapping the listing block
+        for start, payload_start, payload in iter_length_delimited(nested):
+            segment = view[start : payload_start + len(payload)]
+            yield from decode_listing_segment(segment, frame_offset, server_seq, cache, item_filter)
+    cache.save()
+
+
+def extract_listing_blocks(
+    data: bytes,
+    typedef_cache: Optional[ListingTypedefCache] = None,
+    item_filter: Optional[Container[int]] = None,
+) -> List[Listing]:
+    """Extract trade listings from every FrameDown fragment in *data*.
+
+    Args:
+        data: Raw capture bytes.
+        typedef_cache: Learned-typedef cache to reuse and update. When omitted
+            an in-memory cache is used, so only the first listing block of
+            this call pays for schema guessing.
+        item_filter: Item ids to keep; see :func:`decode_listing_segment`.
+    """
+
+    return list(iter_listing_blocks(iter_frames(data), typedef_cache, item_filter))
+
+
+def iter_consolidated(
+    listings: Iterable[Listing],
+    resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None,
+    include_raw: bool = True,
+) -> Iterator[dict]:
+    """Yield each listing rendered as a dict the first time its key is seen.
 
-            added = 0
-            for entry in entries:
-                if not isinstance(entry, dict):
-                    continue
-                price = entry.get("1")
-                quantity = entry.get("2")
-                details = entry.get("3") if isinstance(entry.get("3"), dict) else None
-                if (
-                    not isinstance(price, int)
-                    or not isinstance(quantity, int)
-                    or not isinstance(details, dict)
-                    or "2" not in details
-                ):
-                    continue
-                item_id = details.get("2")
-                listings.append(
-                    Listing(
-                        frame_offset=frame_offset,
-                        server_sequence=server_seq,
-                        price_luno=price,
-                        quantity=quantity,
-                        item_config_id=item_id if isinstance(item_id, int) else None,
-                        raw_entry=entry,
-                    )
-                )
-                added += 1
-
-            if added:
-                print(
-                    f"Detected trade listing block in FrameDown @0x{frame_offset:06x} "
-                    f"(server_seq={server_seq}, entries={added})"
-                )
-    return listings
+    Listings are deduplicated by ``(item, price, quantity)``. Only those key
+    tuples are retained, so memory grows with the number of unique listings
+    rather than with the capture, and output can be written while decoding.
+    """
+
+    seen: set[tuple[Optional[int], int, int]] = set()
+    for entry in listings:
+        key = (entry.item_config_id, entry.price_luno, entry.quantity)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield entry.to_dict(resolver=resolver, include_raw=include_raw)
 
 
 def consolidate(
     listings: Iterable[Listing],
     resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None,
+    include_raw: bool = True,
 ) -> list[dict]:
-    dedup: "OrderedDict[tuple[int, int, Optional[int]], Listing]" = OrderedDict()
-    for entry in listings:
-        key = (entry.item_config_id, entry.price_luno, entry.quantity)
-        dedup.setdefault(key, entry)
-    return [entry.to_dict(resolver=resolver) for entry in dedup.values()]
+    """Deduplicate listings by (item, price, quantity) and render them as dicts.
+
+    Raw entries are only rendered for the listings that survive
+    deduplication, and not at all when *include_raw* is ``False``.
+    """
+
+    return list(iter_consolidated(listings, resolver=resolver, include_raw=include_raw))
 
 
 def main() -> None:
@@ -2,145 +2,223 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterator, List, Optional
+from functools import partial
+from typing import Container, Iterable, Iterator, List, Optional, cast
 
 from google.protobuf import json_format
-from google.protobuf.message import DecodeError
+from google.protobuf.message import DecodeError, Message
 
+from .generated_registry import GeneratedModuleRegistry, get_generated_registry
 from .trading_center_decode import (
+    Frame,
     Listing,
+    ListingTypedefCache,
+    decode_listing_segment,
+    iter_framedown_bodies,
     iter_frames,
-    maybe_decompress,
-    read_varint,
+    iter_length_delimited,
 )
 
-from importlib import import_module
-
-try:
-    import bpsr_labs.packet_decoder.generated  # noqa: F401  - ensures sys.path bootstrap
-except ModuleNotFoundError as exc:  # pragma: no cover - guard for missing package during dev
-    _PROTO_IMPORT_ERROR: Optional[Exception] = exc
-    _ExchangeRet = None
-    _ExchangeReply = None
-else:
-    try:
-        _serv_world = import_module("serv_world_pb2")
-        _exchange_reply = import_module("stru_exchange_notice_detail_reply_pb2")
-    except ModuleNotFoundError as exc:  # pragma: no cover - resolved by generating modules
-        _PROTO_IMPORT_ERROR = exc
-        _ExchangeRet = None
-        _ExchangeReply = None
-    except Exception as exc:  # pragma: no cover - unexpected import failure
-        _PROTO_IMPORT_ERROR = exc
-        _ExchangeRet = None
-        _ExchangeReply = None
-    else:
-        _PROTO_IMPORT_ERROR = None
-        _ExchangeRet = _serv_world.World.ExchangeNoticeDetail_Ret
-        _ExchangeReply = _exchange_reply.ExchangeNoticeDetailReply
+_EXCHANGE_RET = ("serv_world_pb2", "World.ExchangeNoticeDetail_Ret")
+_EXCHANGE_REPLY = ("stru_exchange_notice_detail_reply_pb2", "ExchangeNoticeDetailReply")
+
+
+def _entry_to_dict(entry: Message) -> dict:
+    return cast(
+        dict,
+        json_format.MessageToDict(
+            entry,
+            preserving_proto_field_name=True,
+            use_integers_for_enums=True,
+        ),
+    )
 
 
 @dataclass
 class TradeFrame:
+    """Candidate ``ExchangeNoticeDetail_Ret`` payload inside a FrameDown.
+
+    ``payload`` is the field body; ``segment`` is the whole field including
+    its key and length, as expected by the heuristic V1 decoder.
+    """
+
     offset: int
     length: int
     packet_type: int
     is_zstd: bool
-    payload: bytes
+    payload: bytes | memoryview
     server_sequence: int
+    segment: Optional[bytes | memoryview] = None
 
 
 class TradingDecoderV2:
-    """Decode trading listings using protobuf schemas."""
-
-    def __init__(self) -> None:
-        self._ret_cls = _ExchangeRet
-        self._reply_cls = _ExchangeReply
-        self._import_error = _PROTO_IMPORT_ERROR
+    """Decode trading listings using protobuf schemas.
+
+    The generated modules are imported on first use of :attr:`available` (or
+    any decode call), not when this module or the decoder is created.
+    """
+
+    def __init__(self, registry: Optional[GeneratedModuleRegistry] = None) -> None:
+        self._registry = registry or get_generated_registry()
+        self._loaded = False
+        self._ret_cls: Optional[type[Message]] = None
+        self._reply_cls: Optional[type[Message]] = None
+        self._import_error: Optional[Exception] = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            self._ret_cls = self._registry.resolve_attr(*_EXCHANGE_RET)
+            self._reply_cls = self._registry.resolve_attr(*_EXCHANGE_REPLY)
+        except Exception as exc:  # missing or broken generated modules
+            self._ret_cls = self._reply_cls = None
+            self._import_error = exc
 
     @property
     def available(self) -> bool:
         """Return True when generated protobuf modules are importable."""
 
+        self._ensure_loaded()
         return self._ret_cls is not None and self._reply_cls is not None
 
     @property
     def import_error(self) -> Optional[Exception]:
         """Expose the underlying import error for diagnostics."""
 
+        self._ensure_loaded()
         return self._import_error
 
     def iter_exchange_replies(self, data: bytes) -> Iterator[TradeFrame]:
-        for offset, length, fragment_type, is_zstd, body in iter_frames(data):
-            if fragment_type != 0x0006:  # FrameDown
-                continue
-            if len(body) <= 4:
-                continue
-            server_seq = int.from_bytes(body[:4], byteorder="big")
-            nested = maybe_decompress(body[4:], is_zstd)
-            if not nested:
-                continue
+        return self._iter_replies(iter_frames(data))
 
-            idx = 0
-            end = len(nested)
-            while idx < end:
-                key = nested[idx]
-                if key != 0x0A:
-                    idx += 1
-                    continue
-                try:
-                    msg_len, next_idx = read_varint(nested, idx + 1)
-                except ValueError:
-                    idx += 1
-                    continue
-                payload_start = next_idx
-                payload_end = payload_start + msg_len
-                if payload_end > end:
-                    break
-                payload = nested[payload_start:payload_end]
-                idx = payload_end
+    def _iter_replies(self, frames: Iterable[Frame]) -> Iterator[TradeFrame]:
+        for offset, length, is_zstd, server_seq, nested in iter_framedown_bodies(frames):
+            view = memoryview(nested)
+            for start, payload_start, payload in iter_length_delimited(nested):
                 yield TradeFrame(
                     offset=offset,
                     length=length,
-                    packet_type=fragment_type,
+                    packet_type=0x0006,
                     is_zstd=is_zstd,
                     payload=payload,
                     server_sequence=server_seq,
+                    segment=view[start : payload_start + len(payload)],
+                )
+
+    def _decode_frame(
+        self, frame: TradeFrame, item_filter: Optional[Container[int]] = None
+    ) -> Optional[List[Listing]]:
+        """Decode one reply, or return ``None`` if it holds no listings.
+
+        An empty list means the reply did hold listings but *item_filter*
+        dropped all of them.
+        """
+
+        self._ensure_loaded()
+        if self._ret_cls is None:
+            return None
+        ret_msg = self._ret_cls()
+        try:
+            ret_msg.ParseFromString(frame.payload)
+        except DecodeError:
+            return None
+        if not ret_msg.HasField("ret") or not ret_msg.ret.items:
+            return None
+        listings: list[Listing] = []
+        for entry in ret_msg.ret.items:
+            item = entry.item_info
+            config_id = item.config_id if item.HasField("config_id") else None
+            if item_filter is not None and config_id not in item_filter:
+                continue
+            listings.append(
+                Listing(
+                    frame_offset=frame.offset,
+                    server_sequence=frame.server_sequence,
+                    price_luno=entry.price,
+                    quantity=entry.num,
+                    item_config_id=config_id,
+                    raw_loader=partial(_entry_to_dict, entry),
+                    source="v2",
                 )
+            )
+        return listings
+
+    def decode_listings(
+        self, data: bytes, item_filter: Optional[Container[int]] = None
+    ) -> List[Listing]:
+        """Decode every listing in *data*.
+
+        ``raw_entry`` is not rendered here; each listing keeps a reference to
+        its parsed entry and converts it on :meth:`Listing.load_raw_entry`.
+        With *item_filter*, entries for other item ids are skipped before a
+        :class:`Listing` is built for them.
+        """
 
-    def decode_listings(self, data: bytes) -> List[Listing]:
         if not self.available:
             return []
 
         listings: list[Listing] = []
         for frame in self.iter_exchange_replies(data):
-            ret_msg = self._ret_cls()
-            try:
-                ret_msg.ParseFromString(frame.payload)
-            except DecodeError:
-                continue
-            if not ret_msg.HasField("ret"):
-                continue
-            reply = ret_msg.ret
-            for entry in reply.items:
-                item = entry.item_info
-                config_id = item.config_id if item.HasField("config_id") else None
-                raw_entry = json_format.MessageToDict(
-                    entry,
-                    preserving_proto_field_name=True,
-                    use_integers_for_enums=True,
-                )
-                listings.append(
-                    Listing(
-                        frame_offset=frame.offset,
-                        server_sequence=frame.server_sequence,
-                        price_luno=entry.price,
-                        quantity=entry.num,
-                        item_config_id=config_id,
-                        raw_entry=raw_entry,
-                    )
-                )
+            listings.extend(self._decode_frame(frame, item_filter) or ())
         return listings
 
+    def iter_hybrid_listings(
+        self,
+        frames: Iterable[Frame],
+        typedef_cache: Optional[ListingTypedefCache] = None,
+        item_filter: Optional[Container[int]] = None,
+    ) -> Iterator[Listing]:
+        """Yield listings from *frames* as they are decoded, preferring the schema.
+
+        Each candidate segment is parsed as ``ExchangeNoticeDetail_Ret`` first;
+        only segments that class rejects (or yields no listings for) go
+        through the heuristic V1 decoder. When the generated modules are
+        unavailable every segment takes the V1 path. ``Listing.source``
+        records which path produced each listing. Nothing is accumulated, so
+        this works on :func:`iter_frames_from_stream` output for live or very
+        large captures.
+
+        Args:
+            frames: Fragments from :func:`iter_frames` or
+                :func:`iter_frames_from_stream`.
+            typedef_cache: Learned-typedef cache for the V1 fallback; an
+                in-memory cache is used when omitted. Saved once *frames* is
+                exhausted.
+            item_filter: Item ids to keep, e.g. from
+                :func:`~bpsr_labs.packet_decoder.decoder.item_catalog.select_items`.
+                Other entries are skipped on either path before a
+                :class:`Listing` is built, so they are never resolved or
+                serialised.
+        """
+
+        cache = typedef_cache if typedef_cache is not None else ListingTypedefCache()
+        use_v2 = self.available
+        for frame in self._iter_replies(frames):
+            decoded = self._decode_frame(frame, item_filter) if use_v2 else None
+            if decoded is None:
+                if frame.segment is None:
+                    continue
+                decoded = decode_listing_segment(
+                    frame.segment, frame.offset, frame.server_sequence, cache, item_filter
+                )
+            yield from decoded
+        cache.save()
+
+    def decode_hybrid(
+        self,
+        data: bytes,
+        typedef_cache: Optional[ListingTypedefCache] = None,
+        item_filter: Optional[Container[int]] = None,
+    ) -> List[Listing]:
+        """Decode *data* in one pass, per segment preferring the generated schema.
+
+        See :meth:`iter_hybrid_listings`; the capture is framed and inflated
+        once regardless of which decoder handles each segment.
+        """
+
+        return list(self.iter_hybrid_listings(iter_frames(data), typedef_cache, item_filter))
+
 
 __all__ = ["TradingDecoderV2", "TradeFrame"]
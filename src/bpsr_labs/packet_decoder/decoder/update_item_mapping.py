@@ -1,18 +1,38 @@
 #!/usr/bin/env python3
-"""Regenerate the item id → name mapping from Star Resonance data dumps."""
+"""Regenerate the item id → name mapping from Star Resonance data dumps.
+
+Rebuilds are incremental. A manifest next to the output
+(``item_name_map.manifest.json``) records each source file's size, mtime,
+SHA-256 and the item records it contributed. On the next run, files whose
+size and mtime are unchanged reuse their recorded items. Files that were
+touched but hash the same reuse them as well. Only changed files are
+parsed again. The per-source records are merged in source order, so later
+sources still win. When nothing changed, the outputs are left untouched.
+
+By default every numeric :data:`ITEM_COLUMNS` entry (rarity, category,
+stack size) is carried over from ``ItemTable.json``; ``--columns`` narrows
+that down. Changing the selection re-parses every source.
+"""
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
+import os
 from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, Sequence
+from typing import Dict, List, Optional, Sequence
 
+from bpsr_labs.packet_decoder.decoder.catalog_format import iter_candidate_files
 from bpsr_labs.packet_decoder.decoder.item_catalog import (
+    COMPILED_SUFFIX,
+    ITEM_COLUMNS,
     ItemRecord,
-    build_mapping_from_sources,
+    load_source_file,
+    write_compiled_catalog,
 )
 
 LOGGER = logging.getLogger(__name__)
@@ -25,34 +45,260 @@ DEFAULT_PATTERNS: tuple[str, ...] = (
 )
 
 
-def _iter_candidate_files(sources: Sequence[Path]) -> Iterable[Path]:
-    for source in sources:
-        if source.is_file():
-            yield source
-            continue
-        if not source.exists():
-            LOGGER.debug("Skipping missing source %s", source)
-            continue
-        if not source.is_dir():
-            LOGGER.debug("Skipping non-file, non-directory source %s", source)
-            continue
-        for pattern in DEFAULT_PATTERNS:
-            for match in sorted(source.rglob(pattern)):
-                if match.is_file():
-                    yield match
-
-
 def _serialize(mapping: dict[int, ItemRecord], indent: int | None) -> str:
-    serializable: OrderedDict[str, dict[str, str]] = OrderedDict()
+    serializable: OrderedDict[str, dict[str, object]] = OrderedDict()
     for item_id in sorted(mapping):
         record = mapping[item_id]
-        entry: dict[str, str] = {"name": record.name}
+        entry: dict[str, object] = {"name": record.name}
         if record.icon:
             entry["icon"] = record.icon
+        entry.update(record.columns())
         serializable[str(item_id)] = entry
     return json.dumps(serializable, ensure_ascii=False, indent=indent) + "\n"
 
 
+MANIFEST_SUFFIX = ".manifest.json"
+_MANIFEST_VERSION = 2
+
+
+@dataclass
+class _SourceEntry:
+    size: int
+    mtime_ns: int
+    sha256: str
+    items: Dict[int, ItemRecord]
+
+    def to_dict(self) -> dict:
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "sha256": self.sha256,
+            "items": {
+                str(item_id): [record.name, record.icon, record.columns()]
+                for item_id, record in self.items.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> "_SourceEntry":
+        items = {
+            int(item_id): ItemRecord(int(item_id), name, icon, **columns)
+            for item_id, (name, icon, columns) in payload["items"].items()
+        }
+        return cls(int(payload["size"]), int(payload["mtime_ns"]), str(payload["sha256"]), items)
+
+
+def _sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class SourceManifest:
+    """Per-source record of what each item source file contributed.
+
+    Args:
+        path: Manifest JSON file; ``None`` keeps the manifest in memory. An
+            unreadable or outdated manifest, or one recorded with other
+            *columns*, is treated as empty.
+        columns: :data:`ITEM_COLUMNS` fields parsed from ``ItemTable.json``.
+    """
+
+    def __init__(self, path: Optional[Path] = None, columns: Sequence[str] = tuple(ITEM_COLUMNS)) -> None:
+        self.path = path
+        self.columns = tuple(columns)
+        self._entries: Dict[str, _SourceEntry] = {}
+        self._order: List[str] = []
+        if path is None or not path.is_file():
+            return
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("version") != _MANIFEST_VERSION or payload.get("columns") != list(self.columns):
+                return
+            entries = {key: _SourceEntry.from_dict(value) for key, value in payload["sources"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            LOGGER.warning("Ignoring unreadable item manifest %s", path)
+            return
+        self._entries = entries
+        self._order = list(entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self, candidates: Sequence[Path]) -> "RefreshResult":
+        """Bring the manifest in line with *candidates* and merge their items.
+
+        Only files whose size or mtime changed are hashed, and only files
+        whose hash changed are parsed. Entries for files no longer among
+        *candidates* are dropped.
+        """
+
+        result = RefreshResult()
+        entries: Dict[str, _SourceEntry] = {}
+        for candidate in candidates:
+            key = str(candidate)
+            if key in entries:
+                continue
+            stat = candidate.stat()
+            entry = self._entries.get(key)
+            if entry is not None and (entry.size, entry.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                result.reused.append(candidate)
+            else:
+                digest = _sha256(candidate)
+                if entry is not None and entry.sha256 == digest:
+                    result.reused.append(candidate)
+                else:
+                    entry = _SourceEntry(0, 0, digest, load_source_file(candidate, self.columns))
+                    result.parsed.append(candidate)
+                entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+            entries[key] = entry
+            # Later sources override earlier ones for the same item ID
+            result.mapping.update(entry.items)
+        result.removed = [key for key in self._entries if key not in entries]
+        result.reordered = [key for key in self._order if key in entries] != [
+            key for key in entries if key in self._entries
+        ]
+        self._entries = entries
+        self._order = list(entries)
+        return result
+
+    def save(self) -> None:
+        """Write the manifest atomically, if it has a path."""
+
+        if self.path is None:
+            return
+        payload = {
+            "version": _MANIFEST_VERSION,
+            "columns": list(self.columns),
+            "sources": {key: entry.to_dict() for key, entry in self._entries.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of :meth:`SourceManifest.refresh`.
+
+    Attributes:
+        mapping: Merged items of every candidate, later sources winning.
+        parsed: Files that were new or changed and had to be parsed.
+        reused: Files whose recorded items were reused.
+        removed: Previously recorded files that are no longer sources.
+        reordered: Whether the remaining sources changed precedence order.
+    """
+
+    mapping: Dict[int, ItemRecord] = field(default_factory=dict)
+    parsed: List[Path] = field(default_factory=list)
+    reused: List[Path] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    reordered: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.parsed or self.removed or self.reordered)
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of :func:`update_item_catalog`.
+
+    Attributes:
+        refresh: Per-source refresh details.
+        output: Mapping JSON path.
+        compiled: Compiled catalog path.
+        written: Whether the outputs were (re)written.
+    """
+
+    refresh: RefreshResult
+    output: Path
+    compiled: Path
+    written: bool
+
+    @property
+    def mapping(self) -> Dict[int, ItemRecord]:
+        return self.refresh.mapping
+
+
+def update_item_catalog(
+    source_roots: Sequence[Path],
+    output: Path,
+    indent: Optional[int] = 2,
+    force: bool = False,
+    columns: Sequence[str] = tuple(ITEM_COLUMNS),
+) -> UpdateResult:
+    """Incrementally rebuild the mapping JSON and compiled catalog at *output*.
+
+    Args:
+        source_roots: Files or directories scanned for item tables.
+        output: Mapping JSON path. The compiled catalog and the manifest are
+            written next to it.
+        indent: JSON indentation for the mapping.
+        force: Ignore the manifest: parse every source and rewrite the outputs.
+        columns: :data:`ITEM_COLUMNS` fields to keep from ``ItemTable.json``.
+
+    Returns:
+        UpdateResult: Refresh details and whether the outputs were written.
+
+    Raises:
+        ValueError: If no sources are found, they yield no items, *output*
+            is a directory, or *columns* names an unknown column.
+    """
+
+    unknown = [column for column in columns if column not in ITEM_COLUMNS]
+    if unknown:
+        raise ValueError(
+            f"Unknown item column(s): {', '.join(unknown)} (choose from {', '.join(ITEM_COLUMNS)})"
+        )
+
+    candidates = list(iter_candidate_files(source_roots, DEFAULT_PATTERNS))
+    if not candidates:
+        raise ValueError(
+            "No candidate files discovered under: " + ", ".join(str(p) for p in source_roots)
+        )
+    if output.is_dir():
+        raise ValueError(f"Output path {output} is a directory")
+
+    manifest_path = output.with_suffix(MANIFEST_SUFFIX)
+    manifest = SourceManifest(manifest_path, columns) if not force else SourceManifest(columns=columns)
+    manifest.path = manifest_path
+    refresh = manifest.refresh(candidates)
+    if not refresh.mapping:
+        raise ValueError("Failed to construct mapping from candidates. Check source data integrity.")
+
+    compiled = output.with_suffix(COMPILED_SUFFIX)
+    up_to_date = not force and not refresh.changed and output.is_file() and compiled.is_file()
+    if not up_to_date:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # Replace atomically so running ItemCatalogHandles never read a partial file
+        tmp = output.with_name(output.name + ".tmp")
+        tmp.write_text(_serialize(refresh.mapping, indent=indent), encoding="utf-8")
+        os.replace(tmp, output)
+        # Written after the JSON so its mtime marks it as fresh
+        write_compiled_catalog(refresh.mapping, compiled)
+    manifest.save()
+    return UpdateResult(refresh, output, compiled, written=not up_to_date)
+
+
+def log_update(result: UpdateResult) -> None:
+    """Log what :func:`update_item_catalog` parsed, reused and wrote."""
+
+    refresh = result.refresh
+    LOGGER.info(
+        "Parsed %d changed source file(s), reused %d unchanged, dropped %d removed",
+        len(refresh.parsed),
+        len(refresh.reused),
+        len(refresh.removed),
+    )
+    LOGGER.info("Compiled %d unique item entries", len(result.mapping))
+    if result.written:
+        LOGGER.info("Wrote mapping to %s", result.output)
+        LOGGER.info("Wrote compiled catalog to %s", result.compiled)
+    else:
+        LOGGER.info("Item catalog %s is up to date", result.output)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -80,39 +326,44 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Suppress informational logging output.",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse every source and rewrite the outputs, ignoring the manifest.",
+    )
+    parser.add_argument(
+        "--columns",
+        default=",".join(ITEM_COLUMNS),
+        help="Comma-separated ItemTable columns to keep; empty for names only (default: %(default)s).",
+    )
     return parser.parse_args()
 
 
+def parse_columns(value: str) -> tuple[str, ...]:
+    """Split a ``--columns`` value into column names."""
+
+    return tuple(column.strip() for column in value.split(",") if column.strip())
+
+
 def main() -> int:
     args = parse_args()
 
     logging.basicConfig(level=logging.INFO if not args.quiet else logging.WARNING)
 
     source_roots = tuple(args.source) if args.source else DEFAULT_SOURCE_ROOTS
-    candidates = list(_iter_candidate_files(source_roots))
-    if not candidates:
-        LOGGER.error("No candidate files discovered under: %s", ", ".join(str(p) for p in source_roots))
+    try:
+        result = update_item_catalog(
+            source_roots,
+            args.output,
+            indent=args.indent,
+            force=args.force,
+            columns=parse_columns(args.columns),
+        )
+    except ValueError as exc:
+        LOGGER.error("%s", exc)
         return 1
-
-    LOGGER.info("Discovered %d candidate file(s)", len(candidates))
-    mapping = build_mapping_from_sources(candidates)
-    if not mapping:
-        LOGGER.error("Failed to construct mapping from candidates. Check source data integrity.")
-        return 1
-
-    LOGGER.info("Compiled %d unique item entries", len(mapping))
-
-    output_path: Path = args.output
-    if output_path.exists() and output_path.is_dir():
-        LOGGER.error("Output path %s is a directory", output_path)
-        return 1
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    payload = _serialize(mapping, indent=args.indent)
-    output_path.write_text(payload, encoding="utf-8")
-    LOGGER.info("Wrote mapping to %s", output_path)
+    log_update(result)
     return 0
 
-
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,160 @@
+"""Price alerts checked against listings as they are decoded.
+
+A watchlist maps item ids to price thresholds. :meth:`Watchlist.alerts`
+consumes a listing iterator (for example
+:meth:`TradingDecoderV2.iter_hybrid_listings` over
+:func:`iter_frames_from_stream`) and yields an alert the moment a matching
+listing is decoded. Each listing is checked with a single dictionary lookup
+and nothing but the keys of already-reported listings is retained.
+
+Watchlist files are JSON objects keyed by item id. A value is either a
+maximum unit price or an object with ``max_price`` and optionally
+``min_quantity`` and ``label``::
+
+    {
+        "1015091": 2100,
+        "1020054": {"max_price": 30000, "min_quantity": 2, "label": "flip"}
+    }
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+__all__ = ["WatchAlert", "WatchRule", "Watchlist"]
+
+
+@dataclass(frozen=True)
+class WatchRule:
+    """Alert when *item_id* is listed at or below *max_price*.
+
+    Attributes:
+        item_id: Item config id to watch.
+        max_price: Highest unit price that triggers the alert.
+        min_quantity: Smallest listing quantity that triggers the alert.
+        label: Optional free-form tag copied into alerts.
+    """
+
+    item_id: int
+    max_price: int
+    min_quantity: int = 1
+    label: Optional[str] = None
+
+    def matches(self, listing: Listing) -> bool:
+        return listing.price_luno <= self.max_price and listing.quantity >= self.min_quantity
+
+
+@dataclass(frozen=True)
+class WatchAlert:
+    """A decoded listing that satisfied a watch rule."""
+
+    rule: WatchRule
+    listing: Listing
+    item_name: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        payload: dict[str, object] = {
+            "item_id": self.rule.item_id,
+            "price_luno": self.listing.price_luno,
+            "quantity": self.listing.quantity,
+            "max_price": self.rule.max_price,
+            "server_sequence": self.listing.server_sequence,
+            "frame_offset": self.listing.frame_offset,
+        }
+        if self.item_name is not None:
+            payload["item_name"] = self.item_name
+        if self.rule.label is not None:
+            payload["label"] = self.rule.label
+        if self.listing.source is not None:
+            payload["decoder"] = self.listing.source
+        return payload
+
+
+class Watchlist:
+    """Index of watch rules keyed by item id."""
+
+    def __init__(self, rules: Iterable[WatchRule]) -> None:
+        self._rules: Dict[int, List[WatchRule]] = {}
+        for rule in rules:
+            self._rules.setdefault(rule.item_id, []).append(rule)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Watchlist":
+        """Load a watchlist JSON file.
+
+        Raises:
+            ValueError: If the file is not a valid watchlist.
+        """
+
+        try:
+            payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Watchlist {path} is not valid JSON: {exc}") from None
+        if not isinstance(payload, dict):
+            raise ValueError(f"Watchlist {path} must be a JSON object keyed by item id")
+
+        rules: List[WatchRule] = []
+        for key, spec in payload.items():
+            try:
+                item_id = int(key)
+                if isinstance(spec, dict):
+                    rule = WatchRule(
+                        item_id=item_id,
+                        max_price=int(spec["max_price"]),
+                        min_quantity=int(spec.get("min_quantity", 1)),
+                        label=spec.get("label"),
+                    )
+                else:
+                    rule = WatchRule(item_id=item_id, max_price=int(spec))
+            except (KeyError, TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid watchlist entry {key!r}: {exc}") from None
+            rules.append(rule)
+        return cls(rules)
+
+    def __len__(self) -> int:
+        return sum(len(rules) for rules in self._rules.values())
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._rules
+
+    def match(self, listing: Listing) -> List[WatchRule]:
+        """Return the rules *listing* satisfies."""
+
+        item_id = listing.item_config_id
+        if item_id is None:
+            return []
+        rules = self._rules.get(item_id)
+        if not rules:
+            return []
+        return [rule for rule in rules if rule.matches(listing)]
+
+    def alerts(
+        self,
+        listings: Iterable[Listing],
+        resolver: Optional[Callable[[int], Optional[ItemRecord]]] = None,
+    ) -> Iterator[WatchAlert]:
+        """Yield an alert for each matching listing as soon as it is decoded.
+
+        A listing seen again in a later page refresh, with the same item,
+        price and quantity, is reported only once per rule.
+
+        Args:
+            listings: Listing stream to check.
+            resolver: Optional item-id resolver used to name alerted items.
+        """
+
+        reported: Set[Tuple[WatchRule, int, int]] = set()
+        for listing in listings:
+            for rule in self.match(listing):
+                key = (rule, listing.price_luno, listing.quantity)
+                if key in reported:
+                    continue
+                reported.add(key)
+                record = resolver(rule.item_id) if resolver is not None else None
+                yield WatchAlert(rule, listing, record.name if record is not None else None)
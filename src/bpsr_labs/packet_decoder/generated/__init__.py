@@ -1,12 +1,9 @@
-"""Generated protobuf modules for BPSR."""
-from __future__ import annotations
-
-import sys
-from pathlib import Path
+"""Generated protobuf modules for BPSR.
 
-_pkg_dir = Path(__file__).resolve().parent
-_pkg_str = str(_pkg_dir)
-if _pkg_str not in sys.path:
-    sys.path.insert(0, _pkg_str)
+Import modules through
+:func:`bpsr_labs.packet_decoder.decoder.generated_registry.get_generated_registry`,
+which adds this directory to ``sys.path`` on first use.
+"""
+from __future__ import annotations
 
 __all__: list[str] = []
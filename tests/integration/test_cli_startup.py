@@ -0,0 +1,65 @@
+"""Startup-cost tests for the unified ``bpsr-labs`` CLI."""
+
+import os
+import subprocess
+import sys
+import time
+
+# Generous enough for slow CI machines, tight enough to catch a regression that
+# re-imports protobuf/zstandard/generated modules at CLI import time.
+HELP_BUDGET_S = 1.5
+
+HEAVY_MODULES = (
+    "google.protobuf",
+    "zstandard",
+    "blackboxprotobuf",
+    "bpsr_labs.packet_decoder.decoder",
+)
+
+
+def _run_python(code: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+def test_cli_import_skips_heavy_dependencies():
+    """Importing the CLI and rendering help must not load decoder dependencies."""
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from bpsr_labs.cli import main\n"
+        "result = CliRunner().invoke(main, ['--help'])\n"
+        "assert result.exit_code == 0, result.output\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    loaded = _run_python(code).stdout.strip()
+    assert loaded == ""
+
+
+def test_cli_help_within_budget():
+    """``bpsr-labs --help`` must finish within the startup budget."""
+    code = "import sys; sys.argv = ['bpsr-labs', '--help']; from bpsr_labs.cli import main; main()"
+
+    # Warm the bytecode cache so the measurement reflects steady-state startup.
+    _run_python("import bpsr_labs.cli")
+    start = time.perf_counter()
+    result = _run_python(code)
+    elapsed = time.perf_counter() - start
+    assert "Usage" in result.stdout
+    assert elapsed < HELP_BUDGET_S, f"bpsr-labs --help took {elapsed:.2f}s (budget {HELP_BUDGET_S}s)"
+
+
+def test_decoder_lazy_exports_match_all():
+    """Every name in the decoder package's ``__all__`` resolves through its lazy lookup table."""
+    import bpsr_labs.packet_decoder.decoder as decoder
+
+    assert set(decoder.__all__) == set(decoder._EXPORTS)
+    for name in decoder.__all__:
+        assert getattr(decoder, name) is not None
@@ -0,0 +1,41 @@
+"""Shared builders for raw FrameDown fragments and listing blocks in unit tests."""
+
+import struct
+
+
+def varint(value: int) -> bytes:
+    """Encode *value* as a protobuf base-128 varint."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def len_field(number: int, payload: bytes) -> bytes:
+    """Encode a length-delimited field."""
+    return varint(number << 3 | 2) + varint(len(payload)) + payload
+
+
+def listing_entry(price: int, quantity: int, item_id: int, extra_detail: bytes = b"") -> bytes:
+    """Encode one listing entry: price, quantity and item details."""
+    details = b"\x10" + varint(item_id) + extra_detail
+    return b"\x08" + varint(price) + b"\x10" + varint(quantity) + len_field(3, details)
+
+
+def frame_down(segment: bytes, server_seq: int = 7) -> bytes:
+    """Wrap *segment* in an uncompressed FrameDown fragment."""
+    body = struct.pack(">I", server_seq) + segment
+    return struct.pack(">I", len(body) + 6) + struct.pack(">H", 0x0006) + body
+
+
+def listing_frame(entries, server_seq: int = 7, extra_detail: bytes = b"") -> bytes:
+    """Build a FrameDown fragment holding one listing block of ``(price, quantity, item_id)`` entries."""
+    block = b"".join(
+        len_field(2, listing_entry(price, quantity, item_id, extra_detail)) for price, quantity, item_id in entries
+    )
+    return frame_down(len_field(1, block), server_seq)
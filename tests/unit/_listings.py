@@ -0,0 +1,28 @@
+"""Shared trading-center listing factories for unit tests."""
+
+from typing import Optional
+
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+
+def make_listing(
+    price: int,
+    quantity: int,
+    item_id: Optional[int] = 1001,
+    server_sequence: int = 1,
+    frame_offset: int = 0,
+) -> Listing:
+    """Build a V1-decoded listing with the given price level."""
+    return Listing(
+        frame_offset=frame_offset,
+        server_sequence=server_sequence,
+        price_luno=price,
+        quantity=quantity,
+        item_config_id=item_id,
+        source="v1",
+    )
+
+
+def listing_row(price: int, quantity: int, item_id: Optional[int] = 1001, server_sequence: int = 1) -> dict:
+    """Build a listing as ``trade-decode`` writes it to JSON."""
+    return make_listing(price, quantity, item_id, server_sequence).to_dict(include_raw=False)
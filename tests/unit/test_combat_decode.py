@@ -32,3 +32,41 @@ def test_decoded_record_to_json():
     assert "service_uid" in json_str
     assert "0x0000000063335342" in json_str
     assert "test" in json_str
+
+
+def test_combat_decoders_share_descriptor_registry(descriptor_path: Path):
+    """Test that decoders built from the same descriptor share one pool."""
+    from bpsr_labs.packet_decoder.decoder.combat_decode_v2 import CombatDecoderV2
+
+    first = CombatDecoder(descriptor_path)
+    second = CombatDecoder(descriptor_path)
+    v2 = CombatDecoderV2(descriptor_path=descriptor_path)
+
+    assert first.registry is second.registry
+    assert v2._fallback.registry is first.registry
+
+
+def test_descriptor_registry_rebuilds_on_content_change(descriptor_path: Path, tmp_path: Path):
+    """Test that replacing the descriptor file yields a fresh registry."""
+    from bpsr_labs.packet_decoder.decoder.descriptor_registry import get_descriptor_registry
+
+    copy = tmp_path / "descriptor.pb"
+    copy.write_bytes(descriptor_path.read_bytes())
+    original = get_descriptor_registry(copy)
+    assert get_descriptor_registry(copy) is original
+
+    copy.write_bytes(b"")
+    rebuilt = get_descriptor_registry(copy)
+    assert rebuilt is not original
+    assert rebuilt.digest != original.digest
+
+
+def test_descriptor_registry_caches_message_classes(descriptor_path: Path):
+    """Test message class lookups for known and unknown names."""
+    decoder = CombatDecoder(descriptor_path)
+    name = "blueprotobuf_package.SyncServerTime"
+
+    cls = decoder.registry.message_class(name)
+    assert cls is not None
+    assert decoder.registry.message_class(name) is cls
+    assert decoder.registry.message_class("blueprotobuf_package.DoesNotExist") is None
@@ -0,0 +1,91 @@
+"""Unit tests for the protobuf-class based combat decoder."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bpsr_labs.packet_decoder.decoder.combat_decode import SERVICE_UID
+from bpsr_labs.packet_decoder.decoder.combat_decode_v2 import CombatDecoderV2
+from bpsr_labs.packet_decoder.decoder.framing import NotifyFrame
+
+
+def _frame(method_id: int, payload: bytes) -> NotifyFrame:
+    return NotifyFrame(SERVICE_UID, 1, method_id, payload, False, 0)
+
+
+@pytest.fixture
+def mapping_path(tmp_path: Path) -> Path:
+    path = tmp_path / "combat_method_map.json"
+    path.write_text(
+        json.dumps(
+            {
+                "methods": {
+                    "0x00000090": {"module": "bpsr_missing_module_pb2", "message": "Missing"},
+                    "0x00000091": {
+                        "module": "google.protobuf.descriptor_pb2",
+                        "message": "FileDescriptorProto",
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_unresolvable_module_is_negatively_cached(mapping_path: Path, descriptor_path: Path, monkeypatch):
+    """Test that a missing module is imported once and then routed to the fallback."""
+    import bpsr_labs.packet_decoder.decoder.generated_registry as registry_module
+
+    calls = []
+    real_import = registry_module.import_module
+
+    def counting_import(name):
+        calls.append(name)
+        return real_import(name)
+
+    monkeypatch.setattr(registry_module, "import_module", counting_import)
+    decoder = CombatDecoderV2(mapping_path=mapping_path, descriptor_path=descriptor_path)
+
+    for _ in range(5):
+        assert decoder.decode(_frame(0x90, b"")) is None
+
+    assert calls == ["bpsr_missing_module_pb2"]
+    stats = decoder.method_stats()["0x00000090"]
+    assert stats["routed_to_fallback"] is True
+    assert stats["fallbacks"] == 5
+    assert stats["v2_hits"] == 0
+
+
+def test_repeated_decode_errors_route_to_fallback(mapping_path: Path, descriptor_path: Path):
+    """Test that consecutive DecodeErrors stop further V2 parse attempts."""
+    decoder = CombatDecoderV2(mapping_path=mapping_path, descriptor_path=descriptor_path, failure_threshold=2)
+    truncated = b"\x0a\xff"
+
+    for _ in range(4):
+        decoder.decode(_frame(0x91, truncated))
+
+    stats = decoder.method_stats()["0x00000091"]
+    assert stats["v2_failures"] == 2
+    assert stats["fallbacks"] == 4
+    assert stats["routed_to_fallback"] is True
+
+
+def test_successful_v2_decode_counts_hits(mapping_path: Path, descriptor_path: Path):
+    """Test that successful static decodes are counted and not rerouted."""
+    decoder = CombatDecoderV2(mapping_path=mapping_path, descriptor_path=descriptor_path)
+
+    record = decoder.decode(_frame(0x91, b"\x0a\x03a.p"))
+
+    assert record is not None
+    assert record.message_type == "google.protobuf.FileDescriptorProto"
+    assert record.data == {"name": "a.p"}
+    stats = decoder.method_stats()["0x00000091"]
+    assert stats == {
+        "v2_hits": 1,
+        "v2_failures": 0,
+        "fallbacks": 0,
+        "routed_to_fallback": False,
+        "reason": None,
+    }
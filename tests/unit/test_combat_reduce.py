@@ -1,6 +1,5 @@
 """Unit tests for combat data reduction."""
 
-import pytest
 from bpsr_labs.packet_decoder.decoder.combat_reduce import CombatReducer, _parse_int, Bucket
 
 
@@ -50,3 +49,25 @@ def test_combat_reducer_summary():
     assert summary["dps"] == 1000.0
     assert "skills" in summary
     assert "targets" in summary
+
+
+def test_combat_reducer_summary_names_skills():
+    """Test that skills are named once per distinct skill at summary time."""
+    from bpsr_labs.packet_decoder.decoder.skill_catalog import SkillRecord
+
+    lookups = []
+
+    class Recording(dict):
+        def get(self, key, default=None):
+            lookups.append(key)
+            return super().get(key, default)
+
+    reducer = CombatReducer()
+    for skill_id in (1701, 1701, 1701, 42):
+        reducer._process_damage({"owner_id": skill_id, "value": 10}, target_uuid=1)
+
+    summary = reducer.summary(Recording({1701: SkillRecord(1701, "Frost Lance")}))
+    assert summary["skills"]["1701"] == {"damage": 30, "hits": 3, "crits": 0, "name": "Frost Lance"}
+    assert "name" not in summary["skills"]["42"]
+    assert sorted(lookups) == [42, 1701]
+    assert "name" not in reducer.summary()["skills"]["1701"]
@@ -0,0 +1,128 @@
+"""Tests for incremental protobuf generation (scripts/generate_protos.py)."""
+
+import importlib.util
+import subprocess
+from pathlib import Path
+
+import pytest
+
+_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "generate_protos.py"
+
+
+@pytest.fixture
+def gen(tmp_path, monkeypatch):
+    """Load the script with its paths pointed at a scratch proto tree.
+
+    protoc is replaced by a fake that writes an output module per input and
+    records which files each run compiled.
+    """
+    spec = importlib.util.spec_from_file_location("generate_protos", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    star_data = tmp_path / "proto"
+    (star_data / "zproto").mkdir(parents=True)
+    out_dir = tmp_path / "generated"
+    monkeypatch.setattr(module, "STAR_DATA", star_data)
+    monkeypatch.setattr(module, "OUT_DIR", out_dir)
+    monkeypatch.setattr(module, "MANIFEST_PATH", out_dir / ".proto_manifest.json")
+    monkeypatch.setattr(module, "PROTO_BATCHES", ((star_data / "zproto", [str(star_data / "zproto")]),))
+    monkeypatch.setattr(module, "EXTRA_FILES", ())
+
+    module.compiled = []
+    module.failing = set()
+
+    def fake_run_job(cwd, includes, files):
+        names = [Path(f).name for f in files]
+        if module.failing.intersection(names):
+            raise subprocess.CalledProcessError(1, "protoc", stderr="boom")
+        for name in names:
+            module.compiled.append(name)
+            (out_dir / (Path(name).stem + "_pb2.py")).write_text("", encoding="utf-8")
+
+    monkeypatch.setattr(module, "_run_job", fake_run_job)
+    return module
+
+
+def _proto(gen, name, body=""):
+    (gen.STAR_DATA / "zproto" / name).write_text(f'syntax = "proto3";\n{body}', encoding="utf-8")
+
+
+def _run(gen, monkeypatch, *args):
+    monkeypatch.setattr("sys.argv", ["generate_protos.py", "--jobs", "1", *args])
+    gen.compiled.clear()
+    gen.main()
+    return sorted(gen.compiled)
+
+
+def test_second_run_skips_unchanged_files(gen, monkeypatch):
+    """Test that the manifest records each file and an unchanged tree is not recompiled."""
+    _proto(gen, "a.proto")
+    _proto(gen, "b.proto")
+
+    assert _run(gen, monkeypatch) == ["a.proto", "b.proto"]
+    manifest = gen.load_manifest()
+    assert set(manifest) == {"zproto/a.proto", "zproto/b.proto"}
+    assert manifest["zproto/a.proto"]["output"] == "a_pb2.py"
+
+    assert _run(gen, monkeypatch) == []
+
+
+def test_changed_import_recompiles_dependents(gen, monkeypatch):
+    """Test that editing a proto recompiles the files that import it, transitively."""
+    _proto(gen, "base.proto")
+    _proto(gen, "mid.proto", 'import "base.proto";\n')
+    _proto(gen, "top.proto", 'import "mid.proto";\n')
+    _proto(gen, "other.proto")
+    _run(gen, monkeypatch)
+
+    _proto(gen, "base.proto", "message Changed {}\n")
+    assert _run(gen, monkeypatch) == ["base.proto", "mid.proto", "top.proto"]
+
+
+def test_force_recompiles_everything(gen, monkeypatch):
+    """Test that --force ignores the manifest."""
+    _proto(gen, "a.proto")
+    _proto(gen, "b.proto")
+    _run(gen, monkeypatch)
+
+    assert _run(gen, monkeypatch, "--force") == ["a.proto", "b.proto"]
+
+
+def test_missing_output_is_regenerated(gen, monkeypatch):
+    """Test that a deleted output module is rebuilt even if its hash matches."""
+    _proto(gen, "a.proto")
+    _run(gen, monkeypatch)
+
+    (gen.OUT_DIR / "a_pb2.py").unlink()
+    assert _run(gen, monkeypatch) == ["a.proto"]
+
+
+def test_removed_proto_output_is_pruned(gen, monkeypatch):
+    """Test that outputs of protos deleted from the tree are removed with their manifest entry."""
+    _proto(gen, "a.proto")
+    _proto(gen, "gone.proto")
+    _run(gen, monkeypatch)
+    assert (gen.OUT_DIR / "gone_pb2.py").is_file()
+
+    (gen.STAR_DATA / "zproto" / "gone.proto").unlink()
+    assert _run(gen, monkeypatch) == []
+    assert not (gen.OUT_DIR / "gone_pb2.py").exists()
+    assert (gen.OUT_DIR / "a_pb2.py").is_file()
+    assert set(gen.load_manifest()) == {"zproto/a.proto"}
+
+
+def test_failed_batch_exits_non_zero_and_is_retried(gen, monkeypatch):
+    """Test that a protoc failure exits 1, keeps the manifest and retries only the failure."""
+    monkeypatch.setattr(gen, "BATCH_SIZE", 1)
+    _proto(gen, "good.proto")
+    _proto(gen, "bad.proto")
+    gen.failing.add("bad.proto")
+
+    with pytest.raises(SystemExit) as excinfo:
+        _run(gen, monkeypatch)
+    assert excinfo.value.code == 1
+    assert set(gen.load_manifest()) == {"zproto/good.proto"}
+
+    gen.failing.clear()
+    assert _run(gen, monkeypatch) == ["bad.proto"]
@@ -0,0 +1,90 @@
+"""Unit tests for the lazy generated-module registry."""
+
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from google.protobuf import descriptor_pb2
+
+from bpsr_labs.packet_decoder.decoder.generated_registry import GeneratedModuleRegistry
+from bpsr_labs.packet_decoder.decoder.trading_center_decode_v2 import TradingDecoderV2
+
+_MODULE_TEMPLATE = """from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf.internal import builder as _builder
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile({serialized!r})
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, {module!r}, _globals)
+"""
+
+
+@pytest.fixture
+def generated_dir(tmp_path: Path, monkeypatch) -> tuple[Path, str, str]:
+    """Write a protoc-style module defining ``<package>.Outer.Inner``."""
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    suffix = uuid.uuid4().hex[:8]
+    package = f"bpsr_test_{suffix}"
+    module = f"fake_{suffix}_pb2"
+
+    file_proto = descriptor_pb2.FileDescriptorProto(name=f"{module}.proto", package=package, syntax="proto3")
+    outer = file_proto.message_type.add(name="Outer")
+    outer.field.add(name="value", number=1, type=descriptor_pb2.FieldDescriptorProto.TYPE_INT32, label=1)
+    inner = outer.nested_type.add(name="Inner")
+    inner.field.add(name="text", number=1, type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING, label=1)
+
+    (tmp_path / f"{module}.py").write_text(
+        _MODULE_TEMPLATE.format(serialized=file_proto.SerializeToString(), module=module),
+        encoding="utf-8",
+    )
+    return tmp_path, package, module
+
+
+def test_index_does_not_import_modules(generated_dir):
+    """Test that the full-name index is built without importing modules."""
+    path, package, module = generated_dir
+    registry = GeneratedModuleRegistry(path)
+
+    index = registry.index()
+
+    assert index[f"{package}.Outer"] == module
+    assert index[f"{package}.Outer.Inner"] == module
+    assert module not in sys.modules
+    assert registry.loaded_modules() == []
+
+
+def test_resolve_by_full_name_loads_on_first_use(generated_dir):
+    """Test resolving a nested message by full name and recording load stats."""
+    path, package, module = generated_dir
+    registry = GeneratedModuleRegistry(path, track_memory=True)
+
+    inner_cls = registry.resolve(f"{package}.Outer.Inner")
+
+    assert inner_cls(text="hi").text == "hi"
+    assert registry.loaded_modules() == [module]
+    (stats,) = registry.load_stats()
+    assert stats.module == module
+    assert stats.seconds >= 0
+    assert isinstance(stats.allocated_bytes, int)
+    assert registry.resolve_attr(module, "Outer.Inner") is inner_cls
+
+
+def test_resolve_unknown_name_raises(generated_dir):
+    """Test that unknown full names raise KeyError."""
+    path, package, _ = generated_dir
+    with pytest.raises(KeyError):
+        GeneratedModuleRegistry(path).resolve(f"{package}.Missing")
+
+
+def test_trading_decoder_loads_only_when_queried(tmp_path: Path, monkeypatch):
+    """Test that TradingDecoderV2 defers imports until availability is queried."""
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    registry = GeneratedModuleRegistry(tmp_path)
+
+    decoder = TradingDecoderV2(registry=registry)
+    assert str(tmp_path) not in sys.path
+
+    assert decoder.available is False
+    assert isinstance(decoder.import_error, ModuleNotFoundError)
+    assert decoder.decode_listings(b"") == []
@@ -1,17 +1,26 @@
 """Tests for item catalog functionality."""
 
 import json
+import os
 import tempfile
+from collections import ChainMap
 from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from click.testing import CliRunner
 
+from bpsr_labs.cli import main as cli_main
 from bpsr_labs.packet_decoder.decoder.item_catalog import (
+    CompiledItemCatalog,
+    ItemCatalogHandle,
     ItemRecord,
+    SharedItemCatalog,
     build_mapping_from_sources,
     load_item_mapping,
     resolve_item_name,
+    select_items,
+    write_compiled_catalog,
 )
 
 
@@ -172,6 +181,49 @@ class TestMappingLoading:
             temp_path.unlink()
 
 
+class TestStreamingJsonReader:
+    """Test the incremental top-level JSON object reader."""
+
+    DOCUMENT = {
+        "1": {"Id": 1, "Name": "Quote \" and naïve", "Icon": None, "Cols": [1, 2.5e3, {"k": "v"}]},
+        "22": 12345678,
+        "3": -0.5,
+        "4": 1e-7,
+        "5": True,
+        "6": None,
+    }
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    @pytest.mark.parametrize("chunk_chars", [1, 2, 3, 7, 1 << 16])
+    def test_matches_json_loads_at_any_chunk_boundary(self, tmp_path, indent, chunk_chars):
+        """Test that entries split across chunks, including numbers, decode intact."""
+        from bpsr_labs.packet_decoder.decoder.catalog_format import iter_json_object
+
+        path = tmp_path / "items.json"
+        path.write_text(json.dumps(self.DOCUMENT, indent=indent, ensure_ascii=False) + "\n", encoding="utf-8")
+
+        assert list(iter_json_object(path, chunk_chars)) == list(self.DOCUMENT.items())
+
+    @pytest.mark.parametrize("text", ['[1, 2]', '{}', '  {  }  '])
+    def test_documents_without_entries(self, tmp_path, text):
+        """Test that non-object and empty documents yield nothing."""
+        from bpsr_labs.packet_decoder.decoder.catalog_format import iter_json_object
+
+        path = tmp_path / "items.json"
+        path.write_text(text)
+        assert list(iter_json_object(path, 3)) == []
+
+    @pytest.mark.parametrize("text", ['{"a": 1', '{"a" 1}', '{"a": 1,}', '{"a": 1} x', '', '{1: 2}'])
+    def test_invalid_json_raises(self, tmp_path, text):
+        """Test that malformed documents raise like json.loads."""
+        from bpsr_labs.packet_decoder.decoder.catalog_format import iter_json_object
+
+        path = tmp_path / "items.json"
+        path.write_text(text)
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_object(path, 3))
+
+
 class TestBuildMappingFromSources:
     """Test building mappings from multiple sources."""
 
@@ -356,3 +408,259 @@ class TestResolveItemName:
             load_item_mapping.cache_clear()
             name = resolve_item_name(123)
             assert name is None
+
+
+class TestCompiledCatalog:
+    """Test the compiled, memory-mapped item catalog."""
+
+    @pytest.fixture
+    def records(self):
+        return {
+            456: ItemRecord(456, "Ünïcode Ore", "ore.png"),
+            123: ItemRecord(123, "Test Item"),
+            -7: ItemRecord(-7, "Negative Id"),
+        }
+
+    def test_round_trip(self, tmp_path, records):
+        """Test that a written catalog reads back as the same mapping."""
+        path = tmp_path / "items.bin"
+        write_compiled_catalog(records, path)
+
+        with CompiledItemCatalog.open(path) as catalog:
+            assert len(catalog) == 3
+            assert list(catalog) == [-7, 123, 456]
+            assert dict(catalog.items()) == records
+            assert catalog.get(999) is None
+            assert "123" not in catalog
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test that a file without the catalog header is rejected."""
+        path = tmp_path / "items.bin"
+        path.write_bytes(b"not a catalog at all, really")
+        with pytest.raises(ValueError):
+            CompiledItemCatalog.open(path)
+
+    def test_incomplete_subclass_cannot_be_created(self, tmp_path, records):
+        """Test that a catalog subclass without a record builder fails before reading anything."""
+        from bpsr_labs.packet_decoder.decoder.catalog_format import CompiledCatalog
+
+        class NoRecords(CompiledCatalog[ItemRecord]):
+            MAGIC = CompiledItemCatalog.MAGIC
+
+        path = tmp_path / "items.bin"
+        write_compiled_catalog(records, path)
+        with pytest.raises(TypeError, match="_make_record"):
+            NoRecords.open(path)
+
+    def test_fresh_sibling_is_preferred(self, tmp_path, records):
+        """Test that load_item_mapping memory-maps a fresh compiled sibling."""
+        source = tmp_path / "item_name_map.json"
+        source.write_text(json.dumps({"123": "From JSON"}))
+        write_compiled_catalog(records, source.with_suffix(".bin"))
+        load_item_mapping.cache_clear()
+        try:
+            mapping = load_item_mapping([source])
+            assert isinstance(mapping, CompiledItemCatalog)
+            assert mapping[123].name == "Test Item"
+        finally:
+            load_item_mapping.cache_clear()
+
+    def test_stale_sibling_falls_back_to_json(self, tmp_path, records):
+        """Test that a JSON file edited after compiling wins."""
+        source = tmp_path / "item_name_map.json"
+        compiled = source.with_suffix(".bin")
+        write_compiled_catalog(records, compiled)
+        source.write_text(json.dumps({"123": "From JSON"}))
+        stamp = compiled.stat().st_mtime_ns
+        os.utime(source, ns=(stamp + 10**9, stamp + 10**9))
+        load_item_mapping.cache_clear()
+        try:
+            assert load_item_mapping([source])[123].name == "From JSON"
+        finally:
+            load_item_mapping.cache_clear()
+
+    def test_later_sources_override_compiled(self, tmp_path, records):
+        """Test precedence when compiled and JSON sources are combined."""
+        first = tmp_path / "item_name_map.json"
+        write_compiled_catalog(records, first.with_suffix(".bin"))
+        second = tmp_path / "custom.json"
+        second.write_text(json.dumps({"123": "Override"}))
+        load_item_mapping.cache_clear()
+        try:
+            mapping = load_item_mapping(iter([first, second]))
+            assert mapping[123].name == "Override"
+            assert mapping[456].icon == "ore.png"
+        finally:
+            load_item_mapping.cache_clear()
+
+    def test_shared_memory_round_trip(self, records):
+        """Test publishing to shared memory and attaching by name."""
+        with SharedItemCatalog(records) as shared:
+            with CompiledItemCatalog.attach_shared(shared.name) as catalog:
+                assert dict(catalog.items()) == records
+
+    def test_update_items_writes_compiled_catalog(self, tmp_path):
+        """Test that update-items emits the compiled sibling."""
+        source = tmp_path / "item_name_map.json"
+        source.write_text(json.dumps({"1": {"name": "Blade", "icon": "blade.png"}}))
+        output = tmp_path / "out" / "item_name_map.json"
+
+        result = CliRunner().invoke(cli_main, ["update-items", "-s", str(source), "-o", str(output), "--quiet"])
+
+        assert result.exit_code == 0, result.output
+        with CompiledItemCatalog.open(output.with_suffix(".bin")) as catalog:
+            assert catalog[1] == ItemRecord(1, "Blade", "blade.png")
+
+
+class TestItemColumns:
+    """Test the optional rarity/category/stack size columns."""
+
+    @pytest.fixture
+    def records(self):
+        return {
+            1: ItemRecord(1, "Serum", rarity=2, category=5, stack_size=99),
+            2: ItemRecord(2, "Staff", "staff.png", rarity=4, category=1),
+            3: ItemRecord(3, "Ore"),
+        }
+
+    def test_item_table_columns(self, tmp_path):
+        """Test that Quality, Type and Overlap are kept as selected."""
+        path = tmp_path / "ItemTable.json"
+        path.write_text(json.dumps({"1": {"Id": 1, "Name": "Serum", "Quality": 2, "Type": 5, "Overlap": 99}}))
+        from bpsr_labs.packet_decoder.decoder.item_catalog import _load_from_item_table
+
+        assert _load_from_item_table(path)[1] == ItemRecord(1, "Serum", rarity=2, category=5, stack_size=99)
+        assert _load_from_item_table(path, ["category"])[1] == ItemRecord(1, "Serum", category=5)
+
+    def test_compiled_round_trip(self, tmp_path, records):
+        """Test that columns survive compiling and missing values stay None."""
+        path = tmp_path / "items.bin"
+        write_compiled_catalog(records, path)
+
+        with CompiledItemCatalog.open(path) as catalog:
+            assert dict(catalog.items()) == records
+            assert catalog.columns == ("rarity", "category", "stack_size")
+            assert list(catalog.column("category")) == [5, 1, -(1 << 31)]
+
+    def test_names_only_catalog_has_no_columns(self, tmp_path):
+        """Test that columns no item has are not stored."""
+        path = tmp_path / "items.bin"
+        write_compiled_catalog({1: ItemRecord(1, "Serum")}, path)
+
+        with CompiledItemCatalog.open(path) as catalog:
+            assert catalog.columns == ()
+            assert catalog.column("rarity") is None
+            assert catalog[1] == ItemRecord(1, "Serum")
+
+    def test_version_1_catalog_still_opens(self, tmp_path):
+        """Test that catalogs written before columns existed are readable."""
+        from bpsr_labs.packet_decoder.decoder.catalog_format import _COMPILED_HEADER, compiled_parts
+
+        header, ids, names, icons, _directory, *blobs = compiled_parts(
+            {1: ItemRecord(1, "Serum", "s.png")}, CompiledItemCatalog.MAGIC
+        )
+        magic, _, count, blob_size = _COMPILED_HEADER.unpack(header)
+        path = tmp_path / "items.bin"
+        path.write_bytes(b"".join([_COMPILED_HEADER.pack(magic, 1, count, blob_size), ids, names, icons, *blobs]))
+
+        with CompiledItemCatalog.open(path) as catalog:
+            assert catalog[1] == ItemRecord(1, "Serum", "s.png")
+
+    def test_select_items(self, tmp_path, records):
+        """Test category and rarity selection on dict and compiled catalogs."""
+        path = tmp_path / "items.bin"
+        write_compiled_catalog(records, path)
+
+        with CompiledItemCatalog.open(path) as catalog:
+            for mapping in (records, catalog):
+                assert select_items(mapping, categories=[5, 1]) == {1, 2}
+                assert select_items(mapping, min_rarity=3) == {2}
+                assert select_items(mapping, categories=[5], min_rarity=3) == frozenset()
+                assert select_items(mapping) == {1, 2, 3}
+
+    def test_select_items_respects_overrides(self, records):
+        """Test that a later source's record decides the match."""
+        override = {1: ItemRecord(1, "Serum", category=9)}
+        assert select_items(ChainMap(override, records), categories=[5]) == frozenset()
+        assert select_items(ChainMap(override, records), categories=[9]) == {1}
+
+    def test_select_items_without_column(self):
+        """Test that filtering on a column no item has is an error."""
+        with pytest.raises(ValueError, match="no rarity column"):
+            select_items({1: ItemRecord(1, "Serum", category=5)}, min_rarity=1)
+
+
+class TestItemCatalogHandle:
+    """Test mtime-based hot reloading."""
+
+    class Clock:
+        def __init__(self):
+            self.now = 0.0
+
+        def __call__(self):
+            return self.now
+
+    @staticmethod
+    def _write(path, names, mtime):
+        path.write_text(json.dumps(names))
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_reloads_after_interval_when_source_changes(self, tmp_path):
+        """Test that changes are seen only once the check interval has passed."""
+        source = tmp_path / "item_name_map.json"
+        self._write(source, {"1": "Old"}, 1_000_000_000)
+        clock = self.Clock()
+        catalog = ItemCatalogHandle([source], check_interval=5.0, clock=clock)
+        assert catalog[1].name == "Old"
+
+        self._write(source, {"1": "New", "2": "Added"}, 2_000_000_000)
+        clock.now = 4.0
+        assert catalog.get(1).name == "Old"
+        clock.now = 5.0
+        assert catalog.get(1).name == "New"
+        assert len(catalog) == 2
+
+    def test_unchanged_sources_keep_the_mapping(self, tmp_path):
+        """Test that a check without changes does not reload."""
+        source = tmp_path / "item_name_map.json"
+        self._write(source, {"1": "Same"}, 1_000_000_000)
+        catalog = ItemCatalogHandle([source], check_interval=0)
+        mapping = catalog.mapping
+
+        assert catalog.refresh() is False
+        assert catalog.mapping is mapping
+
+    def test_compiled_sibling_update_is_picked_up(self, tmp_path):
+        """Test that rewriting the compiled catalog also triggers a reload."""
+        source = tmp_path / "item_name_map.json"
+        write_compiled_catalog({1: ItemRecord(1, "Compiled")}, source.with_suffix(".bin"))
+        catalog = ItemCatalogHandle([source], check_interval=0)
+        assert catalog[1].name == "Compiled"
+
+        write_compiled_catalog({1: ItemRecord(1, "Recompiled")}, source.with_suffix(".bin"))
+        os.utime(source.with_suffix(".bin"), ns=(5_000_000_000, 5_000_000_000))
+        assert catalog[1].name == "Recompiled"
+
+    def test_empty_reload_keeps_previous_mapping(self, tmp_path):
+        """Test that a source caught mid-write does not blank the catalog."""
+        source = tmp_path / "item_name_map.json"
+        self._write(source, {"1": "Kept"}, 1_000_000_000)
+        catalog = ItemCatalogHandle([source], check_interval=0)
+
+        source.write_text('{"1": ')
+        os.utime(source, ns=(2_000_000_000, 2_000_000_000))
+        assert catalog.get(1).name == "Kept"
+
+        self._write(source, {"1": "Fixed"}, 3_000_000_000)
+        assert catalog.get(1).name == "Fixed"
+
+    def test_concurrent_check_does_not_block(self, tmp_path):
+        """Test that lookups proceed while another thread holds the reload lock."""
+        source = tmp_path / "item_name_map.json"
+        self._write(source, {"1": "Current"}, 1_000_000_000)
+        catalog = ItemCatalogHandle([source], check_interval=0)
+        self._write(source, {"1": "Pending"}, 2_000_000_000)
+
+        with catalog._lock:
+            assert catalog.get(1).name == "Current"
+        assert catalog.get(1).name == "Pending"
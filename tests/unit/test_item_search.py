@@ -0,0 +1,75 @@
+"""Tests for item name search."""
+
+import json
+
+from click.testing import CliRunner
+
+from bpsr_labs.cli import main as cli_main
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord, write_compiled_catalog
+from bpsr_labs.packet_decoder.decoder.item_search import ItemSearchIndex
+
+NAMES = {
+    2: "Frostjade Staff - Magic Wand",
+    1015091: "Wind Serum Lv.1",
+    1015092: "Wind Serum Lv.2",
+    1015100: "Windswept Cloak",
+    10002: "Luno",
+    3001: "Épée Ancienne",
+}
+
+
+class TestItemSearchIndex:
+    """Test prefix, exact and fuzzy matching."""
+
+    def setup_method(self):
+        self.index = ItemSearchIndex(NAMES)
+
+    def test_every_word_must_prefix_a_name_word(self):
+        """Test that query words are intersected as prefixes."""
+        hits = self.index.search("wind ser")
+        assert [hit.item_id for hit in hits] == [1015091, 1015092]
+        assert not any(hit.fuzzy for hit in hits)
+
+    def test_exact_words_rank_above_prefixes(self):
+        """Test that a verbatim word outranks a longer word sharing its prefix."""
+        hits = self.index.search("wind", limit=3)
+        assert [hit.item_id for hit in hits] == [1015091, 1015092, 1015100]
+        assert hits[0].score > hits[2].score
+
+    def test_fuzzy_fallback_for_misspellings(self):
+        """Test that a typo finds the item through trigram similarity."""
+        hits = self.index.search("frostjde", limit=1)
+        assert [(hit.item_id, hit.fuzzy) for hit in hits] == [(2, True)]
+
+    def test_accents_and_case_are_ignored(self):
+        """Test casefolding and accent stripping on both sides."""
+        assert [hit.item_id for hit in self.index.search("EPEE", limit=1)] == [3001]
+
+    def test_numeric_query_matches_item_id(self):
+        """Test that an item id is found directly."""
+        assert self.index.search("10002", limit=1)[0].name == "Luno"
+
+    def test_no_match(self):
+        """Test queries that match nothing, including empty ones."""
+        assert self.index.search("zzzz") == []
+        assert self.index.search("  ") == []
+
+    def test_from_mapping(self):
+        """Test building from an ItemRecord mapping."""
+        index = ItemSearchIndex.from_mapping({5: ItemRecord(5, "Luno Amber")})
+        assert len(index) == 1
+        assert index.search("amber")[0].item_id == 5
+
+
+def test_items_search_command(tmp_path):
+    """Test the items search subcommand over a compiled catalog."""
+    catalog = tmp_path / "items.bin"
+    write_compiled_catalog({item_id: ItemRecord(item_id, name) for item_id, name in NAMES.items()}, catalog)
+    runner = CliRunner()
+
+    result = runner.invoke(cli_main, ["items", "search", "wind", "serum", "--mapping", str(catalog), "--json"])
+    assert result.exit_code == 0, result.output
+    assert [hit["item_id"] for hit in json.loads(result.output)] == [1015091, 1015092]
+
+    result = runner.invoke(cli_main, ["items", "search", "frostjde", "--mapping", str(catalog)])
+    assert "~ Frostjade Staff - Magic Wand" in result.output
@@ -0,0 +1,84 @@
+"""Tests for incremental trading-center snapshot diffs."""
+
+from bpsr_labs.packet_decoder.decoder.listing_diff import ListingChange, SnapshotDiffer
+
+from ._listings import make_listing
+
+
+def test_first_snapshot_is_all_added():
+    """Test that every level of the first snapshot is reported as added."""
+    differ = SnapshotDiffer()
+    changes = differ.apply([
+        make_listing(200, 1, server_sequence=1),
+        make_listing(100, 2, server_sequence=1),
+        make_listing(100, 3, server_sequence=1),
+    ])
+    assert [(c.kind, c.price, c.quantity) for c in changes] == [("added", 100, 5), ("added", 200, 1)]
+
+
+def test_only_changes_are_emitted():
+    """Test added, removed and changed levels between two snapshots."""
+    differ = SnapshotDiffer()
+    differ.apply([
+        make_listing(100, 2, server_sequence=1),
+        make_listing(200, 1, server_sequence=1),
+        make_listing(300, 4, server_sequence=1),
+    ])
+
+    changes = differ.apply([
+        make_listing(100, 2, server_sequence=2),
+        make_listing(200, 3, server_sequence=2),
+        make_listing(250, 1, server_sequence=2),
+    ])
+
+    assert changes == [
+        ListingChange("changed", 1001, 0, 200, 3, 1, 2),
+        ListingChange("added", 1001, 0, 250, 1, 0, 2),
+        ListingChange("removed", 1001, 0, 300, 0, 4, 2),
+    ]
+    assert differ.snapshot(1001) == {100: 2, 200: 3, 250: 1}
+
+
+def test_unchanged_snapshot_emits_nothing():
+    """Test that a refreshed but identical page produces no changes."""
+    differ = SnapshotDiffer()
+    differ.apply([make_listing(100, 2, server_sequence=1)])
+    assert differ.apply([make_listing(100, 2, server_sequence=2)]) == []
+
+
+def test_stale_sequence_is_ignored():
+    """Test that an older reply cannot roll the snapshot back."""
+    differ = SnapshotDiffer()
+    differ.apply([make_listing(100, 2, server_sequence=5)])
+    assert differ.apply([make_listing(999, 1, server_sequence=4)]) == []
+    assert differ.apply([make_listing(999, 1, server_sequence=5)]) == []
+    assert differ.snapshot(1001) == {100: 2}
+
+
+def test_pages_and_items_are_independent():
+    """Test that snapshots are keyed by item and page."""
+    differ = SnapshotDiffer()
+    differ.apply([make_listing(100, 1, server_sequence=1)], page=0)
+    changes = differ.apply([
+        make_listing(500, 1, server_sequence=2),
+        make_listing(7, 1, server_sequence=2, item_id=2002),
+    ], page=1)
+    assert [(c.item_id, c.page, c.kind) for c in changes] == [(1001, 1, "added"), (2002, 1, "added")]
+    assert differ.snapshot(1001, page=0) == {100: 1}
+
+
+def test_diff_stream_groups_by_reply():
+    """Test that consecutive listings of one reply form one snapshot."""
+    stream = [
+        make_listing(100, 1, server_sequence=1),
+        make_listing(200, 1, server_sequence=1),
+        make_listing(100, 1, server_sequence=2),
+        make_listing(200, 2, server_sequence=2),
+    ]
+    changes = list(SnapshotDiffer().diff_stream(stream))
+    assert [(c.kind, c.price, c.server_sequence) for c in changes] == [
+        ("added", 100, 1),
+        ("added", 200, 1),
+        ("changed", 200, 2),
+    ]
+    assert changes[-1].to_dict()["previous_quantity"] == 1
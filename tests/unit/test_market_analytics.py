@@ -0,0 +1,90 @@
+"""Tests for vectorized trading-center market analytics."""
+
+import numpy as np
+import pytest
+
+from bpsr_labs.packet_decoder.decoder.market_analytics import (
+    item_summary,
+    listing_columns,
+    listings_frame,
+)
+
+from ._listings import make_listing
+
+
+def test_columns_drop_listings_without_item():
+    """Test conversion of listings and trade-decode dicts into int64 columns."""
+    decoded = {"price_luno": 300, "quantity": 1, "item_id": 2002, "metadata": {"server_sequence": 4}}
+    columns = listing_columns([make_listing(100, 2), make_listing(50, 1, item_id=None), decoded])
+
+    assert len(columns) == 2
+    assert columns.item_id.dtype == np.int64
+    assert listings_frame(columns).to_dict("list") == {
+        "item_id": [1001, 2002],
+        "price_luno": [100, 300],
+        "quantity": [2, 1],
+        "server_sequence": [1, 4],
+    }
+
+
+def test_summary_matches_reference_statistics():
+    """Test min/max/median/percentiles/VWAP/depth against NumPy per item."""
+    rng = np.random.default_rng(7)
+    listings = [
+        make_listing(int(price), int(quantity), item_id=int(item))
+        for item, price, quantity in zip(
+            rng.integers(1, 20, 500), rng.integers(100, 5000, 500), rng.integers(1, 30, 500)
+        )
+    ]
+
+    summary = item_summary(listings, percentiles=(10, 90))
+
+    for item_id, row in summary.iterrows():
+        prices = np.array([listing.price_luno for listing in listings if listing.item_config_id == item_id])
+        quantities = np.array([listing.quantity for listing in listings if listing.item_config_id == item_id])
+        assert row["listings"] == len(prices)
+        assert row["depth"] == quantities.sum()
+        assert row["min_price"] == prices.min()
+        assert row["max_price"] == prices.max()
+        assert row["median_price"] == pytest.approx(np.median(prices))
+        assert row["p10"] == pytest.approx(np.percentile(prices, 10))
+        assert row["p90"] == pytest.approx(np.percentile(prices, 90))
+        assert row["vwap"] == pytest.approx((prices * quantities).sum() / quantities.sum())
+    assert list(summary.index) == sorted(summary.index)
+
+
+def test_weighted_percentiles_rank_units():
+    """Test that weighted percentiles follow listed quantity."""
+    listings = [make_listing(100, 1), make_listing(200, 8), make_listing(900, 1)]
+
+    weighted = item_summary(listings, percentiles=(5, 95), weighted=True)
+    unweighted = item_summary(listings, percentiles=(5, 95))
+
+    assert weighted.loc[1001, ["p5", "median_price", "p95"]].tolist() == [100, 200, 900]
+    assert unweighted.loc[1001, "median_price"] == 200
+
+
+def test_latest_only_uses_newest_snapshot_per_item():
+    """Test that older replies for an item are ignored with latest_only."""
+    listings = [
+        make_listing(100, 5, server_sequence=1),
+        make_listing(150, 2, server_sequence=3),
+        make_listing(170, 1, server_sequence=3),
+        make_listing(80, 4, item_id=2002, server_sequence=2),
+    ]
+
+    summary = item_summary(listings, latest_only=True)
+
+    assert summary.loc[1001, "min_price"] == 150
+    assert summary.loc[1001, "depth"] == 3
+    assert summary.loc[2002, "listings"] == 1
+
+
+def test_empty_and_invalid_input():
+    """Test the empty summary shape and percentile validation."""
+    summary = item_summary([], percentiles=(50,))
+    assert summary.empty
+    assert "p50" in summary.columns
+
+    with pytest.raises(ValueError):
+        item_summary([make_listing(1, 1)], percentiles=(101,))
@@ -0,0 +1,140 @@
+"""Tests for the SQLite market history store."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+from click.testing import CliRunner
+
+from bpsr_labs.cli import main as cli_main
+from bpsr_labs.packet_decoder.decoder.market_store import MarketStore, parse_timestamp_ms
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import Listing
+
+from ._listings import listing_row
+
+HOUR_MS = 3_600_000
+
+
+@pytest.fixture
+def store():
+    with MarketStore(":memory:") as store:
+        yield store
+
+
+class TestIngest:
+    """Test batched ingestion and deduplication."""
+
+    def test_reingest_is_noop(self, store):
+        """Test that the same capture cannot be stored twice."""
+        listings = [listing_row(100, 1), listing_row(120, 2), listing_row(100, 1, server_sequence=2)]
+        first = store.ingest(listings, capture_id="a", observed_at=0, batch_size=2)
+        second = store.ingest(listings, capture_id="a", observed_at=0)
+
+        assert (first.received, first.inserted, first.duplicates) == (3, 3, 0)
+        assert (second.inserted, second.duplicates) == (0, 3)
+
+    def test_other_capture_is_stored(self, store):
+        """Test that identical listings from another capture are kept."""
+        store.ingest([listing_row(100, 1)], capture_id="a", observed_at=0)
+        result = store.ingest([listing_row(100, 1)], capture_id="b", observed_at=HOUR_MS)
+        assert result.inserted == 1
+
+    def test_listings_without_item_are_skipped(self, store):
+        """Test that listings without an item id are counted but not stored."""
+        result = store.ingest([listing_row(100, 1, item_id=None)], capture_id="a", observed_at=0)
+        assert (result.inserted, result.skipped) == (0, 1)
+        assert store.item_ids() == []
+
+    def test_accepts_listing_objects(self, store):
+        """Test ingestion of decoder Listing objects."""
+        listing = Listing(
+            frame_offset=0, server_sequence=9, price_luno=50, quantity=4, item_config_id=7
+        )
+        assert store.ingest([listing], capture_id="a", observed_at=0).inserted == 1
+        assert store.item_ids() == [7]
+
+
+class TestPriceWindows:
+    """Test windowed min/median/VWAP queries."""
+
+    def test_statistics_per_window(self, store):
+        """Test min, median and VWAP over two hourly buckets."""
+        store.ingest(
+            [listing_row(100, 1), listing_row(300, 3), listing_row(200, 1)], capture_id="a", observed_at=10
+        )
+        store.ingest([listing_row(400, 1), listing_row(500, 1)], capture_id="b", observed_at=HOUR_MS + 5)
+        store.ingest([listing_row(1, 1, item_id=2002)], capture_id="b", observed_at=HOUR_MS + 5)
+
+        first, second = store.price_windows(1001, HOUR_MS)
+
+        assert (first.start_ms, first.listings, first.volume, first.min_price) == (0, 3, 5, 100)
+        assert first.median_price == 200
+        assert first.vwap == pytest.approx((100 + 900 + 200) / 5)
+        assert (second.start_ms, second.median_price, second.vwap) == (HOUR_MS, 450, 450)
+
+    def test_time_bounds(self, store):
+        """Test that since is inclusive and until is exclusive."""
+        store.ingest([listing_row(100, 1)], capture_id="a", observed_at=0)
+        store.ingest([listing_row(200, 1)], capture_id="b", observed_at=HOUR_MS)
+
+        assert [w.start_ms for w in store.price_windows(1001, HOUR_MS, since=HOUR_MS)] == [HOUR_MS]
+        assert [w.start_ms for w in store.price_windows(1001, HOUR_MS, until=HOUR_MS)] == [0]
+
+    def test_invalid_window(self, store):
+        """Test that a non-positive window is rejected."""
+        with pytest.raises(ValueError):
+            store.price_windows(1001, 0)
+
+
+def test_parse_timestamp_ms():
+    """Test epoch and ISO-8601 timestamp parsing."""
+    assert parse_timestamp_ms("1700000000000") == 1_700_000_000_000
+    assert parse_timestamp_ms("1970-01-01T00:00:01Z") == 1000
+    assert parse_timestamp_ms(datetime(1970, 1, 1, 0, 0, 2)) == 2000
+    assert parse_timestamp_ms(datetime(1970, 1, 1, 1, tzinfo=timezone.utc)) == HOUR_MS
+    with pytest.raises(ValueError):
+        parse_timestamp_ms("yesterday")
+
+
+def test_ingest_and_query_commands(tmp_path):
+    """Test the trade-ingest and trade-query commands end to end."""
+    decoded = tmp_path / "sweep.json"
+    decoded.write_text(json.dumps([listing_row(100, 2), listing_row(300, 1)]))
+    db = tmp_path / "market.sqlite3"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli_main, ["trade-ingest", str(decoded), "--db", str(db), "--observed-at", "1970-01-01T00:00:00Z"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "2 new" in result.output
+
+    result = runner.invoke(cli_main, ["trade-query", "1001", "--db", str(db), "--json"])
+    assert result.exit_code == 0, result.output
+    (window,) = json.loads(result.output)
+    assert window["min_price"] == 100
+    assert window["median_price"] == 200
+
+
+def test_ingest_command_reads_ndjson(tmp_path):
+    """Test that trade-ingest accepts trade-decode --format ndjson output."""
+    decoded = tmp_path / "sweep.ndjson"
+    rows = [listing_row(100, 2), listing_row(300, 1), listing_row(300, 1)]
+    decoded.write_text("\n".join(json.dumps(row) for row in rows) + "\n")
+    db = tmp_path / "market.sqlite3"
+
+    result = CliRunner().invoke(cli_main, ["trade-ingest", str(decoded), "--db", str(db), "--observed-at", "0"])
+
+    assert result.exit_code == 0, result.output
+    assert "2 new, 1 already stored" in result.output
+
+
+def test_ingest_command_rejects_other_json(tmp_path):
+    """Test that a JSON file that is neither a list nor NDJSON is reported."""
+    decoded = tmp_path / "sweep.json"
+    decoded.write_text('"not listings"')
+
+    result = CliRunner().invoke(cli_main, ["trade-ingest", str(decoded), "--db", str(tmp_path / "m.sqlite3")])
+
+    assert "Failed to ingest" in result.output
+    assert "new" not in result.output
@@ -0,0 +1,100 @@
+"""Unit tests for combat method discovery."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bpsr_labs.packet_decoder.decoder import method_discovery
+from bpsr_labs.packet_decoder.decoder.combat_decode_v2 import CombatDecoderV2
+from bpsr_labs.packet_decoder.decoder.descriptor_registry import get_descriptor_registry
+from bpsr_labs.packet_decoder.decoder.method_discovery import MethodDiscovery, score_payload
+
+
+@pytest.fixture
+def capture_path(data_dir: Path) -> Path:
+    return data_dir / "tc_1.bin"
+
+
+@pytest.fixture
+def discovery(tmp_path: Path, descriptor_path: Path) -> MethodDiscovery:
+    return MethodDiscovery(
+        mapping_path=tmp_path / "combat_method_map.json",
+        descriptor_path=descriptor_path,
+        cache_path=tmp_path / "cache.json",
+        generated_dir=tmp_path / "no_generated_modules",
+    )
+
+
+def test_score_payload_prefers_matching_type(descriptor_path: Path):
+    """Test scoring a payload against a matching and a mismatching type."""
+    registry = get_descriptor_registry(descriptor_path)
+    server_time = registry.message_class("blueprotobuf_package.SyncServerTime")
+    container = registry.message_class("blueprotobuf_package.SyncContainerData")
+    payload = server_time(client_milliseconds=1, server_milliseconds=1_700_000_000_000).SerializeToString()
+
+    score, distinct = score_payload(server_time, payload)
+    assert score == 1.0
+    assert distinct == 2
+    # Field 1 is a varint in the payload but bytes in SyncContainerData
+    assert score_payload(container, payload)[0] < 1.0
+    assert score_payload(server_time, b"") == (0.0, 0)
+
+
+def test_discover_maps_known_methods(discovery: MethodDiscovery, capture_path: Path):
+    """Test discovery on a capture recovers the V1 message table."""
+    results = {result.method_id: result for result in discovery.discover([capture_path])}
+
+    assert results[0x2D].best.full_name == "blueprotobuf_package.SyncNearDeltaInfo"
+    assert results[0x2B].best.full_name == "blueprotobuf_package.SyncServerTime"
+
+    added = discovery.write_mapping(results.values())
+    mapping = json.loads(discovery.mapping_path.read_text(encoding="utf-8"))
+    assert added == len(mapping["methods"])
+    assert mapping["methods"]["0x0000002d"]["descriptor"] == "blueprotobuf_package.SyncNearDeltaInfo"
+
+
+def test_discover_reuses_cached_trials(discovery: MethodDiscovery, capture_path: Path, monkeypatch):
+    """Test that a second run over the same capture performs no new trials."""
+    first = discovery.discover([capture_path])
+
+    calls = []
+    monkeypatch.setattr(method_discovery, "score_payload", lambda *args: calls.append(args) or (0.0, 0))
+    second = discovery.discover([capture_path])
+
+    assert calls == []
+    assert [(r.method_id, r.best) for r in first] == [(r.method_id, r.best) for r in second]
+
+
+def test_discovered_mapping_drives_v2_decoder(discovery: MethodDiscovery, capture_path: Path, descriptor_path: Path):
+    """Test that descriptor-only mapping entries are decoded by CombatDecoderV2."""
+    discovery.write_mapping(discovery.discover([capture_path]))
+    decoder = CombatDecoderV2(mapping_path=discovery.mapping_path, descriptor_path=descriptor_path)
+    server_time = get_descriptor_registry(descriptor_path).message_class("blueprotobuf_package.SyncServerTime")
+
+    from bpsr_labs.packet_decoder.decoder.combat_decode import SERVICE_UID
+    from bpsr_labs.packet_decoder.decoder.framing import NotifyFrame
+
+    payload = server_time(server_milliseconds=5).SerializeToString()
+    record = decoder.decode(NotifyFrame(SERVICE_UID, 1, 0x2B, payload, False, 0))
+
+    assert record.message_type == "blueprotobuf_package.SyncServerTime"
+    assert decoder.method_stats()["0x0000002b"]["v2_hits"] == 1
+
+
+def test_main_cli_passes_mapping_and_cache_paths(tmp_path: Path, capture_path: Path):
+    """Test that bpsr-labs discover-methods honours --mapping and --cache."""
+    from click.testing import CliRunner
+
+    from bpsr_labs.cli import main as cli_main
+
+    mapping = tmp_path / "methods.json"
+    cache = tmp_path / "trials.json"
+    result = CliRunner().invoke(
+        cli_main,
+        ["discover-methods", str(capture_path), "--mapping", str(mapping), "--cache", str(cache), "--accept-ambiguous"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(mapping.read_text(encoding="utf-8"))
+    assert cache.is_file()
@@ -0,0 +1,134 @@
+"""Tests for the per-item trading-center order book."""
+
+import random
+
+import pytest
+
+from bpsr_labs.packet_decoder.decoder.order_book import OrderBook, PriceLevel
+
+from ._listings import make_listing
+
+
+def _brute_fill(levels: dict, quantity: int) -> tuple[int, int]:
+    filled = cost = 0
+    for price in sorted(levels):
+        take = min(levels[price], quantity - filled)
+        filled += take
+        cost += take * price
+    return filled, cost
+
+
+class TestQueries:
+    """Test best-price, fill-cost and cheapest-level queries."""
+
+    def test_best_price_and_cheapest(self):
+        """Test that levels aggregate quantity and sort by price."""
+        book = OrderBook.from_listings(
+            [
+                make_listing(300, 1),
+                make_listing(100, 2),
+                make_listing(200, 5),
+                make_listing(100, 3),
+                make_listing(5, 1, item_id=None),
+            ]
+        )
+        assert book.best_price(1001) == 100
+        assert book.cheapest(1001, 2) == [PriceLevel(100, 5), PriceLevel(200, 5)]
+        assert book.depth(1001) == 11
+        assert book.items() == [1001]
+        assert book.best_price(9999) is None
+
+    def test_fill_cost(self):
+        """Test partial, exact and over-sized fills."""
+        book = OrderBook.from_listings([make_listing(100, 2), make_listing(200, 3)])
+
+        quote = book.fill_cost(1001, 4)
+        assert (quote.filled, quote.cost, quote.worst_price, quote.complete) == (4, 600, 200, True)
+        assert quote.average_price == 150
+
+        quote = book.fill_cost(1001, 10)
+        assert (quote.filled, quote.cost, quote.complete) == (5, 800, False)
+        assert book.fill_cost(9999, 1).filled == 0
+
+    def test_matches_brute_force_under_updates(self):
+        """Test incremental adds and removes against a naive recomputation."""
+        rng = random.Random(7)
+        book = OrderBook()
+        levels: dict = {}
+        live: list = []
+        for _ in range(500):
+            if live and rng.random() < 0.4:
+                listing = live.pop(rng.randrange(len(live)))
+                book.remove(listing)
+                levels[listing.price_luno] -= listing.quantity
+            else:
+                listing = make_listing(rng.randrange(1, 60), rng.randrange(1, 10))
+                book.add(listing)
+                live.append(listing)
+                levels[listing.price_luno] = levels.get(listing.price_luno, 0) + listing.quantity
+            nonempty = {price: qty for price, qty in levels.items() if qty}
+            assert book.best_price(1001) == (min(nonempty) if nonempty else None)
+            want = rng.randrange(1, 80)
+            quote = book.fill_cost(1001, want)
+            assert (quote.filled, quote.cost) == _brute_fill(nonempty, want)
+
+    def test_remove_more_than_listed(self):
+        """Test that removing absent quantity is rejected."""
+        book = OrderBook.from_listings([make_listing(100, 2)])
+        with pytest.raises(ValueError):
+            book.remove(make_listing(100, 3))
+
+
+class TestSnapshots:
+    """Test replacing item books from streamed replies."""
+
+    def test_newer_snapshot_replaces_book(self):
+        """Test that the latest server sequence wins per item."""
+        book = OrderBook()
+        book.apply_snapshot([make_listing(100, 2, server_sequence=1), make_listing(200, 1, server_sequence=1)])
+        replaced = book.apply_snapshot(
+            [make_listing(150, 4, server_sequence=2), make_listing(200, 1, server_sequence=2)]
+        )
+        assert replaced == [1001]
+        assert book.cheapest(1001, 5) == [PriceLevel(150, 4), PriceLevel(200, 1)]
+
+    def test_stale_snapshot_is_ignored(self):
+        """Test that an older reply does not overwrite a newer book."""
+        book = OrderBook()
+        book.apply_snapshot([make_listing(150, 4, server_sequence=5)])
+        assert book.apply_snapshot([make_listing(100, 2, server_sequence=3)]) == []
+        assert book.best_price(1001) == 150
+
+    def test_only_latest_group_in_batch_is_used(self):
+        """Test that a batch spanning several replies keeps the newest one."""
+        book = OrderBook()
+        book.apply_snapshot(
+            [
+                make_listing(100, 2, server_sequence=1),
+                make_listing(300, 1, server_sequence=4),
+                make_listing(50, 1, server_sequence=2),
+            ]
+        )
+        assert book.cheapest(1001, 5) == [PriceLevel(300, 1)]
+
+    def test_pages_are_replaced_independently(self):
+        """Test that a second page adds to the book and a page update leaves other pages alone."""
+        book = OrderBook()
+        first_page = [make_listing(100, 2, server_sequence=1), make_listing(110, 1, server_sequence=1)]
+        second_page = [make_listing(120, 3, server_sequence=2), make_listing(130, 1, server_sequence=2)]
+        book.apply_snapshot(first_page, page=0)
+        book.apply_snapshot(second_page, page=1)
+        assert book.cheapest(1001, 5) == [
+            PriceLevel(100, 2), PriceLevel(110, 1), PriceLevel(120, 3), PriceLevel(130, 1)
+        ]
+
+        book.apply_snapshot([make_listing(100, 1, server_sequence=3)], page=0)
+        assert book.cheapest(1001, 5) == [PriceLevel(100, 1), PriceLevel(120, 3), PriceLevel(130, 1)]
+        assert book.depth(1001) == 5
+
+    def test_stale_check_is_per_page(self):
+        """Test that a newer page does not make an older reply for another page stale."""
+        book = OrderBook()
+        book.apply_snapshot([make_listing(200, 1, server_sequence=9)], page=1)
+        assert book.apply_snapshot([make_listing(100, 2, server_sequence=3)], page=0) == [1001]
+        assert book.cheapest(1001, 5) == [PriceLevel(100, 2), PriceLevel(200, 1)]
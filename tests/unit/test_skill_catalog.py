@@ -0,0 +1,98 @@
+"""Tests for the skill name catalog."""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from bpsr_labs.cli import main as cli_main
+from bpsr_labs.packet_decoder.decoder.item_catalog import CompiledItemCatalog, ItemRecord, write_compiled_catalog
+from bpsr_labs.packet_decoder.decoder.skill_catalog import (
+    CompiledSkillCatalog,
+    SkillRecord,
+    build_mapping_from_sources,
+    load_skill_mapping,
+    resolve_skill_names,
+    write_compiled_skill_catalog,
+)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    table = tmp_path / "SkillTable.json"
+    table.write_text(json.dumps({
+        "1701": {"Id": 1701, "Name": "Frost Lance", "Icon": "lance.png", "CD": 4},
+        "1702": {"Id": 1702, "Name": "Ice Arrow"},
+    }))
+    overrides = tmp_path / "skill_name_map.json"
+    overrides.write_text(json.dumps({"1702": "Ice Arrow (Charged)", "note": "ignored"}))
+    return table, overrides
+
+
+def test_later_sources_win(sources):
+    """Test the multi-source merge and both file formats."""
+    mapping = build_mapping_from_sources(sources)
+    assert mapping == {
+        1701: SkillRecord(1701, "Frost Lance", "lance.png"),
+        1702: SkillRecord(1702, "Ice Arrow (Charged)"),
+    }
+
+
+def test_compiled_round_trip(tmp_path, sources):
+    """Test the compiled skill catalog and that it is not mistaken for an item catalog."""
+    path = tmp_path / "skills.bin"
+    mapping = build_mapping_from_sources(sources)
+    write_compiled_skill_catalog(mapping, path)
+
+    with CompiledSkillCatalog.open(path) as catalog:
+        assert dict(catalog.items()) == mapping
+    with pytest.raises(ValueError):
+        CompiledItemCatalog.open(path)
+
+    write_compiled_catalog({1: ItemRecord(1, "Blade")}, tmp_path / "items.bin")
+    with pytest.raises(ValueError):
+        CompiledSkillCatalog.open(tmp_path / "items.bin")
+
+
+def test_fresh_compiled_sibling_is_preferred(tmp_path):
+    """Test that load_skill_mapping memory-maps a fresh compiled sibling."""
+    source = tmp_path / "skill_name_map.json"
+    source.write_text(json.dumps({"1701": "From JSON"}))
+    write_compiled_skill_catalog({1701: SkillRecord(1701, "Compiled")}, source.with_suffix(".bin"))
+    stamp = source.stat().st_mtime_ns
+    os.utime(source.with_suffix(".bin"), ns=(stamp, stamp))
+    load_skill_mapping.cache_clear()
+    try:
+        mapping = load_skill_mapping([source])
+        assert isinstance(mapping, CompiledSkillCatalog)
+        assert mapping[1701].name == "Compiled"
+    finally:
+        load_skill_mapping.cache_clear()
+
+
+def test_resolve_skill_names_looks_up_each_id_once():
+    """Test batch resolution of duplicate and string ids."""
+    lookups = []
+
+    class Recording(dict):
+        def get(self, key, default=None):
+            lookups.append(key)
+            return super().get(key, default)
+
+    mapping = Recording({1701: SkillRecord(1701, "Frost Lance")})
+    assert resolve_skill_names(["1701", 1701, "99"], mapping) == {1701: "Frost Lance"}
+    assert sorted(lookups) == [99, 1701]
+
+
+def test_update_skills_command(tmp_path, sources):
+    """Test that update-skills writes the JSON mapping and its compiled sibling."""
+    output = tmp_path / "out" / "skill_name_map.json"
+
+    result = CliRunner().invoke(cli_main, ["update-skills", "-s", str(sources[0].parent), "-o", str(output), "--quiet"])
+
+    assert result.exit_code == 0, result.output
+    # Directory scans list skill_name_map.json before SkillTable.json, so the table wins
+    assert json.loads(output.read_text())["1702"] == {"name": "Ice Arrow"}
+    with CompiledSkillCatalog.open(output.with_suffix(".bin")) as catalog:
+        assert catalog[1701] == SkillRecord(1701, "Frost Lance", "lance.png")
@@ -0,0 +1,109 @@
+"""Tests for parallel multi-capture trade decoding."""
+
+import json
+
+from click.testing import CliRunner
+
+from bpsr_labs.packet_decoder.cli.bpsr_trade_batch import main as trade_batch_main
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord
+from bpsr_labs.packet_decoder.decoder.trade_batch import decode_captures
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import ListingTypedefCache
+
+from ._frames import listing_frame
+
+
+def _captures(tmp_path):
+    first = tmp_path / "a.bin"
+    first.write_bytes(listing_frame([(400, 2, 1001), (900, 1, 1001), (400, 2, 1001)]))
+    second = tmp_path / "b.bin"
+    second.write_bytes(listing_frame([(900, 1, 1001), (80, 5, 2002)], server_seq=9))
+    return first, second
+
+
+def test_merge_deduplicates_across_captures(tmp_path):
+    """Test per-capture counts and cross-capture deduplication in input order."""
+    first, second = _captures(tmp_path)
+
+    batch = decode_captures([first, second], decoder_version="v1", include_raw=False, max_workers=1)
+
+    assert [(s.listings, s.unique, s.new) for s in batch.summaries] == [(3, 2, 2), (2, 2, 1)]
+    merged = list(batch.merged(include_raw=False))
+    assert [(m["item_id"], m["price_luno"], m["metadata"]["capture"]) for m in merged] == [
+        (1001, 400, "a.bin"),
+        (1001, 900, "a.bin"),
+        (2002, 80, "b.bin"),
+    ]
+
+
+def test_process_pool_matches_inline(tmp_path):
+    """Test that pooled decoding produces the same merge and returns the typedef."""
+    first, second = _captures(tmp_path)
+    third = tmp_path / "c.bin"
+    third.write_bytes(listing_frame([(10, 1, 3003)]))
+    cache = ListingTypedefCache(tmp_path / "typedef.json")
+
+    pooled = decode_captures([first, second, third], decoder_version="v1", typedef_cache=cache, max_workers=2)
+    inline = decode_captures([first, second, third], decoder_version="v1", max_workers=1)
+
+    assert list(pooled.merged()) == list(inline.merged())
+    assert (tmp_path / "typedef.json").exists()
+
+
+def test_failed_capture_is_reported(tmp_path):
+    """Test that an unreadable capture is summarised instead of aborting the batch."""
+    first, _ = _captures(tmp_path)
+    missing = tmp_path / "missing.bin"
+
+    batch = decode_captures([first, missing], decoder_version="v1", max_workers=1)
+
+    assert batch.summaries[0].error is None
+    assert batch.summaries[1].error is not None
+    assert batch.summaries[1].unique == 0
+
+
+def test_trade_batch_command(tmp_path):
+    """Test directory expansion, NDJSON output and the summary file."""
+    captures = tmp_path / "captures"
+    captures.mkdir()
+    _captures(captures)
+    (captures / "notes.txt").write_text("ignored")
+    output = tmp_path / "merged.ndjson"
+
+    result = CliRunner().invoke(
+        trade_batch_main,
+        [str(captures), str(output), "--decoder", "v1", "--format", "ndjson",
+         "--no-item-names", "--no-typedef-cache", "--workers", "1", "--quiet"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert len(output.read_text().splitlines()) == 3
+    summary = json.loads((tmp_path / "merged.summary.json").read_text())
+    assert [(s["capture"].rsplit("/", 1)[-1], s["new"]) for s in summary] == [("a.bin", 2), ("b.bin", 1)]
+
+
+def test_shared_catalog_names_listings_in_workers(tmp_path):
+    """Test that pooled workers resolve names from the shared catalog like the inline path."""
+    first, second = _captures(tmp_path)
+    third = tmp_path / "c.bin"
+    third.write_bytes(listing_frame([(10, 1, 3003)]))
+    mapping = {1001: ItemRecord(1001, "Wind Serum Lv.1", "serum.png"), 2002: ItemRecord(2002, "Luno Amber")}
+
+    pooled = decode_captures([first, second, third], decoder_version="v1", max_workers=2, item_mapping=mapping)
+    inline = decode_captures([first, second, third], decoder_version="v1", max_workers=1, item_mapping=mapping)
+
+    merged = list(pooled.merged())
+    assert merged == list(inline.merged())
+    assert [m.get("item_name") for m in merged] == ["Wind Serum Lv.1", "Wind Serum Lv.1", "Luno Amber", None]
+    assert merged[0]["metadata"]["item_icon"] == "serum.png"
+
+
+def test_item_filter_reaches_workers(tmp_path):
+    """Test that pooled workers only decode the wanted items."""
+    first, second = _captures(tmp_path)
+    third = tmp_path / "c.bin"
+    third.write_bytes(listing_frame([(10, 1, 3003), (20, 1, 2002)]))
+
+    batch = decode_captures([first, second, third], decoder_version="v1", max_workers=2, item_filter=[2002])
+
+    assert [s.listings for s in batch.summaries] == [0, 1, 1]
+    assert [(m["item_id"], m["price_luno"]) for m in batch.merged()] == [(2002, 80), (2002, 20)]
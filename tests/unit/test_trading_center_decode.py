@@ -1,21 +1,35 @@
 """Tests for trading center packet decoding."""
 
+import io
 import json
+import logging
 import struct
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from click.testing import CliRunner
+
+from bpsr_labs.packet_decoder.cli.bpsr_decode_trade import main as trade_decode_main
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord
 
 from bpsr_labs.packet_decoder.decoder.trading_center_decode import (
     Listing,
+    ListingTypedefCache,
+    TypedefDrift,
+    TypedefMismatch,
     consolidate,
+    decode_with_typedef,
     extract_listing_blocks,
+    iter_consolidated,
     iter_frames,
+    iter_frames_from_stream,
+    iter_length_delimited,
     maybe_decompress,
     read_varint,
 )
 
+from ._frames import len_field, listing_frame, varint
+
 
 class TestVarintDecoding:
     """Test protobuf varint decoding."""
@@ -48,6 +62,35 @@ class TestVarintDecoding:
             read_varint(data, 0)
 
 
+class TestLengthDelimitedScan:
+    """Test the candidate scanner for length-delimited fields."""
+
+    def test_yields_zero_copy_payloads(self):
+        """Test that payloads are memoryviews into the original buffer."""
+        data = b"\x01\x02" + len_field(1, b"abc") + len_field(1, b"")
+        spans = list(iter_length_delimited(data))
+        assert [(start, payload_start, bytes(payload)) for start, payload_start, payload in spans] == [
+            (2, 4, b"abc"),
+            (7, 9, b""),
+        ]
+        assert isinstance(spans[0][2], memoryview)
+        assert spans[0][2].obj is data
+
+    def test_skips_candidates_that_do_not_fit(self):
+        """Test that an oversized length does not end the scan."""
+        data = b"\x0a\x7f" + len_field(1, b"xy")
+        assert [bytes(payload) for _, _, payload in iter_length_delimited(data)] == [b"xy"]
+
+    def test_truncated_varint(self):
+        """Test that a length varint running off the buffer is ignored."""
+        assert list(iter_length_delimited(b"\x0a\x80\x80")) == []
+
+    def test_fields_do_not_overlap(self):
+        """Test that the scan resumes after an accepted field."""
+        data = len_field(1, b"\x0a\x00")
+        assert [bytes(payload) for _, _, payload in iter_length_delimited(data)] == [b"\x0a\x00"]
+
+
 class TestZstdDecompression:
     """Test Zstd decompression handling."""
 
@@ -110,6 +153,26 @@ class TestFrameIteration:
         _, _, _, is_zstd, _ = frames[0]
         assert is_zstd is True
 
+    @pytest.mark.parametrize("chunk_size", [1, 5, 64])
+    def test_stream_matches_in_memory(self, chunk_size):
+        """Test that the streaming reader yields the same frames across chunk boundaries."""
+        data = (
+            b"\x00\x01"
+            + listing_frame([(100, 2, 1001)])
+            + struct.pack(">I", 8) + struct.pack(">H", 0x8006) + b"ab"
+            + b"\xff\xff\xff\xff\x00\x06"
+            + listing_frame([(200, 1, 1002)], server_seq=9)
+        )
+        streamed = list(iter_frames_from_stream(io.BytesIO(data), chunk_size=chunk_size))
+        assert streamed == list(iter_frames(data))
+        assert len(streamed) == 3
+
+    def test_stream_skips_oversized_lengths(self):
+        """Test that lengths above the stream limit are not buffered."""
+        data = struct.pack(">I", 1 << 20) + listing_frame([(100, 2, 1001)])
+        frames = list(iter_frames_from_stream(io.BytesIO(data), max_frame_size=1024))
+        assert [frame[0] for frame in frames] == [4]
+
 
 class TestListingExtraction:
     """Test trading center listing extraction."""
@@ -200,6 +263,18 @@ class TestListingConsolidation:
         result = consolidate([listing1, listing2])
         assert len(result) == 2  # Should not be deduplicated
 
+    def test_iter_consolidated_yields_first_sighting(self):
+        """Test that unique listings are emitted before the input is exhausted."""
+        def listings():
+            yield Listing(0, 1, 100, 5, 123)
+            yield Listing(10, 2, 100, 5, 123)
+            yield Listing(20, 3, 200, 5, 123)
+            raise AssertionError("consumed past the second unique listing")
+
+        stream = iter_consolidated(listings())
+        assert next(stream)["metadata"]["server_sequence"] == 1
+        assert next(stream)["metadata"]["server_sequence"] == 3
+
     def test_item_name_resolution(self):
         """Test item name resolution with resolver function."""
         def mock_resolver(item_id: int):
@@ -221,6 +296,47 @@ class TestListingConsolidation:
         assert result[0]["metadata"]["item_icon"] == "test.png"
 
 
+class TestLazyRawEntry:
+    """Test deferred raw_entry rendering."""
+
+    @staticmethod
+    def _lazy(price: int, calls: list) -> Listing:
+        def loader():
+            calls.append(price)
+            return {"price": price}
+
+        return Listing(
+            frame_offset=0,
+            server_sequence=1,
+            price_luno=price,
+            quantity=1,
+            item_config_id=123,
+            raw_loader=loader,
+        )
+
+    def test_only_surviving_listings_are_rendered(self):
+        """Test that duplicates dropped by consolidate never render raw entries."""
+        calls: list = []
+        result = consolidate([self._lazy(100, calls), self._lazy(100, calls), self._lazy(200, calls)])
+        assert [r["metadata"]["raw_entry"] for r in result] == [{"price": 100}, {"price": 200}]
+        assert calls == [100, 200]
+
+    def test_include_raw_false(self):
+        """Test that raw entries are skipped entirely when not requested."""
+        calls: list = []
+        result = consolidate([self._lazy(100, calls)], include_raw=False)
+        assert "raw_entry" not in result[0]["metadata"]
+        assert calls == []
+
+    def test_loader_runs_once(self):
+        """Test that the rendered entry is cached on the listing."""
+        calls: list = []
+        listing = self._lazy(100, calls)
+        assert listing.load_raw_entry() is listing.load_raw_entry()
+        assert calls == [100]
+        assert listing.raw_entry == {"price": 100}
+
+
 class TestListingToDict:
     """Test Listing.to_dict() method."""
 
@@ -292,3 +408,187 @@ class TestListingToDict:
         
         assert result["item_id"] is None
         assert "item_name" not in result
+
+
+class TestTypedefReuse:
+    """Test learned-typedef decoding and its persistence."""
+
+    TYPEDEF = {
+        "1": {"type": "int"},
+        "2": {"type": "sint"},
+        "3": {"type": "message", "seen_repeated": True, "message_typedef": {"1": {"type": "string"}}},
+    }
+
+    def test_decode_with_typedef(self):
+        """Test signed, zigzag and repeated message fields."""
+        data = b"\x08" + varint((1 << 64) - 5) + b"\x10\x03" + len_field(3, len_field(1, b"hi"))
+        decoded = decode_with_typedef(data, self.TYPEDEF)
+        assert decoded == {"1": -5, "2": -2, "3": [{"1": "hi"}]}
+
+    def test_wire_type_mismatch(self):
+        """Test that a wire type disagreeing with the typedef is rejected."""
+        with pytest.raises(TypedefMismatch):
+            decode_with_typedef(len_field(1, b"x"), self.TYPEDEF)
+
+    def test_unknown_field_in_entry_is_drift(self):
+        """Test that unknown fields are skipped in wrappers but rejected in entries."""
+        assert decode_with_typedef(b"\x08\x01\x38\x02", self.TYPEDEF) == {"1": 1}
+        with pytest.raises(TypedefDrift):
+            decode_with_typedef(b"\x08\x01", {}, depth=2)
+
+    def test_typedef_learned_and_persisted(self, tmp_path):
+        """Test that a second run decodes without guessing the schema."""
+        data = listing_frame([(100, 2, 1001), (250, 1, 1002)]) + listing_frame([(300, 4, 1003)])
+        cache_path = tmp_path / "typedef.json"
+
+        first = extract_listing_blocks(data, ListingTypedefCache(cache_path))
+        assert cache_path.exists()
+
+        with patch(
+            "bpsr_labs.packet_decoder.decoder.trading_center_decode.decode_message",
+            side_effect=AssertionError("schema guessing should not run"),
+        ):
+            second = extract_listing_blocks(data, ListingTypedefCache(cache_path))
+
+        expected = [(100, 2, 1001), (250, 1, 1002), (300, 4, 1003)]
+        assert [(listing.price_luno, listing.quantity, listing.item_config_id) for listing in first] == expected
+        assert [(listing.price_luno, listing.quantity, listing.item_config_id) for listing in second] == expected
+        assert [listing.raw_entry for listing in first] == [listing.raw_entry for listing in second]
+
+    def test_drift_falls_back_to_guessing(self, tmp_path):
+        """Test that a listing with a new field is guessed and re-learned."""
+        cache_path = tmp_path / "typedef.json"
+        extract_listing_blocks(listing_frame([(100, 2, 1001), (250, 1, 1002)]), ListingTypedefCache(cache_path))
+
+        cache = ListingTypedefCache(cache_path)
+        listings = extract_listing_blocks(
+            listing_frame([(100, 2, 1001), (250, 1, 1002)], extra_detail=b"\x58\x09"), cache
+        )
+
+        assert [listing.raw_entry["3"]["11"] for listing in listings] == [9, 9]
+        assert "11" in json.loads(cache_path.read_text())["typedef"]["1"]["message_typedef"]["2"][
+            "message_typedef"]["3"]["message_typedef"]
+
+    def test_wire_type_mismatch_falls_back_to_guessing(self, tmp_path):
+        """Test that a block disagreeing with the learned typedef still decodes and is re-learned."""
+        cache_path = tmp_path / "typedef.json"
+        extract_listing_blocks(
+            listing_frame([(100, 2, 1001), (250, 1, 1002)], extra_detail=b"\x58\x09"), ListingTypedefCache(cache_path)
+        )
+
+        cache = ListingTypedefCache(cache_path)
+        with pytest.raises(TypedefMismatch):
+            decode_with_typedef(
+                listing_frame([(1, 1, 1)], extra_detail=len_field(11, b"ab"))[10:], cache.typedef
+            )
+        listings = extract_listing_blocks(
+            listing_frame([(300, 4, 1003), (350, 5, 1004)], extra_detail=len_field(11, b"ab")), cache
+        )
+
+        assert [(listing.price_luno, listing.quantity, listing.item_config_id) for listing in listings] == [
+            (300, 4, 1003),
+            (350, 5, 1004),
+        ]
+        learned = json.loads(cache_path.read_text())["typedef"]["1"]["message_typedef"]["2"][
+            "message_typedef"]["3"]["message_typedef"]["11"]
+        assert learned["type"] != "int"
+
+    def test_unreadable_cache_is_ignored(self, tmp_path):
+        """Test that a corrupt cache file does not break decoding."""
+        cache_path = tmp_path / "typedef.json"
+        cache_path.write_text("{not json")
+        assert ListingTypedefCache(cache_path).typedef is None
+
+
+class TestNdjsonOutput:
+    """Test streaming NDJSON output of the trade-decode command."""
+
+    def test_unique_listings_one_per_line(self, tmp_path):
+        """Test that --format ndjson writes each unique listing once, in decode order."""
+        capture = tmp_path / "capture.bin"
+        capture.write_bytes(
+            listing_frame([(400, 2, 1001), (900, 1, 1001)], server_seq=7)
+            + listing_frame([(400, 2, 1001), (80, 5, 2002)], server_seq=8)
+        )
+        output = tmp_path / "listings.ndjson"
+
+        result = CliRunner().invoke(
+            trade_decode_main,
+            [
+                str(capture), str(output),
+                "--format", "ndjson",
+                "--decoder", "v1",
+                "--no-item-names",
+                "--no-typedef-cache",
+                "--no-raw-entries",
+                "--quiet",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [(row["item_id"], row["price_luno"], row["quantity"]) for row in lines] == [
+            (1001, 400, 2),
+            (1001, 900, 1),
+            (2002, 80, 5),
+        ]
+        assert all("raw_entry" not in row["metadata"] for row in lines)
+
+
+class TestItemFilter:
+    """Test pushing an item id filter down into the V1 decoder."""
+
+    def test_only_wanted_items_are_built(self, caplog):
+        """Test that other items are skipped but still count as a detected block."""
+        data = listing_frame([(100, 2, 1001), (250, 1, 1002), (300, 4, 1003)])
+
+        with caplog.at_level(logging.INFO):
+            listings = extract_listing_blocks(data, item_filter={1001, 1003})
+
+        assert [listing.item_config_id for listing in listings] == [1001, 1003]
+        assert "entries=3, kept=2" in caplog.text
+
+    def test_fully_filtered_block_still_teaches_typedef(self):
+        """Test that a block with no wanted items is still learned."""
+        cache = ListingTypedefCache()
+
+        data = listing_frame([(100, 2, 1001), (250, 1, 1002)])
+        assert extract_listing_blocks(data, cache, item_filter=set()) == []
+        assert cache.typedef is not None
+
+    def test_category_option(self, tmp_path):
+        """Test that --category selects items from the catalog before decoding."""
+        capture = tmp_path / "capture.bin"
+        capture.write_bytes(listing_frame([(400, 2, 1001), (900, 1, 2002)]))
+        output = tmp_path / "listings.json"
+        catalog = {
+            1001: ItemRecord(1001, "Serum", category=5),
+            2002: ItemRecord(2002, "Ore", category=7),
+        }
+
+        with patch(
+            "bpsr_labs.packet_decoder.cli.bpsr_decode_trade.load_item_mapping", return_value=catalog
+        ):
+            result = CliRunner().invoke(
+                trade_decode_main,
+                [str(capture), str(output), "--decoder", "v1", "--no-typedef-cache", "--category", "7"],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert [(row["item_id"], row["item_name"]) for row in json.loads(output.read_text())] == [(2002, "Ore")]
+
+    def test_category_option_needs_category_column(self, tmp_path):
+        """Test that a catalog built without categories is reported."""
+        capture = tmp_path / "capture.bin"
+        capture.write_bytes(listing_frame([(400, 2, 1001)]))
+
+        with patch(
+            "bpsr_labs.packet_decoder.cli.bpsr_decode_trade.load_item_mapping",
+            return_value={1001: ItemRecord(1001, "Serum")},
+        ):
+            result = CliRunner().invoke(
+                trade_decode_main, [str(capture), str(tmp_path / "out.json"), "--category", "7"]
+            )
+
+        assert "no category column" in result.output
+        assert not (tmp_path / "out.json").exists()
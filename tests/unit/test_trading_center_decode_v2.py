@@ -0,0 +1,99 @@
+"""Tests for the protobuf-backed trading center decoder."""
+
+import logging
+import sys
+
+import pytest
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from bpsr_labs.packet_decoder.decoder.generated_registry import GeneratedModuleRegistry
+from bpsr_labs.packet_decoder.decoder.trading_center_decode import ListingTypedefCache
+from bpsr_labs.packet_decoder.decoder.trading_center_decode_v2 import TradingDecoderV2
+
+from ._frames import frame_down, len_field, listing_entry
+
+_OPTIONAL = descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL
+_REPEATED = descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED
+_INT64 = descriptor_pb2.FieldDescriptorProto.TYPE_INT64
+_MESSAGE = descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE
+
+
+def _ret_class():
+    """Build a stand-in for ``World.ExchangeNoticeDetail_Ret``."""
+    file_proto = descriptor_pb2.FileDescriptorProto(name="fake_exchange.proto", package="fake", syntax="proto2")
+    item = file_proto.message_type.add(name="Item")
+    item.field.add(name="config_id", number=2, type=_INT64, label=_OPTIONAL)
+    entry = file_proto.message_type.add(name="Entry")
+    entry.field.add(name="price", number=1, type=_INT64, label=_OPTIONAL)
+    entry.field.add(name="num", number=2, type=_INT64, label=_OPTIONAL)
+    entry.field.add(name="item_info", number=3, type=_MESSAGE, label=_OPTIONAL, type_name=".fake.Item")
+    reply = file_proto.message_type.add(name="Reply")
+    reply.field.add(name="items", number=1, type=_MESSAGE, label=_REPEATED, type_name=".fake.Entry")
+    ret = file_proto.message_type.add(name="Ret")
+    ret.field.add(name="ret", number=1, type=_MESSAGE, label=_OPTIONAL, type_name=".fake.Reply")
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("fake.Ret"))
+
+
+@pytest.fixture
+def decoder() -> TradingDecoderV2:
+    decoder = TradingDecoderV2()
+    decoder._loaded = True
+    decoder._ret_cls = decoder._reply_cls = _ret_class()
+    return decoder
+
+
+def test_hybrid_decodes_each_segment_once(decoder, caplog):
+    """Test that V2 and V1 listings come out of a single pass, tagged by source."""
+    v2_segment = len_field(1, len_field(1, len_field(1, listing_entry(500, 2, 2001))))
+    v1_segment = len_field(1, len_field(2, listing_entry(100, 3, 1001)) + len_field(2, listing_entry(150, 1, 1002)))
+    data = frame_down(v2_segment, server_seq=1) + frame_down(v1_segment, server_seq=2)
+
+    with caplog.at_level(logging.INFO):
+        listings = decoder.decode_hybrid(data, ListingTypedefCache())
+
+    assert [
+        (listing.source, listing.server_sequence, listing.price_luno, listing.item_config_id) for listing in listings
+    ] == [
+        ("v2", 1, 500, 2001),
+        ("v1", 2, 100, 1001),
+        ("v1", 2, 150, 1002),
+    ]
+    assert listings[0].to_dict()["metadata"]["decoder"] == "v2"
+    assert listings[0].load_raw_entry() == {"price": "500", "num": "2", "item_info": {"config_id": "2001"}}
+    assert "entries=2" in caplog.text
+
+
+def test_decode_listings_ignores_heuristic_segments(decoder):
+    """Test that plain V2 decoding does not run the heuristic fallback."""
+    v1_segment = len_field(1, len_field(2, listing_entry(100, 3, 1001)) + len_field(2, listing_entry(150, 1, 1002)))
+    assert decoder.decode_listings(frame_down(v1_segment)) == []
+
+
+def test_hybrid_without_generated_modules(tmp_path, monkeypatch):
+    """Test that an unavailable V2 decoder still decodes heuristically in one pass."""
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    decoder = TradingDecoderV2(registry=GeneratedModuleRegistry(tmp_path))
+    v1_segment = len_field(1, len_field(2, listing_entry(100, 3, 1001)) + len_field(2, listing_entry(150, 1, 1002)))
+
+    listings = decoder.decode_hybrid(frame_down(v1_segment))
+
+    assert not decoder.available
+    assert [listing.source for listing in listings] == ["v1", "v1"]
+
+
+def test_item_filter_skips_entries_on_both_paths(decoder):
+    """Test that filtered-out entries are dropped without a V1 re-decode."""
+    v2_segment = len_field(1, len_field(1, len_field(1, listing_entry(500, 2, 2001))))
+    v1_segment = len_field(1, len_field(2, listing_entry(100, 3, 1001)) + len_field(2, listing_entry(150, 1, 1002)))
+    data = frame_down(v2_segment, server_seq=1) + frame_down(v1_segment, server_seq=2)
+    cache = ListingTypedefCache()
+
+    listings = decoder.decode_hybrid(data, cache, item_filter={1002})
+
+    assert [(listing.source, listing.item_config_id) for listing in listings] == [("v1", 1002)]
+    # The V2 reply matched no wanted item but was still recognised as a reply
+    assert decoder.decode_listings(data, item_filter={1002}) == []
+    assert cache.typedef is not None
@@ -0,0 +1,131 @@
+"""Tests for incremental item catalog rebuilds."""
+
+import json
+import os
+
+import pytest
+
+from bpsr_labs.packet_decoder.decoder.item_catalog import CompiledItemCatalog
+from bpsr_labs.packet_decoder.decoder.update_item_mapping import (
+    MANIFEST_SUFFIX,
+    update_item_catalog,
+)
+
+
+def _write(path, payload, mtime):
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def sources(tmp_path):
+    base = tmp_path / "item_name_map.json"
+    _write(base, {"123": {"name": "Item 1"}, "456": {"name": "Item 2"}}, 1_000_000_000)
+    override = tmp_path / "ItemTable.json"
+    _write(override, {"123": {"Id": 123, "Name": "Item 1 Updated"}}, 1_000_000_000)
+    return base, override
+
+
+def test_unchanged_sources_are_not_reparsed(tmp_path, sources):
+    """Test that a second run reuses every source and leaves the outputs alone."""
+    output = tmp_path / "out" / "items.json"
+
+    first = update_item_catalog(sources, output)
+    assert first.refresh.parsed == list(sources) and first.written
+    assert output.with_suffix(MANIFEST_SUFFIX).is_file()
+    output_mtime = output.stat().st_mtime_ns
+
+    second = update_item_catalog(sources, output)
+    assert second.refresh.parsed == [] and second.refresh.reused == list(sources)
+    assert not second.written
+    assert output.stat().st_mtime_ns == output_mtime
+    assert second.mapping == first.mapping
+
+
+def test_changed_source_is_reparsed_and_later_sources_still_win(tmp_path, sources):
+    """Test that only the edited file is parsed and precedence is preserved."""
+    base, override = sources
+    output = tmp_path / "items.json"
+    update_item_catalog(sources, output)
+
+    _write(base, {"123": {"name": "Item 1 v2"}, "456": {"name": "Item 2 v2"}}, 2_000_000_000)
+    result = update_item_catalog(sources, output)
+
+    assert result.refresh.parsed == [base]
+    assert result.written
+    with CompiledItemCatalog.open(output.with_suffix(".bin")) as catalog:
+        assert catalog[123].name == "Item 1 Updated"
+        assert catalog[456].name == "Item 2 v2"
+
+
+def test_touched_file_with_same_content_is_reused(tmp_path, sources):
+    """Test that a new mtime alone only costs a hash."""
+    base, _ = sources
+    output = tmp_path / "items.json"
+    update_item_catalog(sources, output)
+
+    os.utime(base, ns=(3_000_000_000, 3_000_000_000))
+    result = update_item_catalog(sources, output)
+
+    assert result.refresh.parsed == []
+    assert not result.written
+
+
+def test_removed_source_drops_its_items(tmp_path, sources):
+    """Test that items only a removed source contributed disappear."""
+    base, override = sources
+    output = tmp_path / "items.json"
+    update_item_catalog(sources, output)
+
+    result = update_item_catalog([override], output)
+
+    assert result.refresh.removed == [str(base)]
+    assert result.written
+    assert sorted(json.loads(output.read_text())) == ["123"]
+
+
+def test_force_reparses_everything(tmp_path, sources):
+    """Test that force ignores the manifest."""
+    output = tmp_path / "items.json"
+    update_item_catalog(sources, output)
+
+    result = update_item_catalog(sources, output, force=True)
+
+    assert result.refresh.parsed == list(sources)
+    assert result.written
+
+
+def test_no_candidates_raises(tmp_path):
+    """Test that an empty source directory is reported."""
+    with pytest.raises(ValueError, match="No candidate files"):
+        update_item_catalog([tmp_path], tmp_path / "items.json")
+
+
+def test_source_listed_twice_is_parsed_once(tmp_path, sources):
+    """Test that a file given directly and found under a source directory is read once."""
+    base, override = sources
+    result = update_item_catalog([override, tmp_path], tmp_path / "out" / "items.json")
+    assert result.refresh.parsed == [override, base]
+
+
+def test_item_table_columns_are_written_and_selectable(tmp_path):
+    """Test that columns reach both outputs and a new selection reparses."""
+    table = tmp_path / "ItemTable.json"
+    _write(table, {"1": {"Id": 1, "Name": "Serum", "Quality": 2, "Type": 5, "Overlap": 99}}, 1_000_000_000)
+    output = tmp_path / "items.json"
+
+    update_item_catalog([table], output)
+    assert json.loads(output.read_text())["1"] == {"name": "Serum", "rarity": 2, "category": 5, "stack_size": 99}
+    with CompiledItemCatalog.open(output.with_suffix(".bin")) as catalog:
+        assert catalog[1].category == 5
+
+    assert update_item_catalog([table], output).refresh.parsed == []
+    result = update_item_catalog([table], output, columns=["category"])
+    assert result.refresh.parsed == [table]
+    assert json.loads(output.read_text())["1"] == {"name": "Serum", "category": 5}
+
+
+def test_unknown_column_raises(tmp_path, sources):
+    """Test that a misspelt column is reported."""
+    with pytest.raises(ValueError, match="Unknown item column"):
+        update_item_catalog(sources, tmp_path / "items.json", columns=["rarty"])
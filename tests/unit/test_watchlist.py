@@ -0,0 +1,108 @@
+"""Tests for streaming trading-center watchlist alerts."""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from bpsr_labs.packet_decoder.cli.bpsr_decode_trade import main as trade_decode_main
+from bpsr_labs.packet_decoder.decoder.item_catalog import ItemRecord
+from bpsr_labs.packet_decoder.decoder.watchlist import WatchRule, Watchlist
+
+from ._frames import listing_frame
+from ._listings import make_listing
+
+
+def test_match_uses_price_and_quantity_thresholds():
+    """Test that a rule matches at or below its price and above its minimum quantity."""
+    watchlist = Watchlist([WatchRule(1001, max_price=500, min_quantity=2)])
+    assert watchlist.match(make_listing(500, 2)) == [WatchRule(1001, 500, 2)]
+    assert watchlist.match(make_listing(501, 2)) == []
+    assert watchlist.match(make_listing(100, 1)) == []
+    assert watchlist.match(make_listing(100, 5, item_id=2002)) == []
+
+
+def test_alerts_are_deduplicated_and_named():
+    """Test that page refreshes repeating a listing alert only once."""
+    watchlist = Watchlist([WatchRule(1001, max_price=500, label="cheap")])
+    listings = [
+        make_listing(400, 1),
+        make_listing(400, 1, server_sequence=2),
+        make_listing(450, 1),
+        make_listing(900, 1),
+    ]
+    names = {1001: ItemRecord(1001, "Iron Ore")}
+
+    alerts = list(watchlist.alerts(listings, names.get))
+
+    assert [alert.listing.price_luno for alert in alerts] == [400, 450]
+    assert alerts[0].to_dict() == {
+        "item_id": 1001,
+        "price_luno": 400,
+        "quantity": 1,
+        "max_price": 500,
+        "server_sequence": 1,
+        "frame_offset": 0,
+        "item_name": "Iron Ore",
+        "label": "cheap",
+        "decoder": "v1",
+    }
+
+
+def test_alerts_are_lazy():
+    """Test that alerts are produced before the listing stream is exhausted."""
+    watchlist = Watchlist([WatchRule(1001, max_price=500)])
+
+    def listings():
+        yield make_listing(100, 1)
+        raise AssertionError("stream consumed past the first alert")
+
+    assert next(watchlist.alerts(listings())).listing.price_luno == 100
+
+
+def test_from_file_accepts_prices_and_objects(tmp_path):
+    """Test both watchlist entry forms."""
+    path = tmp_path / "watch.json"
+    path.write_text(json.dumps({"1001": 500, "1002": {"max_price": 90, "min_quantity": 3, "label": "x"}}))
+
+    watchlist = Watchlist.from_file(path)
+
+    assert len(watchlist) == 2
+    assert 1001 in watchlist and 1002 in watchlist
+    assert watchlist.match(make_listing(90, 3, item_id=1002)) == [WatchRule(1002, 90, 3, "x")]
+
+
+@pytest.mark.parametrize("payload", ["[1, 2]", '{"abc": 5}', '{"1001": {"min_quantity": 2}}', "{"])
+def test_from_file_rejects_invalid_watchlists(tmp_path, payload):
+    """Test that malformed watchlists raise ValueError."""
+    path = tmp_path / "watch.json"
+    path.write_text(payload)
+    with pytest.raises(ValueError):
+        Watchlist.from_file(path)
+
+
+def test_trade_decode_watch_mode_streams_ndjson(tmp_path):
+    """Test that --watchlist writes one alert per line without V1 progress output."""
+    capture = tmp_path / "capture.bin"
+    capture.write_bytes(
+        listing_frame([(400, 2, 1001), (900, 1, 1001)], server_seq=7)
+        + listing_frame([(400, 2, 1001), (80, 5, 2002)], server_seq=8)
+    )
+    watchlist = tmp_path / "watch.json"
+    watchlist.write_text(json.dumps({"1001": 500, "2002": 100}))
+
+    result = CliRunner().invoke(
+        trade_decode_main,
+        [
+            str(capture), "-",
+            "--watchlist", str(watchlist),
+            "--decoder", "v1",
+            "--no-item-names",
+            "--no-typedef-cache",
+            "--quiet",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    alerts = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(a["item_id"], a["price_luno"], a["server_sequence"]) for a in alerts] == [(1001, 400, 7), (2002, 80, 8)]